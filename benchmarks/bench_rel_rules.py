@@ -0,0 +1,205 @@
+"""Benchmarks for the rel-rules component.
+
+Times `optimize` calls against the built rel-rules component in isolation
+(without the other rule groups). Build the components first:
+
+    bash scripts/build.sh
+    uv run python benchmarks/bench_rel_rules.py [case ...]
+
+`--engine memo` times the memo-rules component instead, which explores the
+same rules over a memo of equivalent plans.
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from substrait.algebra_pb2 import Expression, Rel
+from substrait.plan_pb2 import Plan
+from substrait.type_pb2 import NamedStruct, Type
+
+from distill import Manager
+
+COMPONENTS_DIR = Path(__file__).resolve().parent.parent / "components"
+ENGINES = {
+    "greedy": COMPONENTS_DIR / "rel_rules.wasm",
+    "memo": COMPONENTS_DIR / "alternatives" / "memo_rules.wasm",
+}
+
+
+def _field(index: int) -> Expression:
+    expr = Expression()
+    expr.selection.direct_reference.struct_field.field = index
+    expr.selection.root_reference.SetInParent()
+    return expr
+
+
+def _read(num_fields: int) -> Rel:
+    rel = Rel()
+    schema = NamedStruct()
+    for i in range(num_fields):
+        schema.names.append(f"c{i}")
+        t = schema.struct.types.add()
+        t.i32.nullability = Type.NULLABILITY_REQUIRED
+    rel.read.base_schema.CopyFrom(schema)
+    rel.read.named_table.names.append("t")
+    return rel
+
+
+def _plan(rel: Rel) -> Plan:
+    plan = Plan()
+    plan.relations.add().root.input.CopyFrom(rel)
+    return plan
+
+
+def wide_project(width: int = 500) -> Plan:
+    """Project(Read) computing `width` pass-through expressions over a wide read."""
+    rel = Rel()
+    rel.project.input.CopyFrom(_read(width))
+    for i in range(width):
+        rel.project.expressions.append(_field(i))
+    return _plan(rel)
+
+
+def large_in_list(size: int = 5000) -> Plan:
+    """Project(Read) computing `col(0) IN (<size> literals)`."""
+    rel = Rel()
+    rel.project.input.CopyFrom(_read(4))
+    in_list = rel.project.expressions.add().singular_or_list
+    in_list.value.CopyFrom(_field(0))
+    for i in range(size):
+        option = in_list.options.add()
+        option.literal.i32 = i
+    return _plan(rel)
+
+
+def _sorts(rel: Rel, depth: int) -> Rel:
+    for _ in range(depth):
+        parent = Rel()
+        parent.sort.input.CopyFrom(rel)
+        parent.sort.sorts.add().expr.CopyFrom(_field(0))
+        rel = parent
+    return rel
+
+
+def _is_not_null_filter(rel: Rel) -> Rel:
+    result = Rel()
+    result.filter.input.CopyFrom(rel)
+    result.filter.condition.selection.CopyFrom(_field(1).selection)
+    return result
+
+
+def deep_passthrough(depth: int = 45) -> Plan:
+    """Filter above `depth` stacked sorts; pushdown walks it to the read."""
+    return _plan(_is_not_null_filter(_sorts(_read(4), depth)))
+
+
+def wide_union(width: int = 100, depth: int = 4) -> Plan:
+    """Filter above a UNION ALL of `width` sort stacks (~500 nodes)."""
+    rel = Rel()
+    rel.set.op = 6  # SET_OP_UNION_ALL
+    for _ in range(width):
+        rel.set.inputs.append(_sorts(_read(4), depth))
+    return _plan(_is_not_null_filter(rel))
+
+
+def _mixed_filter(rel: Rel, left_index: int, right_index: int) -> Rel:
+    """Filter(f(col(left), col(right))) referencing both sides of a join."""
+    result = Rel()
+    result.filter.input.CopyFrom(rel)
+    fn = result.filter.condition.scalar_function
+    fn.function_reference = 1
+    fn.arguments.add().value.CopyFrom(_field(left_index))
+    fn.arguments.add().value.CopyFrom(_field(right_index))
+    return result
+
+
+def _join_tree(levels: int) -> tuple[Rel, int]:
+    if levels == 0:
+        return _read(4), 4
+    left, left_count = _join_tree(levels - 1)
+    right, right_count = _join_tree(levels - 1)
+    rel = Rel()
+    rel.join.left.CopyFrom(left)
+    rel.join.right.CopyFrom(right)
+    rel.join.type = 1  # JOIN_TYPE_INNER
+    rel.join.expression.CopyFrom(_field(0))
+    return _mixed_filter(rel, 0, left_count), left_count + right_count
+
+
+def deep_join_tree(levels: int = 9) -> Plan:
+    """Balanced tree of inner joins, each under a filter that spans both sides.
+
+    No rule fires, so the time goes to field counting for every join.
+    """
+    return _plan(_join_tree(levels)[0])
+
+
+def cascading_prune(depth: int = 40, width: int = 40) -> Plan:
+    """Project keeping one column of a wide read under `depth` stacked sorts.
+
+    Each level's prune enables the one below it, so the rewrites cascade
+    through all `depth` sorts.
+    """
+    rel = Rel()
+    rel.project.input.CopyFrom(_sorts(_read(width), depth))
+    rel.project.expressions.append(_field(0))
+    rel.project.common.emit.output_mapping.append(width)
+    return _plan(rel)
+
+
+CASES = {
+    "wide_project": wide_project,
+    "large_in_list": large_in_list,
+    "deep_passthrough": deep_passthrough,
+    "wide_union": wide_union,
+    "deep_join_tree": deep_join_tree,
+    "cascading_prune": cascading_prune,
+}
+
+
+def run(case: str, manager: Manager, repeat: int) -> float:
+    plan_bytes = CASES[case]().SerializeToString()
+    manager.optimize(plan_bytes)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        manager.optimize(plan_bytes)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engine", choices=list(ENGINES), default="greedy")
+    parser.add_argument(
+        "--rules", action="store_true", help="show per-rule stats of the last call"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(ENGINES[args.engine], tmp)
+        manager = Manager(tmp, max_iterations=1)
+        manager.load_components()
+        for case in args.cases:
+            seconds = run(case, manager, args.repeat)
+            print(f"{case:<24} {seconds * 1000:10.2f} ms/optimize")
+            if args.rules:
+                _print_rules(manager)
+
+
+def _print_rules(manager: Manager) -> None:
+    for group in manager.last_report.groups:
+        rules = sorted(group.rules.values(), key=lambda r: r.nanos, reverse=True)
+        for rule in rules:
+            if rule.invocations:
+                print(
+                    f"    {rule.name:<32} {rule.invocations:8} tried {rule.fires:6} fired"
+                    f" {rule.nanos / 1e6:10.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from substrait.plan_pb2 import Plan
+from wit_world.exports import RuleGroup
+from wit_world.imports.types import OptimizeOutput, RuleGroupInfo, RuleStats
+
+from dispatch import RuleIndex
+from interning import reset_expression_store
+from memo import Memo
+from ownership import put, take
+from registry import RULES
+
+RULE_INDEX = RuleIndex(RULES)
+
+# Upper bound on the rule applications one optimize call explores. The
+# cheapest plan found so far is returned when it is reached.
+MAX_APPLICATIONS = 20000
+
+
+class RuleGroup(RuleGroup):
+    def info(self) -> RuleGroupInfo:
+        return RuleGroupInfo(
+            name="memo-rules",
+            description="Cost-based exploration of the rel-rules over a memo of equivalent plans",
+        )
+
+    def optimize(self, plan: bytes) -> OptimizeOutput:
+        p = Plan()
+        p.ParseFromString(plan)
+
+        RULE_INDEX.reset_counters()
+        reset_expression_store()
+        memo = Memo(RULE_INDEX, _build_fn_names(p))
+
+        roots = []
+        for plan_rel in p.relations:
+            if plan_rel.HasField("root"):
+                roots.append((plan_rel.root, "input"))
+            elif plan_rel.HasField("rel"):
+                roots.append((plan_rel, "rel"))
+        groups = [memo.add(take(msg, name)) for msg, name in roots]
+
+        rounds, complete = memo.explore(MAX_APPLICATIONS)
+
+        for (msg, name), group in zip(roots, groups):
+            put(msg, name, memo.extract(group))
+
+        return OptimizeOutput(plan=p.SerializeToString(), passes=rounds, converged=complete)
+
+    def stats(self) -> list[RuleStats]:
+        return [
+            RuleStats(
+                name=name,
+                invocations=RULE_INDEX.tried[name],
+                fires=RULE_INDEX.fired[name],
+                nanos=RULE_INDEX.nanos[name],
+            )
+            for name in RULE_INDEX.tried
+        ]
+
+
+def _build_fn_names(plan: Plan) -> dict[int, str]:
+    """Build a mapping from function_anchor to function name."""
+    result = {}
+    for ext in plan.extensions:
+        if ext.HasField("extension_function"):
+            fn = ext.extension_function
+            result[fn.function_anchor] = fn.name
+    return result
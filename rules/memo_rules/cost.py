@@ -0,0 +1,114 @@
+"""Cost model for choosing between equivalent plans in the memo.
+
+Costs are in "cells": rows times fields. An operator costs the cells it
+reads from its inputs plus the cells it produces, and a plan costs the sum
+over its operators. Row counts are estimated per memo group, from the rel
+that created it, with fixed selectivities; a read's row count comes from
+its `hint.stats.row_count` when set.
+
+This only has to rank alternatives against each other: pushing a filter
+down makes every operator above it read fewer rows, pruning a read's emit
+makes it produce fewer fields, and dropping a project removes its cost.
+"""
+
+from substrait.algebra_pb2 import Rel, SetRel
+
+from schema import join_type_name
+
+# Rows assumed for a leaf without statistics.
+DEFAULT_ROWS = 1000.0
+
+FILTER_SELECTIVITY = 0.5
+
+# Fraction of a read's rows a best_effort_filter is assumed to let the
+# reader skip.
+READ_FILTER_SKIP = 0.1
+
+# Output rows of an aggregate with grouping keys, per input row.
+GROUPS_PER_ROW = 0.1
+
+# Fields assumed for a rel whose field count is unknown.
+DEFAULT_WIDTH = 8
+
+_JOIN_TYPES = ("join", "hash_join", "merge_join", "nested_loop_join")
+
+
+def estimate_rows(rel: Rel, input_rows: list[float]) -> float:
+    """Estimate the output rows of `rel` given the rows of its inputs."""
+    rel_type = rel.WhichOneof("rel_type")
+    if rel_type is None:
+        return DEFAULT_ROWS
+    inner = getattr(rel, rel_type)
+
+    if "common" in inner.DESCRIPTOR.fields_by_name:
+        stats = inner.common.hint.stats
+        if stats.row_count > 0:
+            return stats.row_count
+
+    if not input_rows:
+        if rel_type == "read" and inner.HasField("virtual_table"):
+            table = inner.virtual_table
+            return float(max(len(table.values), len(table.expressions)))
+        return DEFAULT_ROWS
+
+    rows = input_rows[0]
+    if rel_type == "filter":
+        return rows * FILTER_SELECTIVITY
+    if rel_type == "fetch":
+        count = _fetch_count(inner)
+        return rows if count is None else min(rows, float(count))
+    if rel_type == "aggregate":
+        if not any(g.grouping_expressions or g.expression_references for g in inner.groupings):
+            return 1.0
+        return max(1.0, rows * GROUPS_PER_ROW)
+    if rel_type == "cross":
+        return rows * input_rows[1]
+    if rel_type in _JOIN_TYPES and len(input_rows) >= 2:
+        return _join_rows(join_type_name(inner), rows, input_rows[1])
+    if rel_type == "set":
+        if inner.op == SetRel.SET_OP_UNION_ALL:
+            return sum(input_rows)
+        return max(input_rows)
+    return rows
+
+
+def _fetch_count(fetch) -> int | None:
+    mode = fetch.WhichOneof("count_mode")
+    if mode == "count":
+        count = fetch.count
+    elif mode == "count_expr" and fetch.count_expr.literal.WhichOneof("literal_type") == "i64":
+        count = fetch.count_expr.literal.i64
+    else:
+        return None
+    return count if count >= 0 else None
+
+
+def _join_rows(join_type: str, left: float, right: float) -> float:
+    if join_type in ("LEFT_SEMI", "LEFT_ANTI"):
+        return left * FILTER_SELECTIVITY
+    if join_type in ("RIGHT_SEMI", "RIGHT_ANTI"):
+        return right * FILTER_SELECTIVITY
+    if join_type in ("LEFT", "LEFT_SINGLE", "LEFT_MARK"):
+        return left
+    if join_type in ("RIGHT", "RIGHT_SINGLE", "RIGHT_MARK"):
+        return right
+    if join_type == "OUTER":
+        return left + right
+    return max(left, right)
+
+
+def local_cost(
+    rel: Rel, rows: float, width: int | None, inputs: list[tuple[float, int | None]]
+) -> float:
+    """Cost of `rel` itself, producing `rows` x `width` cells from `inputs`
+    given as (rows, width) pairs."""
+    cost = rows * _width(width)
+    for input_rows, input_width in inputs:
+        cost += input_rows * _width(input_width)
+    if rel.WhichOneof("rel_type") == "read" and rel.read.HasField("best_effort_filter"):
+        cost *= 1.0 - READ_FILTER_SKIP
+    return cost
+
+
+def _width(width: int | None) -> int:
+    return DEFAULT_WIDTH if width is None else max(width, 1)
@@ -0,0 +1,262 @@
+"""Memo of equivalent subplans, explored with the rel-rules.
+
+The memo holds a plan as equivalence groups: each group is a set of
+alternative rels (memo expressions) producing the same output, and each
+alternative refers to its inputs by group rather than by a concrete
+subtree. A memo expression is stored as a Rel whose child slots hold
+stand-in leaves: `extension_leaf` rels naming the group in `hint.alias`
+and carrying its field count as `hint.output_names`, so the rules' schema
+derivation still sees the shape of every input.
+
+Exploration binds each memo expression to concrete alternatives of its
+input groups and applies the rules that match, one rewrite at a time:
+`optimize_rel` returns its argument unchanged, since the memo explores the
+rewritten subtrees itself. A rewrite's result joins the matched group, and
+its new subtrees join new or existing groups, until no rule adds anything.
+Extraction then picks the cheapest alternative in every group (see
+cost.py).
+"""
+
+from itertools import islice, product
+
+from substrait.algebra_pb2 import Rel
+
+from children import child_at, child_slots, replace_at
+from cost import estimate_rows, local_cost
+from dispatch import RuleIndex
+from schema import output_field_count, reset_type_cache
+
+STANDIN_PREFIX = "memo-group:"
+
+# Input bindings tried per memo expression; bounds the product over sets
+# and joins whose inputs have many alternatives.
+MAX_BINDINGS = 64
+
+
+class _Rejected(Exception):
+    """A rewrite modified a stand-in, i.e. reached into an input group."""
+
+
+class MemoExpr:
+    """One alternative in a group: a rel over stand-ins for its input groups."""
+
+    __slots__ = ("id", "group", "rel", "inputs", "rel_type", "input_index", "has_emit")
+
+    def __init__(self, expr_id: int, group: int, rel: Rel, inputs: tuple[int, ...]):
+        self.id = expr_id
+        self.group = group
+        self.rel = rel
+        self.inputs = inputs
+        self.rel_type = rel.WhichOneof("rel_type")
+        # Index into `inputs` of the rel's `input` field, or -1.
+        self.input_index = -1
+        self.has_emit = False
+        if self.rel_type is None:
+            return
+        inner = getattr(rel, self.rel_type)
+        for i, (msg, name, _) in enumerate(child_slots(rel)):
+            if msg is inner and name == "input":
+                self.input_index = i
+                break
+        self.has_emit = inner.common.HasField("emit")
+
+
+class Group:
+    """Equivalent alternatives, with the logical properties they share."""
+
+    __slots__ = ("id", "exprs", "keys", "field_count", "rows", "standin", "standin_key")
+
+    def __init__(self, group_id: int, field_count: int | None, rows: float):
+        self.id = group_id
+        self.exprs: list[MemoExpr] = []
+        # Serialized templates of `exprs`, to skip duplicate alternatives.
+        self.keys: set[bytes] = set()
+        self.field_count = field_count
+        self.rows = rows
+        self.standin = Rel()
+        hint = self.standin.extension_leaf.common.hint
+        hint.alias = f"{STANDIN_PREFIX}{group_id}"
+        if field_count is not None:
+            hint.output_names.extend(f"f{i}" for i in range(field_count))
+        self.standin_key = self.standin.SerializeToString(deterministic=True)
+
+
+class Memo:
+    def __init__(self, rule_index: RuleIndex, fn_names: dict[int, str]):
+        self.groups: list[Group] = []
+        self.expr_count = 0
+        self.applications = 0
+        self._rule_index = rule_index
+        self._fn_names = fn_names
+        # Group holding each serialized template, for duplicate detection.
+        self._by_key: dict[bytes, int] = {}
+        # (memo expression id, bound input expression ids) already explored.
+        self._tried: set[tuple] = set()
+
+    def add(self, rel: Rel) -> int:
+        """Copy in a concrete plan, returning the id of its root group.
+
+        The memo takes ownership of `rel`.
+        """
+        return self._insert(rel, None)[0]
+
+    def explore(self, max_applications: int) -> tuple[int, bool]:
+        """Apply the rules until no rewrite adds a new alternative.
+
+        Returns the number of rounds run and whether exploration finished
+        within `max_applications` rule applications.
+        """
+        rounds = 0
+        while True:
+            rounds += 1
+            count = self.expr_count
+            # Groups and alternatives added during a round are explored in
+            # the same round; parents see them as bindings in the next one.
+            g = 0
+            while g < len(self.groups):
+                group = self.groups[g]
+                e = 0
+                while e < len(group.exprs):
+                    if not self._explore_expr(group.exprs[e], max_applications):
+                        return rounds, False
+                    e += 1
+                g += 1
+            if self.expr_count == count:
+                return rounds, True
+
+    def extract(self, group_id: int) -> Rel:
+        """Build the cheapest concrete plan of a group."""
+        best: dict[int, tuple[float, MemoExpr]] = {}
+        self._best(group_id, best, set())
+        return self._build(group_id, best)
+
+    # -- Exploration ------------------------------------------------------------
+
+    def _explore_expr(self, expr: MemoExpr, max_applications: int) -> bool:
+        choices = [self.groups[i].exprs for i in expr.inputs]
+        for bound in islice(product(*choices), MAX_BINDINGS):
+            key = (expr.id, tuple(b.id for b in bound))
+            if key in self._tried:
+                continue
+            self._tried.add(key)
+
+            input_type = None if expr.input_index < 0 else bound[expr.input_index].rel_type
+            for rule in self._rule_index.lookup(expr.rel_type, input_type, expr.has_emit):
+                if self.applications >= max_applications:
+                    return False
+                self.applications += 1
+                self._apply(rule, expr, bound)
+        return True
+
+    def _apply(self, rule, expr: MemoExpr, bound: tuple[MemoExpr, ...]) -> None:
+        binding = self._bind(expr, bound)
+        reset_type_cache()
+        self._rule_index.start()
+        result = rule(binding, _unchanged, self._fn_names)
+        count = self.expr_count
+        if result is not None:
+            try:
+                self._insert(result, expr.group)
+            except _Rejected:
+                pass
+        self._rule_index.record(rule, self.expr_count > count)
+
+    def _bind(self, expr: MemoExpr, bound: tuple[MemoExpr, ...]) -> Rel:
+        """Copy `expr` with its stand-ins replaced by copies of the bound inputs."""
+        rel = Rel()
+        rel.CopyFrom(expr.rel)
+        if bound:
+            slots = child_slots(rel)
+            for slot, input_expr in zip(slots, bound):
+                input_rel = Rel()
+                input_rel.CopyFrom(input_expr.rel)
+                replace_at(slot, input_rel)
+        return rel
+
+    def _insert(self, rel: Rel, group_id: int | None) -> tuple[int, bool]:
+        """Add the tree `rel` to group `group_id`, or to the group of an equal
+        template or a new group if None. Returns (group id, whether added)."""
+        standin = _standin_group(rel)
+        if standin is not None:
+            if rel.SerializeToString(deterministic=True) != self.groups[standin].standin_key:
+                raise _Rejected()
+            return standin, False
+
+        inputs = []
+        for slot in child_slots(rel):
+            input_group = self._insert(child_at(slot), None)[0]
+            inputs.append(input_group)
+            standin_rel = Rel()
+            standin_rel.CopyFrom(self.groups[input_group].standin)
+            replace_at(slot, standin_rel)
+
+        key = rel.SerializeToString(deterministic=True)
+        if group_id is None:
+            existing = self._by_key.get(key)
+            if existing is not None:
+                return existing, False
+            group_id = self._new_group(rel, inputs)
+        elif key in self.groups[group_id].keys:
+            return group_id, False
+
+        group = self.groups[group_id]
+        group.keys.add(key)
+        group.exprs.append(MemoExpr(self.expr_count, group_id, rel, tuple(inputs)))
+        self.expr_count += 1
+        self._by_key.setdefault(key, group_id)
+        return group_id, True
+
+    def _new_group(self, rel: Rel, inputs: list[int]) -> int:
+        reset_type_cache()
+        rows = estimate_rows(rel, [self.groups[i].rows for i in inputs])
+        group = Group(len(self.groups), output_field_count(rel), rows)
+        self.groups.append(group)
+        return group.id
+
+    # -- Extraction -------------------------------------------------------------
+
+    def _best(self, group_id: int, best: dict, visiting: set[int]) -> float:
+        """Cost of the cheapest plan of a group, filling `best` on the way."""
+        if group_id in best:
+            return best[group_id][0]
+        if group_id in visiting:
+            return float("inf")
+        visiting.add(group_id)
+
+        group = self.groups[group_id]
+        choice = (float("inf"), group.exprs[0])
+        for expr in group.exprs:
+            inputs = [self.groups[i] for i in expr.inputs]
+            cost = local_cost(
+                expr.rel, group.rows, group.field_count, [(g.rows, g.field_count) for g in inputs]
+            )
+            for input_group in expr.inputs:
+                cost += self._best(input_group, best, visiting)
+            if cost < choice[0]:
+                choice = (cost, expr)
+
+        visiting.discard(group_id)
+        best[group_id] = choice
+        return choice[0]
+
+    def _build(self, group_id: int, best: dict) -> Rel:
+        expr = best[group_id][1]
+        rel = Rel()
+        rel.CopyFrom(expr.rel)
+        for slot, input_group in zip(child_slots(rel), expr.inputs):
+            replace_at(slot, self._build(input_group, best))
+        return rel
+
+
+def _standin_group(rel: Rel) -> int | None:
+    """Return the group a stand-in leaf refers to, or None if `rel` is not one."""
+    if rel.WhichOneof("rel_type") != "extension_leaf":
+        return None
+    alias = rel.extension_leaf.common.hint.alias
+    if not alias.startswith(STANDIN_PREFIX):
+        return None
+    return int(alias[len(STANDIN_PREFIX) :])
+
+
+def _unchanged(rel: Rel) -> Rel:
+    return rel
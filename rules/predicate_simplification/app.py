@@ -1,11 +1,16 @@
+from time import perf_counter_ns
+
 from google.protobuf.descriptor import FieldDescriptor
 from substrait.algebra_pb2 import Expression, Rel
 from substrait.plan_pb2 import Plan
 from wit_world.exports import RuleGroup
-from wit_world.imports.types import RuleGroupInfo
+from wit_world.imports.types import OptimizeOutput, RuleGroupInfo, RuleStats
 
 from simplify import is_bool_literal, simplify_expression
 
+# Per-handler [invocations, fires, nanos] of the last optimize call.
+_stats: dict[str, list[int]] = {}
+
 
 def visit(proto_object, handler):
     """Recursively walk a protobuf message tree, calling handler on each node.
@@ -35,7 +40,7 @@ class RuleGroup(RuleGroup):
             description="Simplify boolean expressions and remove trivially true filters",
         )
 
-    def optimize(self, plan: bytes) -> bytes:
+    def optimize(self, plan: bytes) -> OptimizeOutput:
         p = Plan()
         p.ParseFromString(plan)
         fn_names = _build_fn_names(p)
@@ -56,10 +61,38 @@ class RuleGroup(RuleGroup):
                         return result
             return None
 
-        visit(p, simplify_handler)
-        visit(p, filter_removal_handler)
+        _stats.clear()
+        _profiled_visit(p, simplify_handler)
+        _profiled_visit(p, filter_removal_handler)
+
+        # `visit` re-visits every replacement, so a single pass leaves
+        # nothing for another one to simplify.
+        return OptimizeOutput(plan=p.SerializeToString(), passes=1, converged=True)
+
+    def stats(self) -> list[RuleStats]:
+        return [
+            RuleStats(name=name, invocations=invocations, fires=fires, nanos=nanos)
+            for name, (invocations, fires, nanos) in _stats.items()
+        ]
+
+
+def _profiled_visit(proto_object, handler):
+    """Run `visit` with `handler`, recording its counters under the handler's name.
+
+    The time covers the whole visit, including the walk itself.
+    """
+    counters = _stats[handler.__name__] = [0, 0, 0]
+
+    def counted(node):
+        counters[0] += 1
+        replacement = handler(node)
+        if replacement is not None:
+            counters[1] += 1
+        return replacement
 
-        return p.SerializeToString()
+    start = perf_counter_ns()
+    visit(proto_object, counted)
+    counters[2] = perf_counter_ns() - start
 
 
 def _build_fn_names(plan: Plan) -> dict[int, str]:
@@ -203,23 +203,28 @@ def _rebuild_scalar_function(
 
 
 def _simplify_if_then(expr: Expression, fn_names: dict[int, str]) -> Expression:
-    """Simplify sub-expressions within an if_then."""
+    """Simplify sub-expressions within an if_then.
+
+    `if` and `else` are Python keywords, so those fields are only reachable
+    by name.
+    """
     it = expr.if_then
     changed = False
     new_ifs = []
     for clause in it.ifs:
-        new_if = simplify_expression(clause.if_, fn_names) if clause.HasField("if_") else None
-        new_then = simplify_expression(clause.then, fn_names) if clause.HasField("then") else None
-        if new_if is not (clause.if_ if clause.HasField("if_") else None):
-            changed = True
-        if new_then is not (clause.then if clause.HasField("then") else None):
+        old_if = getattr(clause, "if") if clause.HasField("if") else None
+        old_then = clause.then if clause.HasField("then") else None
+        new_if = simplify_expression(old_if, fn_names) if old_if is not None else None
+        new_then = simplify_expression(old_then, fn_names) if old_then is not None else None
+        if new_if is not old_if or new_then is not old_then:
             changed = True
         new_ifs.append((new_if, new_then))
 
     new_else = None
-    if it.HasField("else_"):
-        new_else = simplify_expression(it.else_, fn_names)
-        if new_else is not it.else_:
+    if it.HasField("else"):
+        old_else = getattr(it, "else")
+        new_else = simplify_expression(old_else, fn_names)
+        if new_else is not old_else:
             changed = True
 
     if not changed:
@@ -229,9 +234,9 @@ def _simplify_if_then(expr: Expression, fn_names: dict[int, str]) -> Expression:
     result.CopyFrom(expr)
     for i, (new_if, new_then) in enumerate(new_ifs):
         if new_if is not None:
-            result.if_then.ifs[i].if_.CopyFrom(new_if)
+            getattr(result.if_then.ifs[i], "if").CopyFrom(new_if)
         if new_then is not None:
             result.if_then.ifs[i].then.CopyFrom(new_then)
     if new_else is not None:
-        result.if_then.else_.CopyFrom(new_else)
+        getattr(result.if_then, "else").CopyFrom(new_else)
     return result
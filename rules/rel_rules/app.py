@@ -1,44 +1,21 @@
-from google.protobuf.descriptor import FieldDescriptor
 from substrait.algebra_pb2 import Rel
 from substrait.plan_pb2 import Plan
 from wit_world.exports import RuleGroup
-from wit_world.imports.types import RuleGroupInfo
-
-from filter_pushdown.aggregate import push_filter_through_aggregate
-from filter_pushdown.cross import push_filter_through_cross
-from filter_pushdown.join import push_filter_through_join
-from filter_pushdown.merge import merge_adjacent_filters
-from filter_pushdown.passthrough import push_filter_through_passthrough
-from filter_pushdown.project import push_filter_through_project
-from filter_pushdown.read import push_filter_into_read
-from filter_pushdown.set_op import push_filter_through_set
-from projection_pruning.cross import prune_cross_inputs
-from projection_pruning.fetch import prune_fetch_input
-from projection_pruning.filter import prune_filter_input
-from projection_pruning.join import prune_join_inputs
-from projection_pruning.projection import prune_project_input
-from projection_pruning.set_op import prune_set_inputs
-from projection_pruning.sort import prune_sort_input
-from simplification.project import remove_identity_project
-
-RULES = [
-    merge_adjacent_filters,
-    push_filter_through_cross,
-    push_filter_through_join,
-    push_filter_through_project,
-    push_filter_through_aggregate,
-    push_filter_through_set,
-    push_filter_through_passthrough,
-    push_filter_into_read,
-    prune_project_input,
-    prune_filter_input,
-    prune_join_inputs,
-    prune_cross_inputs,
-    prune_sort_input,
-    prune_fetch_input,
-    prune_set_inputs,
-    remove_identity_project,
-]
+from wit_world.imports.types import OptimizeOutput, RuleGroupInfo, RuleStats
+
+from children import child_at, child_slots, replace_at
+from dispatch import RuleIndex
+from interning import reset_expression_store
+from ownership import put
+from projection_pruning.required_columns import prune_required_columns
+from registry import RULES
+from schema import reset_type_cache
+
+RULE_INDEX = RuleIndex(RULES)
+
+# Upper bound on the passes one optimize call runs. Rules that keep firing
+# past it are left for the host's next call.
+MAX_PASSES = 50
 
 
 class RuleGroup(RuleGroup):
@@ -48,21 +25,67 @@ class RuleGroup(RuleGroup):
             description="Filter pushdown and projection pruning optimizations",
         )
 
-    def optimize(self, plan: bytes) -> bytes:
+    def optimize(self, plan: bytes) -> OptimizeOutput:
         p = Plan()
         p.ParseFromString(plan)
 
+        RULE_INDEX.reset_counters()
+        reset_expression_store()
         fn_names = _build_fn_names(p)
 
+        # Prune the whole plan to its required columns first, so the passes
+        # start from pruned inputs.
+        reset_type_cache()
         for plan_rel in p.relations:
             if plan_rel.HasField("root"):
-                new_input = _optimize_rel(plan_rel.root.input, fn_names)
-                plan_rel.root.input.CopyFrom(new_input)
+                prune_required_columns(plan_rel.root.input, RULE_INDEX, fn_names)
             elif plan_rel.HasField("rel"):
-                new_rel = _optimize_rel(plan_rel.rel, fn_names)
-                plan_rel.rel.CopyFrom(new_rel)
+                prune_required_columns(plan_rel.rel, RULE_INDEX, fn_names)
+
+        # Repeat passes over the plan until no rule fires, so rewrites that
+        # enable each other cascade without a round trip through the host.
+        passes = 0
+        converged = False
+        while passes < MAX_PASSES:
+            passes += 1
+            fired = sum(RULE_INDEX.fired.values())
+            _optimize_plan(p, fn_names)
+            if sum(RULE_INDEX.fired.values()) == fired:
+                converged = True
+                break
+
+        return OptimizeOutput(
+            plan=p.SerializeToString(), passes=passes, converged=converged
+        )
+
+    def stats(self) -> list[RuleStats]:
+        return [
+            RuleStats(
+                name=name,
+                invocations=RULE_INDEX.tried[name],
+                fires=RULE_INDEX.fired[name],
+                nanos=RULE_INDEX.nanos[name],
+            )
+            for name in RULE_INDEX.tried
+        ]
+
 
-        return p.SerializeToString()
+def _optimize_plan(plan: Plan, fn_names: dict[int, str]) -> None:
+    """Run one pass of the rules over every relation in the plan."""
+    reset_type_cache()
+    for plan_rel in plan.relations:
+        if plan_rel.HasField("root"):
+            _optimize_field(plan_rel.root, "input", fn_names)
+        elif plan_rel.HasField("rel"):
+            _optimize_field(plan_rel, "rel", fn_names)
+
+
+def _optimize_field(msg, name: str, fn_names: dict[int, str]) -> None:
+    """Optimize the Rel in field `name` of `msg`, replacing it if a rule rebuilt it."""
+    child = getattr(msg, name)
+    new_child = _optimize_tree(child, fn_names)
+    if new_child is not child:
+        put(msg, name, new_child)
 
 
 def _build_fn_names(plan: Plan) -> dict[int, str]:
@@ -75,45 +98,50 @@ def _build_fn_names(plan: Plan) -> dict[int, str]:
     return result
 
 
-def _optimize_rel(rel: Rel, fn_names: dict[int, str]) -> Rel:
-    """Recursively optimize a relation tree by applying all rules."""
-    if rel.WhichOneof("rel_type") in ("filter", "project", "join", "cross", "sort", "fetch", "set"):
-        for rule in RULES:
-            result = rule(
-                rel, lambda r: _optimize_rel(r, fn_names), fn_names
-            )
-            if result is not None:
-                return result
+def _optimize_tree(rel: Rel, fn_names: dict[int, str]) -> Rel:
+    """Recursively optimize a relation tree by applying the rules that can match it.
 
-    _recurse_children(rel, fn_names)
+    When a rule fires, the walk continues into the children of the rewritten
+    subtree, so rewrites that enable one another below it (e.g. a chain of
+    emit prunes) cascade within one pass. Rules may rewrite `rel` in place
+    or move its subtrees into a new Rel, so the caller must use the returned
+    Rel in place of `rel`.
+    """
+    rel = _apply_rules(rel, fn_names)
+    _optimize_children(rel, fn_names)
     return rel
 
 
-def _recurse_children(rel: Rel, fn_names: dict[int, str]) -> None:
-    """Recursively optimize all Rels within a relation, including those inside expressions."""
-    rel_type = rel.WhichOneof("rel_type")
-    if rel_type is None:
-        return
-    _optimize_rels_in(getattr(rel, rel_type), fn_names)
-
-
-def _optimize_rels_in(msg, fn_names: dict[int, str]) -> None:
-    """Walk a protobuf message, optimizing any Rel fields found."""
-    for field in msg.DESCRIPTOR.fields:
-        if field.type != FieldDescriptor.TYPE_MESSAGE:
-            continue
-        if field.message_type.name == "Rel":
-            if field.label == FieldDescriptor.LABEL_REPEATED:
-                items = getattr(msg, field.name)
-                for i in range(len(items)):
-                    new_child = _optimize_rel(items[i], fn_names)
-                    items[i].CopyFrom(new_child)
-            elif msg.HasField(field.name):
-                new_child = _optimize_rel(getattr(msg, field.name), fn_names)
-                getattr(msg, field.name).CopyFrom(new_child)
-        else:
-            if field.label == FieldDescriptor.LABEL_REPEATED:
-                for item in getattr(msg, field.name):
-                    _optimize_rels_in(item, fn_names)
-            elif msg.HasField(field.name):
-                _optimize_rels_in(getattr(msg, field.name), fn_names)
+def _optimize_rel(rel: Rel, fn_names: dict[int, str]) -> Rel:
+    """Optimize a subtree a rule built, returning the Rel to use in its place.
+
+    Rules that recurse through this already optimize what they build below
+    the rewritten node, so unlike `_optimize_tree` the walk stops where a
+    rule fires.
+    """
+    new_rel = _apply_rules(rel, fn_names)
+    if new_rel is rel:
+        _optimize_children(rel, fn_names)
+    return new_rel
+
+
+def _optimize_children(rel: Rel, fn_names: dict[int, str]) -> None:
+    """Optimize every child Rel of `rel`, linking rewritten children back in."""
+    for slot in child_slots(rel):
+        child = child_at(slot)
+        new_child = _optimize_tree(child, fn_names)
+        if new_child is not child:
+            replace_at(slot, new_child)
+
+
+def _apply_rules(rel: Rel, fn_names: dict[int, str]) -> Rel:
+    """Apply the first candidate rule that fires on `rel`, returning the
+    rewritten Rel, or `rel` itself if none fires."""
+    for rule in RULE_INDEX.candidates(rel):
+        RULE_INDEX.start()
+        result = rule(rel, lambda r: _optimize_rel(r, fn_names), fn_names)
+        RULE_INDEX.record(rule, result is not None)
+        if result is not None:
+            reset_type_cache()
+            return result
+    return rel
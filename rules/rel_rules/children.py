@@ -0,0 +1,125 @@
+"""Locate the child Rels of a Rel.
+
+A Rel's children are the Rels in its fields, including those nested in
+expressions (e.g. subqueries). `child_slots` lists where each one lives, so
+the driver and the required-columns pass can walk the tree and link a
+rewritten child back into its parent.
+"""
+
+from google.protobuf.descriptor import FieldDescriptor
+from substrait.algebra_pb2 import Rel
+
+from ownership import put, put_at
+
+REL_TYPES = tuple(f.name for f in Rel.DESCRIPTOR.oneofs_by_name["rel_type"].fields)
+
+
+def child_slots(rel: Rel) -> list[tuple]:
+    """Where each child Rel of `rel` lives: (parent message, field name,
+    index in the repeated field or -1), in field order."""
+    slots: list[tuple] = []
+    rel_type = rel.WhichOneof("rel_type")
+    if rel_type is not None:
+        _collect_slots(getattr(rel, rel_type), slots)
+    return slots
+
+
+def child_at(slot: tuple) -> Rel:
+    """Return the Rel in `slot`."""
+    msg, name, index = slot
+    if index < 0:
+        return getattr(msg, name)
+    return getattr(msg, name)[index]
+
+
+def replace_at(slot: tuple, child: Rel) -> None:
+    """Make `child` the Rel in `slot`, linking it into the parent message."""
+    msg, name, index = slot
+    if index < 0:
+        put(msg, name, child)
+    else:
+        put_at(msg, name, index, child)
+
+
+def _collect_slots(msg, slots: list[tuple]) -> None:
+    rel_fields = _REL_FIELDS[msg.DESCRIPTOR.full_name]
+    if not rel_fields:
+        return
+    for field, value in msg.ListFields():
+        kind = rel_fields.get(field.name)
+        if kind is None:
+            continue
+        if kind == _REL:
+            slots.append((msg, field.name, -1))
+        elif kind == _REL_LIST:
+            slots.extend((msg, field.name, i) for i in range(len(value)))
+        elif kind == _MSG:
+            _collect_slots(value, slots)
+        else:
+            for item in value:
+                _collect_slots(item, slots)
+
+
+# Field kinds in the Rel-bearing field table.
+_REL = 0
+_REL_LIST = 1
+_MSG = 2
+_MSG_LIST = 3
+
+
+def _build_rel_field_table(root) -> dict:
+    """Map every message type reachable from `root` to its Rel-bearing fields.
+
+    A field is Rel-bearing when its message type is Rel or can transitively
+    contain one (e.g. Expression via subqueries). Types, literals, field
+    reference segments and the like map to an empty table, so the walker
+    never descends into them.
+    """
+    descriptors = {}
+    stack = [root]
+    while stack:
+        desc = stack.pop()
+        if desc.full_name in descriptors:
+            continue
+        descriptors[desc.full_name] = desc
+        for field in desc.fields:
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                stack.append(field.message_type)
+
+    # Fixed point over the (possibly recursive) type graph.
+    bearing = {root.full_name}
+    changed = True
+    while changed:
+        changed = False
+        for name, desc in descriptors.items():
+            if name in bearing:
+                continue
+            for field in desc.fields:
+                if (
+                    field.type == FieldDescriptor.TYPE_MESSAGE
+                    and field.message_type.full_name in bearing
+                ):
+                    bearing.add(name)
+                    changed = True
+                    break
+
+    table = {}
+    for name, desc in descriptors.items():
+        fields = {}
+        for field in desc.fields:
+            if field.type != FieldDescriptor.TYPE_MESSAGE:
+                continue
+            if field.message_type.full_name not in bearing:
+                continue
+            repeated = field.label == FieldDescriptor.LABEL_REPEATED
+            if field.message_type.full_name == root.full_name:
+                fields[field.name] = _REL_LIST if repeated else _REL
+            else:
+                fields[field.name] = _MSG_LIST if repeated else _MSG
+        table[name] = fields
+    return table
+
+
+# Built at import time, so it is part of the pre-initialized component
+# snapshot rather than recomputed on every optimize call.
+_REL_FIELDS = _build_rel_field_table(Rel.DESCRIPTOR)
@@ -0,0 +1,120 @@
+"""Rule dispatch index keyed on (rel_type, input rel_type).
+
+Rules declare the node shapes they can fire on with `@matches(...)`. Each
+pattern is a `(rel_type, input_rel_type)` pair; an input type of None
+matches any input (and rels without a single `input`, like join or set).
+Rules that only act on rels with an emit mapping say so with
+`requires_emit=True`. `RuleIndex` turns the declarations into a lookup
+table so a node only tries the rules that can match it, in their original
+priority order.
+"""
+
+from time import perf_counter_ns
+
+from substrait.algebra_pb2 import Rel
+
+from children import REL_TYPES
+
+
+def matches(*patterns: tuple[str, str | None], requires_emit: bool = False):
+    """Declare the (rel_type, input_rel_type) patterns a rule can match."""
+
+    def decorate(rule):
+        rule.patterns = patterns
+        rule.requires_emit = requires_emit
+        return rule
+
+    return decorate
+
+
+class RuleIndex:
+    """Dispatch table from (rel_type, input_rel_type) to candidate rules.
+
+    Also keeps per-rule counters of how often each rule was tried, how
+    often it fired and how long it ran, so the table's selectivity and the
+    rules' cost can be checked on real plans.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        # rel_type -> input rel_type -> (candidates without emit, candidates
+        # with emit).
+        self._table: dict[str, dict[str | None, tuple[tuple, tuple]]] = {}
+        # rel types whose candidates depend on the input's rel type.
+        self._input_sensitive: set[str] = set()
+        # rel types with candidates that require an emit.
+        self._emit_sensitive: set[str] = set()
+
+        for rule in self.rules:
+            for rel_type, input_type in rule.patterns:
+                self._table.setdefault(rel_type, {})
+                if input_type is not None:
+                    self._input_sensitive.add(rel_type)
+                if rule.requires_emit:
+                    self._emit_sensitive.add(rel_type)
+
+        for rel_type, by_input in self._table.items():
+            for input_type in (None, *REL_TYPES):
+                rules = tuple(
+                    rule
+                    for rule in self.rules
+                    if any(
+                        p_rel == rel_type and p_input in (None, input_type)
+                        for p_rel, p_input in rule.patterns
+                    )
+                )
+                by_input[input_type] = (
+                    tuple(rule for rule in rules if not rule.requires_emit),
+                    rules,
+                )
+
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        self.tried = {rule.__name__: 0 for rule in self.rules}
+        self.fired = {rule.__name__: 0 for rule in self.rules}
+        self.nanos = {rule.__name__: 0 for rule in self.rules}
+        # (start time, time spent in nested rules) of each running rule.
+        self._running: list[list[int]] = []
+
+    def candidates(self, rel: Rel) -> tuple:
+        """Return the rules that can match `rel`, in priority order."""
+        rel_type = rel.WhichOneof("rel_type")
+        if rel_type not in self._table:
+            return ()
+        inner = getattr(rel, rel_type)
+        input_type = None
+        if rel_type in self._input_sensitive and inner.HasField("input"):
+            input_type = inner.input.WhichOneof("rel_type")
+        has_emit = rel_type in self._emit_sensitive and inner.common.HasField("emit")
+        return self.lookup(rel_type, input_type, has_emit)
+
+    def lookup(self, rel_type: str, input_type: str | None, has_emit: bool) -> tuple:
+        """Return the rules that can match a rel of `rel_type` over an input
+        of `input_type` (None if it has no single input), in priority order."""
+        by_input = self._table.get(rel_type)
+        if by_input is None:
+            return ()
+        if rel_type not in self._input_sensitive:
+            input_type = None
+        return by_input[input_type][has_emit]
+
+    def start(self) -> None:
+        """Start timing a rule; paired with the `record` call for its result."""
+        self._running.append([perf_counter_ns(), 0])
+
+    def record(self, rule, fired: bool) -> None:
+        """Count a rule's attempt and charge it the time since `start`.
+
+        Rules run on subtrees the rule rebuilt (via `optimize_rel`) are
+        charged to themselves, not to the rule that called them.
+        """
+        start, nested = self._running.pop()
+        elapsed = perf_counter_ns() - start
+        if self._running:
+            self._running[-1][1] += elapsed
+        name = rule.__name__
+        self.tried[name] += 1
+        self.nanos[name] += elapsed - nested
+        if fired:
+            self.fired[name] += 1
@@ -0,0 +1,44 @@
+"""Copy a fetch's limit into the preserved side of an outer join.
+
+Fetch(offset o, count c, LeftJoin(L, R)) -> Fetch(offset o, count c, LeftJoin(Fetch(o + c, L), R))
+
+Every row of the preserved side yields at least one output row, matched or
+padded with nulls, so o + c of its rows are enough for the first o + c
+output rows. The outer fetch stays, since a row can match several times.
+RIGHT joins get the limit on their right side. A post-join filter can drop
+the rows a preserved row yields, so joins with one are left alone.
+"""
+
+from dispatch import matches
+from helpers import fetch_bounds, limited_to, make_limit
+from ownership import put, take
+from substrait.algebra_pb2 import Rel
+
+# Preserved side of each outer join type: 3 LEFT, 4 RIGHT.
+_PRESERVED_SIDE = {3: "left", 4: "right"}
+
+
+@matches(("fetch", "join"))
+def push_fetch_into_outer_join(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "fetch":
+        return None
+    fetch_rel = rel.fetch
+    input_rel = fetch_rel.input
+    if input_rel.WhichOneof("rel_type") != "join":
+        return None
+    join_rel = input_rel.join
+
+    side = _PRESERVED_SIDE.get(join_rel.type)
+    if side is None or join_rel.HasField("post_join_filter"):
+        return None
+
+    bounds = fetch_bounds(fetch_rel)
+    if bounds is None or bounds[1] is None:
+        return None
+    limit = bounds[0] + bounds[1]
+
+    if limited_to(getattr(join_rel, side), limit):
+        return None
+
+    put(join_rel, side, optimize_rel(make_limit(take(join_rel, side), limit)))
+    return rel
@@ -0,0 +1,63 @@
+"""Push fetch below project: Fetch(Project(input)) -> Project(Fetch(input)).
+
+A project computes each output row from one input row, so limiting its
+input limits its output to the same rows, and its expressions are only
+evaluated for rows that are returned. Window functions read other rows
+than their own, so projects computing them stay where they are.
+
+The fetch's emit selects among the project's outputs; it is folded into
+the project's emit.
+"""
+
+from dispatch import matches
+from helpers import emit_mapping, expression_nodes
+from ownership import put, take
+from substrait.algebra_pb2 import Rel
+
+
+@matches(("fetch", "project"))
+def push_fetch_through_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "fetch":
+        return None
+    fetch_rel = rel.fetch
+    input_rel = fetch_rel.input
+    if input_rel.WhichOneof("rel_type") != "project":
+        return None
+    project_rel = input_rel.project
+
+    for expr in project_rel.expressions:
+        if any(node.WhichOneof("rex_type") == "window_function" for node in expression_nodes(expr)):
+            return None
+
+    fetch_emit = emit_mapping(fetch_rel)
+    if fetch_emit is not None:
+        project_emit = emit_mapping(project_rel)
+        if project_emit is not None:
+            if any(idx >= len(project_emit) for idx in fetch_emit):
+                return None
+            fetch_emit = [project_emit[idx] for idx in fetch_emit]
+        project_rel.common.emit.output_mapping[:] = fetch_emit
+        fetch_rel.common.ClearField("emit")
+
+    new_fetch = Rel()
+    put(new_fetch.fetch, "input", take(project_rel, "input"))
+    _move_fetch_fields(fetch_rel, new_fetch.fetch)
+
+    result = take(fetch_rel, "input")
+    put(project_rel, "input", optimize_rel(new_fetch))
+    return result
+
+
+def _move_fetch_fields(source, target) -> None:
+    """Move the fields of FetchRel `source` other than its input to `target`."""
+    for mode in ("offset_mode", "count_mode"):
+        name = source.WhichOneof(mode)
+        if name is None:
+            continue
+        if name.endswith("_expr"):
+            put(target, name, take(source, name))
+        else:
+            setattr(target, name, getattr(source, name))
+    for name in ("common", "advanced_extension"):
+        if source.HasField(name):
+            put(target, name, take(source, name))
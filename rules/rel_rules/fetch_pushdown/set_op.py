@@ -0,0 +1,46 @@
+"""Copy a fetch's limit into the inputs of a UNION ALL.
+
+Fetch(offset o, count c, Union-all(A, B, ...))
+    -> Fetch(offset o, count c, Union-all(Fetch(o + c, A), Fetch(o + c, B), ...))
+
+The union returns at most o + c rows before the fetch stops reading, and
+any o + c rows of an input will do, so no input has to produce more. The
+outer fetch stays: the union of the limited inputs can still be longer.
+"""
+
+from dispatch import matches
+from helpers import fetch_bounds, limited_to, make_limit
+from ownership import put_all, take_all
+from substrait.algebra_pb2 import Rel
+
+
+@matches(("fetch", "set"))
+def push_fetch_into_union(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "fetch":
+        return None
+    fetch_rel = rel.fetch
+    input_rel = fetch_rel.input
+    if input_rel.WhichOneof("rel_type") != "set":
+        return None
+    set_rel = input_rel.set
+
+    if set_rel.op != 6:  # SET_OP_UNION_ALL
+        return None
+
+    bounds = fetch_bounds(fetch_rel)
+    if bounds is None or bounds[1] is None:
+        return None
+    limit = bounds[0] + bounds[1]
+
+    if all(limited_to(inp, limit) for inp in set_rel.inputs):
+        return None
+
+    inputs = take_all(set_rel, "inputs")
+    new_inputs = []
+    for inp in inputs:
+        if limited_to(inp, limit):
+            new_inputs.append(inp)
+        else:
+            new_inputs.append(optimize_rel(make_limit(inp, limit)))
+    put_all(set_rel, "inputs", new_inputs)
+    return rel
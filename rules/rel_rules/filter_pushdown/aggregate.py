@@ -2,18 +2,28 @@
 
 Filter(Aggregate(X)) -> Aggregate(Filter(X)) when the filter predicate
 references only grouping key columns that are simple field references.
-Only handles single grouping set aggregates.
+References through the aggregate's emit are mapped back to its keys first.
+
+With several grouping sets (ROLLUP, CUBE, ...) only keys present in every
+set qualify: a key missing from a set is null in that set's rows, so a
+predicate on it does not commute with the aggregate. Keys may be listed
+per grouping or referenced through `expression_references`.
 """
 
+from dispatch import matches
 from helpers import (
     collect_field_indices,
+    emit_mapping,
     make_conjunction,
-    remap_field_indices,
+    remap_field_indices_in_place,
     split_conjunction,
 )
+from ownership import put, take
+from schema import grouping_key_sets
 from substrait.algebra_pb2 import Rel
 
 
+@matches(("filter", "aggregate"))
 def push_filter_through_aggregate(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -23,34 +33,47 @@ def push_filter_through_aggregate(rel: Rel, optimize_rel, fn_names) -> Rel | Non
     if input_rel.WhichOneof("rel_type") != "aggregate":
         return None
 
-    agg = input_rel.aggregate
-
-    # Only handle single grouping set.
-    if len(agg.groupings) != 1:
+    if emit_mapping(filter_rel) is not None:
         return None
 
-    grouping = agg.groupings[0]
-    num_grouping_exprs = len(grouping.grouping_expressions)
+    agg = input_rel.aggregate
 
-    if num_grouping_exprs == 0:
+    keys, sets = grouping_key_sets(agg)
+    if not keys or not sets:
         return None
 
     if not agg.HasField("input"):
         return None
 
-    # Build mapping: output_idx -> input_field_idx.
-    # Only proceed if ALL grouping expressions are simple field references.
-    output_to_input: dict[int, int] = {}
-    for i, gexpr in enumerate(grouping.grouping_expressions):
+    # Keys grouped by in every grouping set, hence never null-filled.
+    common = set(sets[0]).intersection(*sets[1:])
+
+    # Build mapping: output_idx -> input_field_idx, for the common keys that
+    # are simple field references.
+    key_to_input: dict[int, int] = {}
+    for i in common:
+        gexpr = keys[i]
         if gexpr.WhichOneof("rex_type") != "selection":
-            return None
+            continue
         ref = gexpr.selection
         if ref.WhichOneof("reference_type") != "direct_reference":
-            return None
+            continue
         segment = ref.direct_reference
         if segment.WhichOneof("reference_type") != "struct_field":
-            return None
-        output_to_input[i] = segment.struct_field.field
+            continue
+        key_to_input[i] = segment.struct_field.field
+
+    if not key_to_input:
+        return None
+
+    # Output fields, after the emit, that are grouping keys.
+    agg_emit = emit_mapping(agg)
+    if agg_emit is None:
+        output_to_input = key_to_input
+    else:
+        output_to_input = {
+            i: key_to_input[idx] for i, idx in enumerate(agg_emit) if idx in key_to_input
+        }
 
     conjuncts = split_conjunction(filter_rel.condition, fn_names)
 
@@ -59,7 +82,7 @@ def push_filter_through_aggregate(rel: Rel, optimize_rel, fn_names) -> Rel | Non
 
     for conjunct in conjuncts:
         indices = collect_field_indices(conjunct)
-        if indices is not None and all(idx < num_grouping_exprs for idx in indices):
+        if indices is not None and all(idx in output_to_input for idx in indices):
             pushable.append(conjunct)
         else:
             remaining.append(conjunct)
@@ -72,24 +95,25 @@ def push_filter_through_aggregate(rel: Rel, optimize_rel, fn_names) -> Rel | Non
     func_ref = sf.function_reference if sf.ByteSize() else 0
     output_type = sf.output_type if sf.HasField("output_type") else None
 
-    # Remap field indices from output space to input space.
-    remapped = [remap_field_indices(p, output_to_input) for p in pushable]
-    push_cond = make_conjunction(remapped, func_ref, output_type)
+    # Remap field indices from output space to input space. The conjuncts
+    # belong to the consumed filter, so they are remapped in place.
+    for p in pushable:
+        remap_field_indices_in_place(p, output_to_input)
+    push_cond = make_conjunction(pushable, func_ref, output_type)
 
     new_filter = Rel()
-    new_filter.filter.input.CopyFrom(agg.input)
-    new_filter.filter.condition.CopyFrom(push_cond)
+    put(new_filter.filter, "input", take(agg, "input"))
+    put(new_filter.filter, "condition", push_cond)
 
-    result = Rel()
-    result.aggregate.CopyFrom(agg)
-    result.aggregate.input.CopyFrom(optimize_rel(new_filter))
+    result = take(filter_rel, "input")
+    put(agg, "input", optimize_rel(new_filter))
 
     # Keep remaining predicates above the aggregate.
     if remaining:
         remaining_cond = make_conjunction(remaining, func_ref, output_type)
         wrapped = Rel()
-        wrapped.filter.input.CopyFrom(result)
-        wrapped.filter.condition.CopyFrom(remaining_cond)
+        put(wrapped.filter, "input", result)
+        put(wrapped.filter, "condition", remaining_cond)
         return wrapped
 
     return result
@@ -2,19 +2,27 @@
 
 Handles single predicates referencing one side, and conjunction splitting:
 AND(left_pred, right_pred, mixed_pred) pushes left/right parts to their
-respective sides. Mixed predicates convert the cross join to an inner join.
+respective sides. Mixed predicates convert the cross join to an inner join,
+whose condition lists equalities between the two sides first.
+References through the cross's emit are mapped back to its inputs first.
 """
 
+from dispatch import matches
 from helpers import (
-    adjust_field_indices,
+    adjust_field_indices_in_place,
     collect_field_indices,
-    count_output_fields,
+    emit_mapping,
+    equalities_first,
     make_conjunction,
+    remap_field_indices_in_place,
     split_conjunction,
 )
+from ownership import put, take
+from schema import output_field_count
 from substrait.algebra_pb2 import JoinRel, Rel
 
 
+@matches(("filter", "cross"))
 def push_filter_through_cross(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -24,13 +32,27 @@ def push_filter_through_cross(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if input_rel.WhichOneof("rel_type") != "cross":
         return None
 
+    if emit_mapping(filter_rel) is not None:
+        return None
+
     cross = input_rel.cross
-    left_field_count = count_output_fields(cross.left)
+    left_field_count = output_field_count(cross.left)
     if left_field_count is None:
         return None
 
     conjuncts = split_conjunction(filter_rel.condition, fn_names)
 
+    # With an emit, every conjunct must be mapped back to the inputs' fields,
+    # since mixed predicates end up in the join condition.
+    cross_emit = emit_mapping(cross)
+    if cross_emit is not None:
+        for conjunct in conjuncts:
+            indices = collect_field_indices(conjunct)
+            if indices is None or any(idx >= len(cross_emit) for idx in indices):
+                return None
+        for conjunct in conjuncts:
+            remap_field_indices_in_place(conjunct, dict(enumerate(cross_emit)))
+
     left_preds = []
     right_preds = []
     mixed_preds = []
@@ -63,41 +85,41 @@ def push_filter_through_cross(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if left_preds:
         left_cond = make_conjunction(left_preds, func_ref, output_type)
         new_left = Rel()
-        new_left.filter.input.CopyFrom(cross.left)
-        new_left.filter.condition.CopyFrom(left_cond)
+        put(new_left.filter, "input", take(cross, "left"))
+        put(new_left.filter, "condition", left_cond)
         built_left = optimize_rel(new_left)
     else:
-        built_left = optimize_rel(cross.left)
+        built_left = optimize_rel(take(cross, "left"))
 
     # Build right input (with index adjustment).
     if right_preds:
-        adjusted = [
-            adjust_field_indices(p, -left_field_count) for p in right_preds
-        ]
-        right_cond = make_conjunction(adjusted, func_ref, output_type)
+        for p in right_preds:
+            adjust_field_indices_in_place(p, -left_field_count)
+        right_cond = make_conjunction(right_preds, func_ref, output_type)
         new_right = Rel()
-        new_right.filter.input.CopyFrom(cross.right)
-        new_right.filter.condition.CopyFrom(right_cond)
+        put(new_right.filter, "input", take(cross, "right"))
+        put(new_right.filter, "condition", right_cond)
         built_right = optimize_rel(new_right)
     else:
-        built_right = optimize_rel(cross.right)
+        built_right = optimize_rel(take(cross, "right"))
 
     # If there are mixed predicates, convert to inner join.
     if mixed_preds:
+        mixed_preds = equalities_first(mixed_preds, left_field_count, fn_names)
         join_expr = make_conjunction(mixed_preds, func_ref, output_type)
         result = Rel()
-        result.join.left.CopyFrom(built_left)
-        result.join.right.CopyFrom(built_right)
-        result.join.expression.CopyFrom(join_expr)
+        put(result.join, "left", built_left)
+        put(result.join, "right", built_right)
+        put(result.join, "expression", join_expr)
         result.join.type = JoinRel.JOIN_TYPE_INNER
         if cross.HasField("common"):
-            result.join.common.CopyFrom(cross.common)
+            put(result.join, "common", take(cross, "common"))
         return result
 
     # No mixed predicates — keep as cross join.
     result = Rel()
-    result.cross.left.CopyFrom(built_left)
-    result.cross.right.CopyFrom(built_right)
+    put(result.cross, "left", built_left)
+    put(result.cross, "right", built_right)
     if cross.HasField("common"):
-        result.cross.common.CopyFrom(cross.common)
+        put(result.cross, "common", take(cross, "common"))
     return result
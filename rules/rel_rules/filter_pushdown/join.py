@@ -6,17 +6,34 @@ Handles join-type-dependent pushability:
 - RIGHT/RIGHT_SEMI/RIGHT_ANTI/RIGHT_SINGLE/RIGHT_MARK: push right-only to right only
 - OUTER/UNSPECIFIED: don't push anything
 
+Semi, anti and mark joins output only one side (plus the mark column), so
+the filter's field references are placed on that side; references through
+the join's emit are mapped back to its inputs first.
+
 Supports conjunction splitting — AND(left_pred, right_pred, mixed_pred)
 pushes applicable parts to their respective sides and keeps the rest above.
+
+An INNER join absorbs deterministic mixed predicates into its condition, so
+they are evaluated while matching rather than on the joined output:
+Filter(Join(L, R, ON c), mixed) -> Join(L, R, ON c AND mixed). The condition
+lists equalities between the two sides first (see `equalities_first`).
 """
 
+from dispatch import matches
 from helpers import (
-    adjust_field_indices,
+    adjust_field_indices_in_place,
     collect_field_indices,
-    count_output_fields,
+    emit_mapping,
+    equalities_first,
+    function_anchor,
+    is_deterministic,
     make_conjunction,
+    remap_field_indices_in_place,
     split_conjunction,
 )
+from interning import intern
+from ownership import put, take
+from schema import join_type_name, output_field_count
 from substrait.algebra_pb2 import Rel
 
 # JoinType enum values that allow pushing to the left input
@@ -27,7 +44,11 @@ CAN_PUSH_LEFT = {1, 3, 5, 6, 7, 11}
 CAN_PUSH_RIGHT = {1, 4, 8, 9, 10, 12}
 # INNER, RIGHT, RIGHT_SEMI, RIGHT_ANTI, RIGHT_SINGLE, RIGHT_MARK
 
+# Join types whose output starts with the right input's fields.
+RIGHT_ONLY_OUTPUT = {"RIGHT_SEMI", "RIGHT_ANTI", "RIGHT_MARK"}
+
 
+@matches(("filter", "join"))
 def push_filter_through_join(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -45,28 +66,53 @@ def push_filter_through_join(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if not can_left and not can_right:
         return None
 
-    left_field_count = count_output_fields(join.left)
-    if left_field_count is None:
+    if emit_mapping(filter_rel) is not None:
+        return None
+
+    left_field_count = output_field_count(join.left)
+    right_field_count = output_field_count(join.right)
+    if left_field_count is None or right_field_count is None:
         return None
 
+    # Position of the right input's first field in the join's output, before its emit.
+    right_start = 0 if join_type_name(join) in RIGHT_ONLY_OUTPUT else left_field_count
+    join_emit = emit_mapping(join)
+
     conjuncts = split_conjunction(filter_rel.condition, fn_names)
 
+    absorb = join_type == 1  # INNER
     left_preds = []
     right_preds = []
+    mixed_preds = []
     remaining_preds = []
 
     for conjunct in conjuncts:
         indices = collect_field_indices(conjunct)
+        if indices is not None and join_emit is not None:
+            if any(idx >= len(join_emit) for idx in indices):
+                indices = None
+            else:
+                indices = {join_emit[idx] for idx in indices}
         if indices is None:
             remaining_preds.append(conjunct)
         elif can_left and all(idx < left_field_count for idx in indices):
             left_preds.append(conjunct)
-        elif can_right and all(idx >= left_field_count for idx in indices):
+        elif can_right and all(
+            right_start <= idx < right_start + right_field_count for idx in indices
+        ):
             right_preds.append(conjunct)
+        elif absorb and indices and is_deterministic(intern(conjunct), fn_names):
+            mixed_preds.append(conjunct)
         else:
             remaining_preds.append(conjunct)
 
-    if not left_preds and not right_preds:
+    # Absorbing into an existing condition, or several predicates, needs an AND.
+    and_ref = function_anchor("and", fn_names)
+    if mixed_preds and and_ref is None and (join.HasField("expression") or len(mixed_preds) > 1):
+        remaining_preds.extend(mixed_preds)
+        mixed_preds = []
+
+    if not left_preds and not right_preds and not mixed_preds:
         return None
 
     # Grab AND metadata for reconstructing conjunctions.
@@ -74,47 +120,49 @@ def push_filter_through_join(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     func_ref = sf.function_reference if sf.ByteSize() else 0
     output_type = sf.output_type if sf.HasField("output_type") else None
 
+    if join_emit is not None:
+        for p in left_preds + right_preds + mixed_preds:
+            remap_field_indices_in_place(p, dict(enumerate(join_emit)))
+
     # Build left input.
     if left_preds:
         left_cond = make_conjunction(left_preds, func_ref, output_type)
         new_left = Rel()
-        new_left.filter.input.CopyFrom(join.left)
-        new_left.filter.condition.CopyFrom(left_cond)
+        put(new_left.filter, "input", take(join, "left"))
+        put(new_left.filter, "condition", left_cond)
         built_left = optimize_rel(new_left)
     else:
-        built_left = optimize_rel(join.left)
+        built_left = optimize_rel(take(join, "left"))
 
     # Build right input (with index adjustment).
     if right_preds:
-        adjusted = [
-            adjust_field_indices(p, -left_field_count) for p in right_preds
-        ]
-        right_cond = make_conjunction(adjusted, func_ref, output_type)
+        for p in right_preds:
+            adjust_field_indices_in_place(p, -right_start)
+        right_cond = make_conjunction(right_preds, func_ref, output_type)
         new_right = Rel()
-        new_right.filter.input.CopyFrom(join.right)
-        new_right.filter.condition.CopyFrom(right_cond)
+        put(new_right.filter, "input", take(join, "right"))
+        put(new_right.filter, "condition", right_cond)
         built_right = optimize_rel(new_right)
     else:
-        built_right = optimize_rel(join.right)
-
-    # Build the join, preserving all original metadata.
-    new_join = Rel()
-    new_join.join.left.CopyFrom(built_left)
-    new_join.join.right.CopyFrom(built_right)
-    new_join.join.type = join.type
-    if join.HasField("expression"):
-        new_join.join.expression.CopyFrom(join.expression)
-    if join.HasField("post_join_filter"):
-        new_join.join.post_join_filter.CopyFrom(join.post_join_filter)
-    if join.HasField("common"):
-        new_join.join.common.CopyFrom(join.common)
+        built_right = optimize_rel(take(join, "right"))
+
+    # Reuse the join node itself, preserving all original metadata.
+    new_join = take(filter_rel, "input")
+    put(join, "left", built_left)
+    put(join, "right", built_right)
+
+    if mixed_preds:
+        if join.HasField("expression"):
+            mixed_preds = split_conjunction(take(join, "expression"), fn_names) + mixed_preds
+        mixed_preds = equalities_first(mixed_preds, left_field_count, fn_names)
+        put(join, "expression", make_conjunction(mixed_preds, and_ref, output_type))
 
     # Wrap with remaining predicates if any.
     if remaining_preds:
         remaining_cond = make_conjunction(remaining_preds, func_ref, output_type)
         result = Rel()
-        result.filter.input.CopyFrom(new_join)
-        result.filter.condition.CopyFrom(remaining_cond)
+        put(result.filter, "input", new_join)
+        put(result.filter, "condition", remaining_cond)
         return result
 
     return new_join
@@ -0,0 +1,170 @@
+"""Push single-side conjuncts of a join's own conditions into its inputs.
+
+Join(L, R, ON left_pred AND right_pred AND mixed) ->
+    Join(Filter(L, left_pred), Filter(R, right_pred), ON mixed)
+
+The ON clause decides which pairs match, so a side can be filtered when the
+rows failing the predicate would never match anyway and are not kept
+unmatched. That mirrors the rules for a filter above the join:
+- INNER, LEFT_SEMI, RIGHT_SEMI: push to both sides
+- LEFT/LEFT_ANTI/LEFT_SINGLE/LEFT_MARK: push right-only to right only
+- RIGHT/RIGHT_ANTI/RIGHT_SINGLE/RIGHT_MARK: push left-only to left only
+- OUTER/UNSPECIFIED: don't push anything
+
+The ON clause always references the left fields followed by the right
+ones. `post_join_filter` is applied to the join's output, so it follows the
+rules of a filter above the join (see join.py).
+"""
+
+from dispatch import matches
+from filter_pushdown.join import CAN_PUSH_LEFT, CAN_PUSH_RIGHT, RIGHT_ONLY_OUTPUT
+from helpers import (
+    adjust_field_indices_in_place,
+    collect_field_indices,
+    make_conjunction,
+    split_conjunction,
+)
+from ownership import put, take
+from schema import join_type_name, output_field_count
+from substrait.algebra_pb2 import Expression, Rel
+
+# JoinType enum values whose ON clause conjuncts can be pushed to the left input
+ON_PUSH_LEFT = {1, 4, 5, 8, 9, 10, 12}
+# INNER, RIGHT, LEFT_SEMI, RIGHT_SEMI, RIGHT_ANTI, RIGHT_SINGLE, RIGHT_MARK
+
+# JoinType enum values whose ON clause conjuncts can be pushed to the right input
+ON_PUSH_RIGHT = {1, 3, 5, 8, 6, 7, 11}
+# INNER, LEFT, LEFT_SEMI, RIGHT_SEMI, LEFT_ANTI, LEFT_SINGLE, LEFT_MARK
+
+
+@matches(("join", None))
+def push_join_conditions_into_inputs(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "join":
+        return None
+    join = rel.join
+
+    left_field_count = output_field_count(join.left)
+    right_field_count = output_field_count(join.right)
+    if left_field_count is None or right_field_count is None:
+        return None
+
+    # Conditions to filter each input by, one per join condition pushed from.
+    left_conds: list[Expression] = []
+    right_conds: list[Expression] = []
+
+    if join.HasField("expression"):
+        split = _split_off(
+            join.expression,
+            fn_names,
+            join.type in ON_PUSH_LEFT,
+            join.type in ON_PUSH_RIGHT,
+            left_field_count,
+            (left_field_count, right_field_count),
+        )
+        if split is not None:
+            remaining, left_cond, right_cond = split
+            put(join, "expression", remaining if remaining is not None else _true())
+            _append(left_conds, left_cond)
+            _append(right_conds, right_cond)
+
+    if join.HasField("post_join_filter"):
+        right_start = 0 if join_type_name(join) in RIGHT_ONLY_OUTPUT else left_field_count
+        split = _split_off(
+            join.post_join_filter,
+            fn_names,
+            join.type in CAN_PUSH_LEFT,
+            join.type in CAN_PUSH_RIGHT,
+            left_field_count,
+            (right_start, right_field_count),
+        )
+        if split is not None:
+            remaining, left_cond, right_cond = split
+            if remaining is not None:
+                put(join, "post_join_filter", remaining)
+            else:
+                join.ClearField("post_join_filter")
+            _append(left_conds, left_cond)
+            _append(right_conds, right_cond)
+
+    if not left_conds and not right_conds:
+        return None
+
+    if left_conds:
+        put(join, "left", optimize_rel(_filter(take(join, "left"), left_conds)))
+    if right_conds:
+        put(join, "right", optimize_rel(_filter(take(join, "right"), right_conds)))
+    return rel
+
+
+def _split_off(
+    condition: Expression,
+    fn_names: dict[int, str],
+    can_left: bool,
+    can_right: bool,
+    left_field_count: int,
+    right_fields: tuple[int, int],
+) -> tuple[Expression | None, Expression | None, Expression | None] | None:
+    """Split the conjuncts of `condition` that reference one pushable side off.
+
+    `right_fields` is (start, count) of the right input's fields in the
+    condition's input. Returns the conjunction of the conjuncts kept, of those
+    for the left input and of those for the right input (relative to it),
+    each None if empty; or None if nothing can be pushed.
+    """
+    if not can_left and not can_right:
+        return None
+
+    right_start, right_field_count = right_fields
+    conjuncts = split_conjunction(condition, fn_names)
+
+    left_preds = []
+    right_preds = []
+    remaining = []
+    for conjunct in conjuncts:
+        indices = collect_field_indices(conjunct)
+        if not indices:
+            # Unanalyzable, or a constant such as the `true` left behind once
+            # everything else is pushed.
+            remaining.append(conjunct)
+        elif can_left and all(idx < left_field_count for idx in indices):
+            left_preds.append(conjunct)
+        elif can_right and all(
+            right_start <= idx < right_start + right_field_count for idx in indices
+        ):
+            adjust_field_indices_in_place(conjunct, -right_start)
+            right_preds.append(conjunct)
+        else:
+            remaining.append(conjunct)
+
+    if not left_preds and not right_preds:
+        return None
+
+    # Grab AND metadata for reconstructing conjunctions.
+    sf = condition.scalar_function
+    func_ref = sf.function_reference if sf.ByteSize() else 0
+    output_type = sf.output_type if sf.HasField("output_type") else None
+    return tuple(
+        make_conjunction(preds, func_ref, output_type) if preds else None
+        for preds in (remaining, left_preds, right_preds)
+    )
+
+
+def _append(conds: list[Expression], cond: Expression | None) -> None:
+    if cond is not None:
+        conds.append(cond)
+
+
+def _filter(input_rel: Rel, conds: list[Expression]) -> Rel:
+    """Stack a filter for each condition on `input_rel`."""
+    for cond in conds:
+        result = Rel()
+        put(result.filter, "input", input_rel)
+        put(result.filter, "condition", cond)
+        input_rel = result
+    return input_rel
+
+
+def _true() -> Expression:
+    result = Expression()
+    result.literal.boolean = True
+    return result
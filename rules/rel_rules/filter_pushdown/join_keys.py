@@ -0,0 +1,199 @@
+"""Infer `is_not_null` filters on the equi-join keys of inner and semi joins.
+
+Join(L, R, ON a.x = b.y): `equal` is null when either key is, so rows with a
+null key never match. INNER and SEMI joins drop unmatched rows, so
+
+    Join(L, R, ON a.x = b.y) ->
+        Join(Filter(L, is_not_null(a.x)), Filter(R, is_not_null(b.y)), ON a.x = b.y)
+
+The filters then move down like any other and reach the reads'
+best_effort_filter, letting the readers skip null keys.
+
+A key gets no filter when it is known not to be null: its type is
+non-nullable (e.g. in the read's base_schema), or a filter below already
+rejects its nulls. Since the inferred filters are pushed to where this
+analysis looks for them, the rule fires once per key. The plan must declare
+`is_not_null`; the rule cannot add function declarations.
+"""
+
+from dispatch import matches
+from filter_pushdown.outer_join import NULL_PROPAGATING_FUNCTIONS, rejects_nulls
+from helpers import emit_mapping, function_anchor, split_conjunction
+from ownership import put, take
+from schema import grouping_key_sets, is_nullable, join_type_name, output_field_count, output_types
+from substrait.algebra_pb2 import Expression, Rel
+from substrait.type_pb2 import Type
+
+# JoinType enum values that drop rows whose keys match nothing
+NULL_KEY_JOIN_TYPES = {1, 5, 8}
+# INNER, LEFT_SEMI, RIGHT_SEMI
+
+_BOOLEAN = Type()
+_BOOLEAN.bool.nullability = Type.NULLABILITY_REQUIRED
+
+
+@matches(("join", None))
+def infer_join_key_not_null(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "join":
+        return None
+    join = rel.join
+    if join.type not in NULL_KEY_JOIN_TYPES or not join.HasField("expression"):
+        return None
+
+    is_not_null = function_anchor("is_not_null", fn_names)
+    if is_not_null is None:
+        return None
+
+    left_field_count = output_field_count(join.left)
+    if left_field_count is None:
+        return None
+
+    left_keys: list[int] = []
+    right_keys: list[int] = []
+    for left, right in _equi_keys(join.expression, left_field_count, fn_names):
+        if left not in left_keys and not known_not_null(join.left, left, fn_names):
+            left_keys.append(left)
+        if right not in right_keys and not known_not_null(join.right, right, fn_names):
+            right_keys.append(right)
+
+    if not left_keys and not right_keys:
+        return None
+
+    if left_keys:
+        put(join, "left", optimize_rel(_filter(take(join, "left"), left_keys, is_not_null)))
+    if right_keys:
+        put(join, "right", optimize_rel(_filter(take(join, "right"), right_keys, is_not_null)))
+    return rel
+
+
+def _equi_keys(condition: Expression, left_field_count: int, fn_names) -> list[tuple[int, int]]:
+    """(left field, right field) pairs equated by `equal` conjuncts of an ON
+    clause, with the right field relative to the right input."""
+    pairs = []
+    for conjunct in split_conjunction(condition, fn_names):
+        if conjunct.WhichOneof("rex_type") != "scalar_function":
+            continue
+        sf = conjunct.scalar_function
+        if fn_names.get(sf.function_reference, "").split(":", 1)[0] != "equal":
+            continue
+        fields = [_field(arg.value) for arg in sf.arguments if arg.HasField("value")]
+        if len(fields) != 2 or None in fields:
+            continue
+        left, right = sorted(fields)
+        if left < left_field_count <= right:
+            pairs.append((left, right - left_field_count))
+    return pairs
+
+
+def _field(expr: Expression) -> int | None:
+    if expr.WhichOneof("rex_type") != "selection":
+        return None
+    ref = expr.selection
+    if ref.WhichOneof("root_type") not in (None, "root_reference"):
+        return None
+    segment = ref.direct_reference
+    if segment.WhichOneof("reference_type") != "struct_field":
+        return None
+    if segment.struct_field.HasField("child"):
+        return None
+    return segment.struct_field.field
+
+
+def known_not_null(rel: Rel, field: int, fn_names: dict[int, str]) -> bool:
+    """Whether output `field` of `rel` is known never to be null.
+
+    That is the case when its type is non-nullable, or, looking down through
+    the operators filters are pushed through, a filter rejects its nulls.
+    """
+    types = output_types(rel)
+    if types is None or field >= len(types):
+        return False
+    if not is_nullable(types[field]):
+        return True
+
+    rel_type = rel.WhichOneof("rel_type")
+    if rel_type is None:
+        return False
+    inner = getattr(rel, rel_type)
+    emit = emit_mapping(inner)
+    if emit is not None:
+        field = emit[field]
+
+    if rel_type == "filter":
+        for conjunct in split_conjunction(inner.condition, fn_names):
+            if rejects_nulls(conjunct, lambda idx: idx == field, fn_names):
+                return True
+        return known_not_null(inner.input, field, fn_names)
+    if rel_type in ("sort", "fetch"):
+        return known_not_null(inner.input, field, fn_names)
+    if rel_type == "project":
+        input_count = output_field_count(inner.input)
+        if input_count is None:
+            return False
+        if field < input_count:
+            return known_not_null(inner.input, field, fn_names)
+        return _expression_not_null(inner.expressions[field - input_count], inner.input, fn_names)
+    if rel_type == "aggregate":
+        keys, sets = grouping_key_sets(inner)
+        if field >= len(keys) or not all(field in indices for indices in sets):
+            return False
+        return _expression_not_null(keys[field], inner.input, fn_names)
+    if rel_type == "set":
+        return all(known_not_null(inp, field, fn_names) for inp in inner.inputs)
+    if rel_type in ("join", "cross"):
+        return _join_field_not_null(rel_type, inner, field, fn_names)
+    return False
+
+
+def _join_field_not_null(rel_type: str, inner, field: int, fn_names) -> bool:
+    left_count = output_field_count(inner.left)
+    if left_count is None:
+        return False
+    join_type = join_type_name(inner) if rel_type == "join" else "INNER"
+    if join_type in ("RIGHT_SEMI", "RIGHT_ANTI", "RIGHT_MARK"):
+        return known_not_null(inner.right, field, fn_names)
+    if field < left_count:
+        if join_type in ("RIGHT", "OUTER", "RIGHT_SINGLE"):
+            return False
+        return known_not_null(inner.left, field, fn_names)
+    if join_type in ("LEFT", "OUTER", "LEFT_SINGLE", "LEFT_SEMI", "LEFT_ANTI", "LEFT_MARK"):
+        return False
+    return known_not_null(inner.right, field - left_count, fn_names)
+
+
+def _expression_not_null(expr: Expression, input_rel: Rel, fn_names) -> bool:
+    """Whether `expr`, evaluated over `input_rel`, is known never to be null."""
+    rex_type = expr.WhichOneof("rex_type")
+    if rex_type == "literal":
+        return expr.literal.WhichOneof("literal_type") != "null"
+    if rex_type == "selection":
+        field = _field(expr)
+        return field is not None and known_not_null(input_rel, field, fn_names)
+    if rex_type == "scalar_function":
+        sf = expr.scalar_function
+        if fn_names.get(sf.function_reference, "").split(":", 1)[0] not in NULL_PROPAGATING_FUNCTIONS:
+            return False
+        return all(
+            _expression_not_null(arg.value, input_rel, fn_names)
+            for arg in sf.arguments
+            if arg.HasField("value")
+        )
+    if rex_type == "cast":
+        return _expression_not_null(expr.cast.input, input_rel, fn_names)
+    return False
+
+
+def _filter(input_rel: Rel, keys: list[int], is_not_null: int) -> Rel:
+    """Stack an `is_not_null(key)` filter for each key on `input_rel`."""
+    for key in keys:
+        condition = Expression()
+        sf = condition.scalar_function
+        sf.function_reference = is_not_null
+        sf.output_type.CopyFrom(_BOOLEAN)
+        sf.arguments.add().value.selection.direct_reference.struct_field.field = key
+        sf.arguments[0].value.selection.root_reference.SetInParent()
+        result = Rel()
+        put(result.filter, "input", input_rel)
+        put(result.filter, "condition", condition)
+        input_rel = result
+    return input_rel
@@ -1,13 +1,24 @@
 """Merge adjacent filters: Filter(outer, Filter(inner, X)) -> Filter(AND(outer, inner), X).
 
 Merging creates optimization opportunities for other pushdown rules to fire
-on the combined predicate.
+on the combined predicate. Conjuncts repeated across the two filters are
+kept once.
 """
 
-from helpers import make_conjunction
+from dispatch import matches
+from helpers import (
+    dedupe_conjuncts,
+    emit_mapping,
+    function_anchor,
+    make_conjunction,
+    map_through_emit,
+    split_conjunction,
+)
+from ownership import put, take
 from substrait.algebra_pb2 import Rel
 
 
+@matches(("filter", "filter"))
 def merge_adjacent_filters(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -19,13 +30,7 @@ def merge_adjacent_filters(rel: Rel, optimize_rel, fn_names) -> Rel | None:
 
     inner_filter = input_rel.filter
 
-    # Find the AND function anchor from fn_names.
-    and_anchor = None
-    for anchor, name in fn_names.items():
-        if name == "and" or name.startswith("and:"):
-            and_anchor = anchor
-            break
-
+    and_anchor = function_anchor("and", fn_names)
     if and_anchor is None:
         return None
 
@@ -38,16 +43,31 @@ def merge_adjacent_filters(rel: Rel, optimize_rel, fn_names) -> Rel | None:
                 output_type = sf.output_type
                 break
 
-    # Build merged condition: AND(outer_cond, inner_cond).
-    merged_cond = make_conjunction(
-        [filter_rel.condition, inner_filter.condition],
-        and_anchor,
-        output_type,
+    # The outer condition sees the inner filter's emitted fields; once merged
+    # it is evaluated on the inner filter's input.
+    inner_emit = emit_mapping(inner_filter)
+    if inner_emit is not None and not map_through_emit(filter_rel.condition, inner_emit):
+        return None
+    outer_emit = emit_mapping(filter_rel)
+
+    # Build merged condition: AND(outer conjuncts, inner conjuncts).
+    outer_cond = take(filter_rel, "condition")
+    inner_cond = take(inner_filter, "condition")
+    conjuncts = dedupe_conjuncts(
+        split_conjunction(outer_cond, fn_names) + split_conjunction(inner_cond, fn_names),
+        fn_names,
     )
+    merged_cond = make_conjunction(conjuncts, and_anchor, output_type)
 
     # Build merged filter and re-optimize so downstream rules can fire.
     merged = Rel()
-    merged.filter.input.CopyFrom(inner_filter.input)
-    merged.filter.condition.CopyFrom(merged_cond)
+    put(merged.filter, "input", take(inner_filter, "input"))
+    put(merged.filter, "condition", merged_cond)
+    if inner_emit is not None and outer_emit is not None:
+        merged.filter.common.emit.output_mapping.extend(inner_emit[i] for i in outer_emit)
+    elif inner_emit is not None:
+        merged.filter.common.emit.output_mapping.extend(inner_emit)
+    elif outer_emit is not None:
+        merged.filter.common.emit.output_mapping.extend(outer_emit)
 
     return optimize_rel(merged)
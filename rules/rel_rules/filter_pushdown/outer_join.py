@@ -0,0 +1,150 @@
+"""Simplify outer joins under filters that reject their null-extended rows.
+
+Filter(Join(L, R, LEFT), R.x > 0): a LEFT join fills the right fields of its
+unmatched left rows with nulls, and `null > 0` is never true, so the filter
+drops every one of them. The join then returns the same rows as an INNER
+join, whose predicates can be pushed to both sides.
+
+A predicate rejects nulls from a side if it cannot be true when all of that
+side's fields are null:
+- a conjunction if any conjunct does, a disjunction if every disjunct does
+- `is_not_null(x)` if `x` is null whenever those fields are
+- any other expression if it is null whenever those fields are: a reference
+  to one of them, or a null-propagating function (comparison, arithmetic,
+  ...) or cast of such an expression
+
+The join type changes as follows:
+- LEFT -> INNER when the filter rejects nulls from the right side
+- RIGHT -> INNER when it rejects nulls from the left side
+- OUTER -> LEFT, RIGHT or INNER, dropping each side whose unmatched rows
+  the filter removes
+"""
+
+from dispatch import matches
+from helpers import emit_mapping
+from schema import join_type_name, output_field_count
+from substrait.algebra_pb2 import Expression, Rel
+
+# Functions that return null whenever any of their arguments is null.
+NULL_PROPAGATING_FUNCTIONS = frozenset(
+    {
+        "equal",
+        "not_equal",
+        "lt",
+        "gt",
+        "lte",
+        "gte",
+        "between",
+        "not",
+        "add",
+        "subtract",
+        "multiply",
+        "divide",
+        "modulus",
+        "negate",
+        "abs",
+        "like",
+        "starts_with",
+        "ends_with",
+        "contains",
+        "substring",
+        "lower",
+        "upper",
+    }
+)
+
+# Join type after dropping the sides the filter removes unmatched rows of,
+# by (left rows kept unmatched, right rows kept unmatched).
+_SIMPLIFIED = {
+    (True, True): "OUTER",
+    (True, False): "LEFT",
+    (False, True): "RIGHT",
+    (False, False): "INNER",
+}
+
+
+@matches(("filter", "join"))
+def simplify_outer_join(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "filter":
+        return None
+    filter_rel = rel.filter
+    input_rel = filter_rel.input
+    if input_rel.WhichOneof("rel_type") != "join":
+        return None
+    join = input_rel.join
+
+    join_type = join_type_name(join)
+    if join_type not in ("LEFT", "RIGHT", "OUTER"):
+        return None
+
+    left_field_count = output_field_count(join.left)
+    right_field_count = output_field_count(join.right)
+    if left_field_count is None or right_field_count is None:
+        return None
+    join_fields = list(range(left_field_count + right_field_count))
+    join_emit = emit_mapping(join)
+    if join_emit is not None:
+        join_fields = join_emit
+
+    def left_side(idx: int) -> bool:
+        return idx < len(join_fields) and join_fields[idx] < left_field_count
+
+    def right_side(idx: int) -> bool:
+        return idx < len(join_fields) and join_fields[idx] >= left_field_count
+
+    keep_left = join_type in ("LEFT", "OUTER")
+    keep_right = join_type in ("RIGHT", "OUTER")
+    # Unmatched left rows have null right fields, and vice versa.
+    if keep_left and rejects_nulls(filter_rel.condition, right_side, fn_names):
+        keep_left = False
+    if keep_right and rejects_nulls(filter_rel.condition, left_side, fn_names):
+        keep_right = False
+
+    simplified = _SIMPLIFIED[(keep_left, keep_right)]
+    if simplified == join_type:
+        return None
+    join.type = type(join).JoinType.Value("JOIN_TYPE_" + simplified)
+    return rel
+
+
+def rejects_nulls(expr: Expression, side, fn_names: dict[int, str]) -> bool:
+    """Whether `expr` cannot be true when the fields `side` accepts are null."""
+    if expr.WhichOneof("rex_type") == "scalar_function":
+        sf = expr.scalar_function
+        name = _function_name(sf, fn_names)
+        args = [arg.value for arg in sf.arguments if arg.HasField("value")]
+        if name == "and":
+            return any(rejects_nulls(arg, side, fn_names) for arg in args)
+        if name == "or":
+            return bool(args) and all(rejects_nulls(arg, side, fn_names) for arg in args)
+        if name == "is_not_null":
+            return len(args) == 1 and _null_when(args[0], side, fn_names)
+    return _null_when(expr, side, fn_names)
+
+
+def _null_when(expr: Expression, side, fn_names: dict[int, str]) -> bool:
+    """Whether `expr` is null when the fields `side` accepts are null."""
+    rex_type = expr.WhichOneof("rex_type")
+    if rex_type == "selection":
+        ref = expr.selection
+        if ref.WhichOneof("root_type") not in (None, "root_reference"):
+            return False
+        if ref.WhichOneof("reference_type") != "direct_reference":
+            return False
+        if ref.direct_reference.WhichOneof("reference_type") != "struct_field":
+            return False
+        return side(ref.direct_reference.struct_field.field)
+    if rex_type == "scalar_function":
+        sf = expr.scalar_function
+        if _function_name(sf, fn_names) not in NULL_PROPAGATING_FUNCTIONS:
+            return False
+        return any(
+            _null_when(arg.value, side, fn_names) for arg in sf.arguments if arg.HasField("value")
+        )
+    if rex_type == "cast":
+        return _null_when(expr.cast.input, side, fn_names)
+    return False
+
+
+def _function_name(sf, fn_names: dict[int, str]) -> str:
+    return fn_names.get(sf.function_reference, "").split(":", 1)[0]
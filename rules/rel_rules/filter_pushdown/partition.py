@@ -0,0 +1,263 @@
+"""Prune the files of a local_files read by their partition values.
+
+Hive-style layouts encode partition columns in the file paths:
+
+    s3://bucket/events/year=2024/country=NL/part-0.parquet
+
+A file only holds rows whose `year` and `country` have those values, so a
+best_effort_filter (set by `push_filter_into_read`) that is not true for
+them rules the whole file out. Such files are dropped from the read; when
+none is left, the read becomes an empty virtual table.
+
+A `key=value` path segment gives the value of the base_schema field named
+`key`, parsed according to its type (integers, floats, strings, booleans
+and dates). `__HIVE_DEFAULT_PARTITION__` stands for null. The filter is
+evaluated with SQL's three-valued logic over those values and literals;
+anything else (other fields, functions not modeled here) is unknown, and a
+file is kept unless the filter is known to be false or null for it.
+"""
+
+import struct
+from datetime import date
+from urllib.parse import unquote
+
+from dispatch import matches
+from substrait.algebra_pb2 import Rel
+
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+
+# Stands for a value the filter evaluation cannot determine.
+_UNKNOWN = object()
+
+_EPOCH = date(1970, 1, 1)
+
+_COMPARISONS = {
+    "equal": lambda a, b: a == b,
+    "not_equal": lambda a, b: a != b,
+    "lt": lambda a, b: a < b,
+    "gt": lambda a, b: a > b,
+    "lte": lambda a, b: a <= b,
+    "gte": lambda a, b: a >= b,
+}
+
+
+@matches(("read", None))
+def prune_partitions(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "read":
+        return None
+    read = rel.read
+    if not read.HasField("local_files") or not read.HasField("best_effort_filter"):
+        return None
+
+    fields = _partition_fields(read)
+    if not fields:
+        return None
+
+    items = read.local_files.items
+    pruned = []
+    for i, item in enumerate(items):
+        row = _partition_values(item, fields)
+        if not row:
+            continue
+        result = _evaluate(read.best_effort_filter, row, fn_names)
+        if result is False or result is None:
+            pruned.append(i)
+    if not pruned:
+        return None
+
+    if len(pruned) < len(items):
+        for i in reversed(pruned):
+            del items[i]
+    else:
+        read.ClearField("local_files")
+        read.virtual_table.SetInParent()
+    return rel
+
+
+def _partition_fields(read) -> dict[str, tuple[int, str]]:
+    """Map the names of the read's top-level base_schema fields of a
+    partitionable type to (field index, type kind)."""
+    schema = read.base_schema
+    fields = {}
+    position = 0
+    for index, field_type in enumerate(schema.struct.types):
+        if position >= len(schema.names):
+            return {}
+        kind = field_type.WhichOneof("kind")
+        if kind in _PARSERS:
+            fields[schema.names[position]] = (index, kind)
+        # Names list nested struct fields depth-first after their parent.
+        position += 1 + _nested_name_count(field_type)
+    return fields
+
+
+def _nested_name_count(field_type) -> int:
+    kind = field_type.WhichOneof("kind")
+    if kind == "struct":
+        return sum(1 + _nested_name_count(t) for t in field_type.struct.types)
+    if kind == "list":
+        return _nested_name_count(field_type.list.type)
+    if kind == "map":
+        return _nested_name_count(field_type.map.key) + _nested_name_count(field_type.map.value)
+    return 0
+
+
+def _partition_values(item, fields: dict[str, tuple[int, str]]) -> dict[int, object]:
+    """Field index -> value of the partition columns in a file's path."""
+    path_type = item.WhichOneof("path_type")
+    if path_type is None:
+        return {}
+    row = {}
+    for segment in getattr(item, path_type).split("/"):
+        key, sep, raw = segment.partition("=")
+        if not sep or key not in fields:
+            continue
+        index, kind = fields[key]
+        raw = unquote(raw)
+        if path_type == "uri_path_glob" and any(c in raw for c in "*?[{"):
+            row[index] = _UNKNOWN
+        elif raw == HIVE_NULL:
+            row[index] = None
+        else:
+            row[index] = _parse(raw, kind)
+    return row
+
+
+def _parse(raw: str, kind: str):
+    try:
+        return _PARSERS[kind](raw)
+    except (ValueError, OverflowError):
+        return _UNKNOWN
+
+
+def _parse_bool(raw: str) -> bool:
+    lowered = raw.lower()
+    if lowered not in ("true", "false"):
+        raise ValueError(raw)
+    return lowered == "true"
+
+
+def _parse_date(raw: str) -> int:
+    return (date.fromisoformat(raw) - _EPOCH).days
+
+
+def _parse_fp32(raw: str) -> float:
+    # fp32 literals hold float32 values; round the partition value to match.
+    # Values out of float32's range raise OverflowError.
+    return struct.unpack("f", struct.pack("f", float(raw)))[0]
+
+
+_PARSERS = {
+    "i8": int,
+    "i16": int,
+    "i32": int,
+    "i64": int,
+    "fp32": _parse_fp32,
+    "fp64": float,
+    "string": str,
+    "varchar": str,
+    "fixed_char": str,
+    "bool": _parse_bool,
+    "date": _parse_date,
+}
+
+
+def _evaluate(expr, row: dict[int, object], fn_names: dict[int, str]):
+    """Evaluate `expr` over the partition values in `row`: a value, None
+    for null, or _UNKNOWN."""
+    rex_type = expr.WhichOneof("rex_type")
+    if rex_type == "literal":
+        return _literal_value(expr.literal)
+    if rex_type == "selection":
+        ref = expr.selection
+        if ref.WhichOneof("root_type") not in (None, "root_reference"):
+            return _UNKNOWN
+        segment = ref.direct_reference
+        if segment.WhichOneof("reference_type") != "struct_field":
+            return _UNKNOWN
+        if segment.struct_field.HasField("child"):
+            return _UNKNOWN
+        return row.get(segment.struct_field.field, _UNKNOWN)
+    if rex_type == "singular_or_list":
+        return _evaluate_in(expr.singular_or_list, row, fn_names)
+    if rex_type != "scalar_function":
+        return _UNKNOWN
+
+    sf = expr.scalar_function
+    name = fn_names.get(sf.function_reference, "").split(":", 1)[0]
+    args = [_evaluate(arg.value, row, fn_names) for arg in sf.arguments if arg.HasField("value")]
+    if name == "and":
+        return _and(args)
+    if name == "or":
+        return _not(_and([_not(arg) for arg in args]))
+    if len(args) == 1:
+        if name == "not":
+            return _not(args[0])
+        if name in ("is_null", "is_not_null"):
+            if args[0] is _UNKNOWN:
+                return _UNKNOWN
+            return (args[0] is None) == (name == "is_null")
+    if name in _COMPARISONS and len(args) == 2:
+        return _compare(_COMPARISONS[name], *args)
+    if name == "between" and len(args) == 3:
+        return _and(
+            [
+                _compare(_COMPARISONS["gte"], args[0], args[1]),
+                _compare(_COMPARISONS["lte"], args[0], args[2]),
+            ]
+        )
+    return _UNKNOWN
+
+
+def _evaluate_in(or_list, row: dict[int, object], fn_names: dict[int, str]):
+    value = _evaluate(or_list.value, row, fn_names)
+    options = [_evaluate(option, row, fn_names) for option in or_list.options]
+    return _not(_and([_not(_compare(_COMPARISONS["equal"], value, o)) for o in options]))
+
+
+def _and(args: list):
+    if any(arg is False for arg in args):
+        return False
+    if any(arg is not None and not isinstance(arg, bool) for arg in args):
+        return _UNKNOWN
+    if any(arg is None for arg in args):
+        return None
+    return True
+
+
+def _not(arg):
+    if arg is _UNKNOWN or arg is None:
+        return arg
+    if not isinstance(arg, bool):
+        return _UNKNOWN
+    return not arg
+
+
+def _compare(op, left, right):
+    if left is _UNKNOWN or right is _UNKNOWN:
+        return _UNKNOWN
+    if left is None or right is None:
+        return None
+    numeric = (int, float)
+    if isinstance(left, bool) or isinstance(right, bool):
+        comparable = type(left) is type(right)
+    else:
+        comparable = type(left) is type(right) or (
+            isinstance(left, numeric) and isinstance(right, numeric)
+        )
+    if not comparable:
+        return _UNKNOWN
+    return op(left, right)
+
+
+def _literal_value(literal):
+    kind = literal.WhichOneof("literal_type")
+    if kind == "null":
+        return None
+    if kind in ("boolean", "i8", "i16", "i32", "i64", "fp32", "fp64", "string", "date"):
+        return getattr(literal, kind)
+    if kind == "fixed_char":
+        return literal.fixed_char
+    if kind == "var_char":
+        return literal.var_char.value
+    return _UNKNOWN
@@ -4,11 +4,15 @@ Applies to operators like sort and fetch that pass through the schema unchanged.
 Filtering earlier reduces the data flowing through these operators.
 """
 
+from dispatch import matches
+from helpers import emit_mapping, map_through_emit
+from ownership import put, take
 from substrait.algebra_pb2 import Rel
 
 PASSTHROUGH_TYPES = ("sort", "fetch")
 
 
+@matches(*(("filter", t) for t in PASSTHROUGH_TYPES))
 def push_filter_through_passthrough(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -27,13 +31,18 @@ def push_filter_through_passthrough(rel: Rel, optimize_rel, fn_names) -> Rel | N
 
     child_rel = getattr(input_rel, child_type)
 
+    # The condition sees the child's emitted fields; below the child it must
+    # reference the child's input fields instead.
+    child_emit = emit_mapping(child_rel)
+    if child_emit is not None and not map_through_emit(filter_rel.condition, child_emit):
+        return None
+
     new_filter = Rel()
-    new_filter.filter.input.CopyFrom(child_rel.input)
-    new_filter.filter.condition.CopyFrom(filter_rel.condition)
+    put(new_filter.filter, "input", take(child_rel, "input"))
+    put(new_filter.filter, "condition", take(filter_rel, "condition"))
     if filter_rel.HasField("common"):
-        new_filter.filter.common.CopyFrom(filter_rel.common)
+        put(new_filter.filter, "common", take(filter_rel, "common"))
 
-    result = Rel()
-    getattr(result, child_type).CopyFrom(child_rel)
-    getattr(result, child_type).input.CopyFrom(optimize_rel(new_filter))
+    result = take(filter_rel, "input")
+    put(child_rel, "input", optimize_rel(new_filter))
     return result
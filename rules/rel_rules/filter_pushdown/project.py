@@ -1,21 +1,43 @@
 """Push filter below project: Filter(Project(X)) -> Project(Filter(X)).
 
-Safe only when the filter condition references pass-through input fields,
-not computed expression fields, and the project has no emit mapping.
+Safe when the filter condition references pass-through fields: input
+fields, or expressions that are plain references to an input field. The
+filter sees the project's emitted fields, so its references are translated
+through the emit mapping (if any) to the input fields they pass through.
+
+A reference to a computed field is replaced by a copy of its expression
+when that expression is small and deterministic, so e.g. a filter on
+`col(1) + 1` can be pushed too (and reach the read's best_effort_filter).
+Window functions and subqueries are never substituted: a window function's
+value depends on the rows the project sees.
 
 Also handles conjunction splitting: AND(pushable, non_pushable) pushes
 the pushable predicates below the project while keeping the rest above.
 """
 
+from dispatch import matches
 from helpers import (
     collect_field_indices,
-    count_output_fields,
+    emit_mapping,
+    expression_nodes,
+    is_deterministic,
     make_conjunction,
     split_conjunction,
+    visit_field_references,
 )
-from substrait.algebra_pb2 import Rel
+from interning import intern
+from ownership import put, take
+from schema import output_field_count
+from substrait.algebra_pb2 import Expression, Rel
+
+# Largest computed expression, in expression nodes, copied into a pushed
+# predicate. Each reference to the field gets its own copy.
+MAX_SUBSTITUTED_NODES = 8
+
+_NOT_SUBSTITUTABLE = ("window_function", "subquery")
 
 
+@matches(("filter", "project"))
 def push_filter_through_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -25,19 +47,22 @@ def push_filter_through_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if input_rel.WhichOneof("rel_type") != "project":
         return None
 
-    project_rel = input_rel.project
-
-    # Don't push through projects with emit mappings (field index remapping).
-    if project_rel.HasField("common") and project_rel.common.HasField("emit"):
+    if emit_mapping(filter_rel) is not None:
         return None
 
+    project_rel = input_rel.project
+
     if not project_rel.HasField("input"):
         return None
 
-    input_field_count = count_output_fields(project_rel.input)
+    input_field_count = output_field_count(project_rel.input)
     if input_field_count is None:
         return None
 
+    to_input, computed = _output_fields(project_rel, input_field_count, fn_names)
+    if not to_input and not computed:
+        return None
+
     conjuncts = split_conjunction(filter_rel.condition, fn_names)
 
     pushable = []
@@ -45,10 +70,11 @@ def push_filter_through_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
 
     for conjunct in conjuncts:
         indices = collect_field_indices(conjunct)
-        if indices is not None and all(idx < input_field_count for idx in indices):
-            pushable.append(conjunct)
-        else:
-            remaining.append(conjunct)
+        if indices is not None and all(idx in to_input or idx in computed for idx in indices):
+            if _rewrite_to_input(conjunct, to_input, computed):
+                pushable.append(conjunct)
+                continue
+        remaining.append(conjunct)
 
     if not pushable:
         return None
@@ -61,19 +87,112 @@ def push_filter_through_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     # Push pushable predicates below the project.
     push_cond = make_conjunction(pushable, func_ref, output_type)
     new_filter = Rel()
-    new_filter.filter.input.CopyFrom(project_rel.input)
-    new_filter.filter.condition.CopyFrom(push_cond)
+    put(new_filter.filter, "input", take(project_rel, "input"))
+    put(new_filter.filter, "condition", push_cond)
 
-    result = Rel()
-    result.project.CopyFrom(project_rel)
-    result.project.input.CopyFrom(optimize_rel(new_filter))
+    result = take(filter_rel, "input")
+    put(project_rel, "input", optimize_rel(new_filter))
 
     # Keep remaining predicates above the project.
     if remaining:
         remaining_cond = make_conjunction(remaining, func_ref, output_type)
         wrapped = Rel()
-        wrapped.filter.input.CopyFrom(result)
-        wrapped.filter.condition.CopyFrom(remaining_cond)
+        put(wrapped.filter, "input", result)
+        put(wrapped.filter, "condition", remaining_cond)
         return wrapped
 
     return result
+
+
+def _output_fields(
+    project_rel, input_field_count: int, fn_names: dict[int, str]
+) -> tuple[dict[int, int], dict[int, Expression]]:
+    """Map the output fields of a project a pushed filter can use.
+
+    Returns the fields passing an input field through, mapped to that input
+    field, and the fields computed by a substitutable expression, mapped to
+    the expression.
+    """
+    emit = emit_mapping(project_rel)
+    if emit is None:
+        emit = range(input_field_count + len(project_rel.expressions))
+
+    to_input = {}
+    computed = {}
+    for output_idx, idx in enumerate(emit):
+        if idx < input_field_count:
+            to_input[output_idx] = idx
+            continue
+        expr_idx = idx - input_field_count
+        if expr_idx >= len(project_rel.expressions):
+            continue
+        expr = project_rel.expressions[expr_idx]
+        field = _referenced_field(expr)
+        if field is not None:
+            to_input[output_idx] = field
+        elif _is_substitutable(expr, input_field_count, fn_names):
+            computed[output_idx] = expr
+    return to_input, computed
+
+
+def _is_substitutable(expr: Expression, input_field_count: int, fn_names) -> bool:
+    nodes = list(expression_nodes(expr))
+    if len(nodes) > MAX_SUBSTITUTED_NODES:
+        return False
+    if any(node.WhichOneof("rex_type") in _NOT_SUBSTITUTABLE for node in nodes):
+        return False
+    indices = collect_field_indices(expr)
+    if indices is None or any(idx >= input_field_count for idx in indices):
+        return False
+    return is_deterministic(intern(expr), fn_names)
+
+
+def _rewrite_to_input(
+    conjunct: Expression, to_input: dict[int, int], computed: dict[int, Expression]
+) -> bool:
+    """Rewrite a conjunct's references to the project's output in place into
+    references to its input, substituting computed fields.
+
+    Returns False, leaving the conjunct untouched, if a computed field is
+    referenced from inside a subquery (where its expression would have to be
+    rewritten into outer references) or only in part, by a nested field.
+    """
+    blocked = []
+
+    def check(node):
+        ref = node.selection
+        if ref.direct_reference.struct_field.field in computed:
+            outer = ref.WhichOneof("root_type") == "outer_reference"
+            if outer or ref.direct_reference.struct_field.HasField("child"):
+                blocked.append(node)
+
+    visit_field_references(conjunct, check)
+    if blocked:
+        return False
+
+    def rewrite(node):
+        field = node.selection.direct_reference.struct_field.field
+        if field in to_input:
+            node.selection.direct_reference.struct_field.field = to_input[field]
+        else:
+            node.CopyFrom(computed[field])
+
+    visit_field_references(conjunct, rewrite)
+    return True
+
+
+def _referenced_field(expr: Expression) -> int | None:
+    """Return the input field `expr` is a plain reference to, or None."""
+    if expr.WhichOneof("rex_type") != "selection":
+        return None
+    ref = expr.selection
+    if ref.WhichOneof("root_type") not in (None, "root_reference"):
+        return None
+    if ref.WhichOneof("reference_type") != "direct_reference":
+        return None
+    segment = ref.direct_reference
+    if segment.WhichOneof("reference_type") != "struct_field":
+        return None
+    if segment.struct_field.HasField("child"):
+        return None
+    return segment.struct_field.field
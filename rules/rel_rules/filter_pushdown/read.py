@@ -1,14 +1,36 @@
-from substrait.algebra_pb2 import Rel
+from dispatch import matches
+from helpers import (
+    collect_field_indices,
+    emit_mapping,
+    function_anchor,
+    make_conjunction,
+    map_through_emit,
+    split_conjunction,
+    visit_field_references,
+)
+from interning import intern
+from ownership import put, take
+from substrait.algebra_pb2 import Expression, Rel
+from substrait.type_pb2 import Type
 
+_BOOLEAN = Type()
+_BOOLEAN.bool.nullability = Type.NULLABILITY_NULLABLE
 
+
+@matches(("filter", "read"))
 def push_filter_into_read(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Push filter predicate into ReadRel.best_effort_filter as a hint.
 
     The Filter rel is kept for correctness — best_effort_filter is a hint
     that the reader MAY use to skip data, not a guarantee.
 
-    Only fires when best_effort_filter is not already set to avoid
-    infinite loops in the fixed-point optimizer.
+    Only conjuncts not already in best_effort_filter are added, so the rule
+    fires once per filter in the fixed-point optimizer; other rules (see
+    transitive.py) may have added conjuncts of their own.
+
+    The condition sees the read's output, while best_effort_filter refers to
+    the base schema, so references are mapped back through the read's emit
+    and projection. Conjuncts that cannot be mapped are left out.
     """
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -16,10 +38,101 @@ def push_filter_into_read(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     input_rel = filter_rel.input
     if input_rel.WhichOneof("rel_type") != "read":
         return None
-    if input_rel.read.HasField("best_effort_filter"):
+    read = input_rel.read
+
+    conjuncts = []
+    for conjunct in split_conjunction(filter_rel.condition, fn_names):
+        condition = Expression()
+        condition.CopyFrom(conjunct)
+        if map_to_base_schema(read, condition):
+            conjuncts.append(condition)
+
+    if not add_to_best_effort_filter(read, conjuncts, fn_names):
         return None
+    return rel
+
+
+def map_to_base_schema(read, condition: Expression) -> bool:
+    """Rewrite references in `condition` in place from the read's output to
+    its base schema, through its emit and projection.
+
+    Returns False if they cannot be mapped; `condition` may then be
+    partially rewritten.
+    """
+    read_emit = emit_mapping(read)
+    if read_emit is not None and not map_through_emit(condition, read_emit):
+        return False
+
+    if read.projection.select.struct_items:
+        return _map_through_mask(condition, read.projection)
+    return True
+
+
+def _map_through_mask(condition: Expression, mask) -> bool:
+    """Rewrite references in `condition` in place from a projection's output
+    to the fields, and struct members, it selects."""
+    items = mask.select.struct_items
+    if any(item.HasField("child") for item in items) and not mask.maintain_singular_struct:
+        return False
+    indices = collect_field_indices(condition)
+    if indices is None or any(idx >= len(items) for idx in indices):
+        return False
+
+    mapped = True
+
+    def rewrite(node):
+        nonlocal mapped
+        segment = node.selection.direct_reference.struct_field
+        item = items[segment.field]
+        segment.field = item.field
+        while item.HasField("child") and item.child.struct.struct_items:
+            selected = item.child.struct.struct_items
+            # A narrowed struct used as a whole has no counterpart in the base schema.
+            if segment.child.WhichOneof("reference_type") != "struct_field":
+                mapped = False
+                return
+            segment = segment.child.struct_field
+            if segment.field >= len(selected):
+                mapped = False
+                return
+            item = selected[segment.field]
+            segment.field = item.field
+        # List and map selections change which elements a field holds.
+        if item.HasField("child") and item.child.WhichOneof("type") != "struct":
+            mapped = False
+
+    visit_field_references(condition, rewrite)
+    return mapped
+
+
+def add_to_best_effort_filter(read, conjuncts: list[Expression], fn_names) -> bool:
+    """AND the conjuncts (over the base schema) missing from a read's
+    best_effort_filter into it. They are moved, not copied.
+
+    Returns whether any was added. Nothing is added if combining them needs
+    an `and` function the plan does not declare.
+    """
+    existing = []
+    if read.HasField("best_effort_filter"):
+        existing = split_conjunction(read.best_effort_filter, fn_names)
+    seen = {intern(conjunct) for conjunct in existing}
+
+    added = []
+    for conjunct in conjuncts:
+        node_id = intern(conjunct)
+        if node_id not in seen:
+            seen.add(node_id)
+            added.append(conjunct)
+    if not added:
+        return False
+
+    and_ref = None
+    if existing or len(added) > 1:
+        and_ref = function_anchor("and", fn_names)
+        if and_ref is None:
+            return False
+    if existing:
+        added = split_conjunction(take(read, "best_effort_filter"), fn_names) + added
+    put(read, "best_effort_filter", make_conjunction(added, and_ref, _BOOLEAN))
+    return True
 
-    result = Rel()
-    result.CopyFrom(rel)
-    result.filter.input.read.best_effort_filter.CopyFrom(filter_rel.condition)
-    return result
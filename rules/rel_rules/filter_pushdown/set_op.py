@@ -6,9 +6,13 @@ Safe for all set operation types because filtering all inputs by the same
 predicate preserves the set operation semantics.
 """
 
+from dispatch import matches
+from helpers import emit_mapping, map_through_emit
+from ownership import put, put_all, take, take_all
 from substrait.algebra_pb2 import Rel
 
 
+@matches(("filter", "set"))
 def push_filter_through_set(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if rel.WhichOneof("rel_type") != "filter":
         return None
@@ -26,21 +30,29 @@ def push_filter_through_set(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if len(set_rel.inputs) < 2:
         return None
 
-    # Push the filter into each input of the set operation.
+    # The condition sees the set's emitted fields; the inputs produce the
+    # set's fields before its emit.
+    set_emit = emit_mapping(set_rel)
+    if set_emit is not None and not map_through_emit(filter_rel.condition, set_emit):
+        return None
+
+    # Push the filter into each input of the set operation. Every input
+    # needs its own condition; the last one takes the original.
+    inputs = take_all(set_rel, "inputs")
     new_inputs = []
-    for inp in set_rel.inputs:
+    for i, inp in enumerate(inputs):
         new_filter = Rel()
-        new_filter.filter.input.CopyFrom(inp)
-        new_filter.filter.condition.CopyFrom(filter_rel.condition)
-        if filter_rel.HasField("common"):
-            new_filter.filter.common.CopyFrom(filter_rel.common)
+        put(new_filter.filter, "input", inp)
+        if i < len(inputs) - 1:
+            new_filter.filter.condition.CopyFrom(filter_rel.condition)
+            if filter_rel.HasField("common"):
+                new_filter.filter.common.CopyFrom(filter_rel.common)
+        else:
+            put(new_filter.filter, "condition", take(filter_rel, "condition"))
+            if filter_rel.HasField("common"):
+                put(new_filter.filter, "common", take(filter_rel, "common"))
         new_inputs.append(optimize_rel(new_filter))
 
-    result = Rel()
-    result.set.op = set_rel.op
-    if set_rel.HasField("common"):
-        result.set.common.CopyFrom(set_rel.common)
-    for inp in new_inputs:
-        result.set.inputs.append(inp)
-
+    result = take(filter_rel, "input")
+    put_all(set_rel, "inputs", new_inputs)
     return result
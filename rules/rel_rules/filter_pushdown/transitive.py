@@ -0,0 +1,151 @@
+"""Infer predicates across the equi-join keys of a join.
+
+Join(Filter(L, a.x > 5), R, ON a.x = b.y): every pair the join matches has
+b.y = a.x, so right rows with NOT(b.y > 5) can never match. The implied
+predicate b.y > 5 is added to the right read's best_effort_filter, so that
+side's scan can skip data too.
+
+Columns equated by `equal` conjuncts of the ON clause form equivalence
+classes. Deterministic conjuncts of the filters directly above one input
+whose fields all have an equivalent on the other side are rewritten to it.
+The derived predicates are implied by the join, so they only serve as a hint
+to the read and no filter is added. A side only receives them when the join
+allows pushing ON conjuncts to it (see join_condition.py): a LEFT join's
+unmatched left rows are kept, whatever the right side holds.
+
+Derived predicates already in the read's best_effort_filter are skipped
+(see `add_to_best_effort_filter`), so the rule fires once per new predicate.
+"""
+
+from dispatch import matches
+from filter_pushdown.join_condition import ON_PUSH_LEFT, ON_PUSH_RIGHT
+from filter_pushdown.read import add_to_best_effort_filter, map_to_base_schema
+from helpers import (
+    collect_field_indices,
+    emit_mapping,
+    is_deterministic,
+    remap_field_indices,
+    split_conjunction,
+)
+from interning import intern
+from schema import output_field_count
+from substrait.algebra_pb2 import Expression, Rel
+
+
+@matches(("join", None))
+def infer_transitive_predicates(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    if rel.WhichOneof("rel_type") != "join":
+        return None
+    join = rel.join
+    if not join.HasField("expression"):
+        return None
+
+    left_field_count = output_field_count(join.left)
+    if left_field_count is None:
+        return None
+
+    classes = _equivalence_classes(join.expression, fn_names)
+    if not classes:
+        return None
+
+    # Equivalent fields across the join, in each side's own field space.
+    left_to_right: dict[int, int] = {}
+    right_to_left: dict[int, int] = {}
+    for members in classes:
+        left = [f for f in members if f < left_field_count]
+        right = [f - left_field_count for f in members if f >= left_field_count]
+        if left and right:
+            for f in left:
+                left_to_right[f] = right[0]
+            for f in right:
+                right_to_left[f] = left[0]
+
+    changed = False
+    if join.type in ON_PUSH_RIGHT:
+        changed |= _derive(join.left, join.right, left_to_right, fn_names)
+    if join.type in ON_PUSH_LEFT:
+        changed |= _derive(join.right, join.left, right_to_left, fn_names)
+    return rel if changed else None
+
+
+def _equivalence_classes(condition: Expression, fn_names: dict[int, str]) -> list[set[int]]:
+    """Group the fields equated by `equal(field, field)` conjuncts."""
+    parent: dict[int, int] = {}
+
+    def find(f: int) -> int:
+        while parent.setdefault(f, f) != f:
+            f = parent[f]
+        return f
+
+    for conjunct in split_conjunction(condition, fn_names):
+        if conjunct.WhichOneof("rex_type") != "scalar_function":
+            continue
+        sf = conjunct.scalar_function
+        if fn_names.get(sf.function_reference, "").split(":", 1)[0] != "equal":
+            continue
+        fields = [_field(arg.value) for arg in sf.arguments if arg.HasField("value")]
+        if len(fields) == 2 and None not in fields:
+            parent[find(fields[0])] = find(fields[1])
+
+    classes: dict[int, set[int]] = {}
+    for f in parent:
+        classes.setdefault(find(f), set()).add(f)
+    return [members for members in classes.values() if len(members) > 1]
+
+
+def _field(expr: Expression) -> int | None:
+    if expr.WhichOneof("rex_type") != "selection":
+        return None
+    ref = expr.selection
+    if ref.WhichOneof("root_type") not in (None, "root_reference"):
+        return None
+    segment = ref.direct_reference
+    if segment.WhichOneof("reference_type") != "struct_field":
+        return None
+    if segment.struct_field.HasField("child"):
+        return None
+    return segment.struct_field.field
+
+
+def _derive(source: Rel, target: Rel, mapping: dict[int, int], fn_names) -> bool:
+    """Add the predicates the filters atop `source` imply on `target`, via
+    the equivalent fields in `mapping`, to the best_effort_filter of the read
+    under `target`. Returns whether any was added."""
+    if not mapping:
+        return False
+    read = _read_under_filters(target)
+    if read is None:
+        return False
+
+    derived = []
+    for conjunct in _filter_conjuncts(source, fn_names):
+        indices = collect_field_indices(conjunct)
+        if not indices or not all(idx in mapping for idx in indices):
+            continue
+        if not is_deterministic(intern(conjunct), fn_names):
+            continue
+        implied = remap_field_indices(conjunct, mapping)
+        if map_to_base_schema(read, implied):
+            derived.append(implied)
+
+    return add_to_best_effort_filter(read, derived, fn_names)
+
+
+def _read_under_filters(rel: Rel):
+    """Return the read at the bottom of a chain of filters without emit, or None."""
+    while rel.WhichOneof("rel_type") == "filter":
+        if emit_mapping(rel.filter) is not None:
+            return None
+        rel = rel.filter.input
+    if rel.WhichOneof("rel_type") != "read":
+        return None
+    return rel.read
+
+
+def _filter_conjuncts(rel: Rel, fn_names) -> list[Expression]:
+    """The conjuncts of the chain of filters without emit at the top of `rel`."""
+    conjuncts = []
+    while rel.WhichOneof("rel_type") == "filter" and emit_mapping(rel.filter) is None:
+        conjuncts.extend(split_conjunction(rel.filter.condition, fn_names))
+        rel = rel.filter.input
+    return conjuncts
@@ -1,23 +1,42 @@
-from substrait.algebra_pb2 import Expression, FunctionArgument, Rel
+from substrait.algebra_pb2 import Expression, Rel
 
+from interning import calls, intern
+from ownership import put
+from schema import output_field_count
 
-def resolve_output_field_count(rel: Rel) -> int | None:
-    """Get effective output field count, accounting for emit mappings."""
-    rel_type = rel.WhichOneof("rel_type")
-    if rel_type is None:
-        return None
-    inner = getattr(rel, rel_type)
+# Functions that can return different results for the same arguments, so two
+# calls with equal arguments are not interchangeable.
+NONDETERMINISTIC_FUNCTIONS = frozenset({"random", "rand", "uuid", "now", "current_timestamp"})
+
+
+def emit_mapping(inner) -> list[int] | None:
+    """Return the emit of a rel (output index -> pre-emit index), or None if it has none."""
     if inner.HasField("common") and inner.common.HasField("emit"):
-        return len(inner.common.emit.output_mapping)
-    return count_output_fields(rel)
+        return list(inner.common.emit.output_mapping)
+    return None
+
+
+def map_through_emit(expr: Expression, emit: list[int]) -> bool:
+    """Rewrite field references in `expr` in place from a rel's output space to
+    its pre-emit space.
+
+    Returns False, leaving `expr` untouched, if its references cannot be
+    analyzed or fall outside the emit.
+    """
+    indices = collect_field_indices(expr)
+    if indices is None or any(idx >= len(emit) for idx in indices):
+        return False
+    remap_field_indices_in_place(expr, dict(enumerate(emit)))
+    return True
 
 
-def prune_input(input_rel: Rel, needed: set[int]) -> tuple[Rel, dict[int, int]] | None:
-    """Prune an input rel to only output the needed fields.
+def prune_input(input_rel: Rel, needed: set[int]) -> dict[int, int] | None:
+    """Prune an input rel in place to only output the needed fields.
 
-    Inspects the input's existing emit (or natural field count), checks if
-    pruning is possible, and returns a modified copy with updated emit plus
-    the old-to-new field index mapping. Returns None if no pruning is needed.
+    Inspects the input's existing emit (or derived field count), checks if
+    pruning is possible, and updates the emit of `input_rel`. Returns the
+    old-to-new field index mapping, or None (leaving the input untouched)
+    if no pruning is needed.
     """
     input_rel_type = input_rel.WhichOneof("rel_type")
     if input_rel_type is None:
@@ -30,7 +49,7 @@ def prune_input(input_rel: Rel, needed: set[int]) -> tuple[Rel, dict[int, int]]
         input_emit = list(inner.common.emit.output_mapping)
         input_field_count = len(input_emit)
     else:
-        input_field_count = count_output_fields(input_rel)
+        input_field_count = output_field_count(input_rel)
         if input_field_count is None:
             return None
 
@@ -40,16 +59,12 @@ def prune_input(input_rel: Rel, needed: set[int]) -> tuple[Rel, dict[int, int]]
     sorted_needed = sorted(needed)
     old_to_new = {old: new for new, old in enumerate(sorted_needed)}
 
-    new_input = Rel()
-    new_input.CopyFrom(input_rel)
-
-    result_inner = getattr(new_input, input_rel_type)
     if input_has_emit:
-        result_inner.common.emit.output_mapping[:] = [input_emit[i] for i in sorted_needed]
+        inner.common.emit.output_mapping[:] = [input_emit[i] for i in sorted_needed]
     else:
-        result_inner.common.emit.output_mapping[:] = sorted_needed
+        inner.common.emit.output_mapping[:] = sorted_needed
 
-    return new_input, old_to_new
+    return old_to_new
 
 
 def prune_single_input_rel(
@@ -63,8 +78,8 @@ def prune_single_input_rel(
     Common logic for passthrough-schema operators that have an emit mapping.
     `collect_extra_needed(inner) -> set[int] | None` collects additional field
     indices from internal expressions (e.g. condition, sort fields). Returns None
-    to bail out. `remap_exprs(result_inner, mapping)` remaps those expressions
-    after pruning.
+    to bail out. `remap_exprs(inner, mapping)` remaps those expressions
+    after pruning. The rel is updated in place and returned.
     """
     if rel.WhichOneof("rel_type") != rel_type:
         return None
@@ -87,60 +102,46 @@ def prune_single_input_rel(
             return None
         needed.update(extra)
 
-    pruned = prune_input(inner.input, needed)
-    if pruned is None:
+    old_to_new = prune_input(inner.input, needed)
+    if old_to_new is None:
         return None
-    new_input, old_to_new = pruned
-
-    result = Rel()
-    result.CopyFrom(rel)
-    result_inner = getattr(result, rel_type)
-    result_inner.input.CopyFrom(new_input)
 
     if remap_exprs is not None:
-        remap_exprs(result_inner, old_to_new)
+        remap_exprs(inner, old_to_new)
 
-    result_inner.common.emit.output_mapping[:] = [old_to_new[idx] for idx in emit]
+    inner.common.emit.output_mapping[:] = [old_to_new[idx] for idx in emit]
 
-    return result
+    return rel
 
 
-def prune_bilateral_inputs(
-    left: Rel, right: Rel, needed: set[int]
-) -> tuple[Rel | None, Rel | None, dict[int, int]] | None:
+def prune_bilateral_inputs(left: Rel, right: Rel, needed: set[int]) -> dict[int, int] | None:
     """Prune left/right inputs of a bilateral rel (join, cross) to only output needed fields.
 
     Splits the combined needed set into left/right subsets, prunes each side
-    independently, and builds a combined old-to-new mapping over the full index space.
-    Returns (new_left_or_None, new_right_or_None, combined_mapping) or None if
-    neither side can be pruned.
+    independently in place, and returns a combined old-to-new mapping over the
+    full index space. Returns None if neither side can be pruned.
     """
-    left_field_count = resolve_output_field_count(left)
-    right_field_count = resolve_output_field_count(right)
+    left_field_count = output_field_count(left)
+    right_field_count = output_field_count(right)
     if left_field_count is None or right_field_count is None:
         return None
 
     left_needed = {idx for idx in needed if idx < left_field_count}
     right_needed = {idx - left_field_count for idx in needed if idx >= left_field_count}
 
-    left_pruned = prune_input(left, left_needed)
-    right_pruned = prune_input(right, right_needed)
+    left_mapping = prune_input(left, left_needed)
+    right_mapping = prune_input(right, right_needed)
 
-    if left_pruned is None and right_pruned is None:
+    if left_mapping is None and right_mapping is None:
         return None
 
-    if left_pruned is not None:
-        new_left, left_mapping = left_pruned
+    if left_mapping is not None:
         new_left_count = len(left_mapping)
     else:
-        new_left = None
         left_mapping = {i: i for i in range(left_field_count)}
         new_left_count = left_field_count
 
-    if right_pruned is not None:
-        new_right, right_mapping = right_pruned
-    else:
-        new_right = None
+    if right_mapping is None:
         right_mapping = {i: i for i in range(right_field_count)}
 
     combined: dict[int, int] = {}
@@ -149,68 +150,226 @@ def prune_bilateral_inputs(
     for old, new in right_mapping.items():
         combined[left_field_count + old] = new_left_count + new
 
-    return new_left, new_right, combined
+    return combined
 
 
-def count_output_fields(rel: Rel) -> int | None:
-    """Count the number of output fields for a relation. Returns None if unknown."""
-    rel_type = rel.WhichOneof("rel_type")
+def visit_field_references(expr: Expression, visit) -> bool:
+    """Call `visit` on every field reference in `expr` that points into the
+    input of the rel owning `expr`.
 
-    if rel_type == "read":
-        read = rel.read
-        if read.HasField("base_schema") and read.base_schema.HasField("struct"):
-            return len(read.base_schema.struct.types)
-
-    elif rel_type == "filter":
-        if rel.filter.HasField("input"):
-            return count_output_fields(rel.filter.input)
-
-    elif rel_type == "cross":
-        cross = rel.cross
-        left_count = (
-            count_output_fields(cross.left) if cross.HasField("left") else None
-        )
-        right_count = (
-            count_output_fields(cross.right) if cross.HasField("right") else None
-        )
-        if left_count is not None and right_count is not None:
-            return left_count + right_count
-
-    elif rel_type == "project":
-        proj = rel.project
-        input_count = (
-            count_output_fields(proj.input) if proj.HasField("input") else None
-        )
-        if input_count is not None:
-            return input_count + len(proj.expressions)
-
-    elif rel_type == "join":
-        join = rel.join
-        left_count = (
-            count_output_fields(join.left) if join.HasField("left") else None
-        )
-        right_count = (
-            count_output_fields(join.right) if join.HasField("right") else None
-        )
-        if left_count is not None and right_count is not None:
-            return left_count + right_count
-
-    elif rel_type == "aggregate":
-        agg = rel.aggregate
-        if len(agg.groupings) == 1:
-            return len(agg.groupings[0].grouping_expressions) + len(agg.measures)
-
-    elif rel_type == "set":
-        set_rel = rel.set
-        if len(set_rel.inputs) > 0:
-            return count_output_fields(set_rel.inputs[0])
-
-    elif rel_type in ("fetch", "sort"):
-        inner = getattr(rel, rel_type)
-        if inner.HasField("input"):
-            return count_output_fields(inner.input)
+    These are the direct struct-field references rooted at the input,
+    including those inside lambdas, and the outer references of correlated
+    subqueries that step out to this rel. `visit` receives the selection
+    Expression, whose `selection.direct_reference.struct_field.field` is the
+    input field index, and may rewrite it in place.
 
-    return None
+    Returns False if `expr` holds a reference that can't be analyzed (e.g. a
+    masked reference to the input) or an unknown rex type. The references
+    around it are still visited.
+    """
+    ok = True
+    stack = [expr]
+    while stack:
+        current = stack.pop()
+        rex_type = current.WhichOneof("rex_type")
+        if rex_type == "selection":
+            ok = _visit_selection(current, visit, stack) and ok
+        elif rex_type == "subquery":
+            ok = _visit_subquery(current.subquery, 0, visit, stack) and ok
+        else:
+            children = _SUBEXPRESSIONS.get(rex_type)
+            if children is None:
+                ok = False
+            else:
+                stack.extend(children(getattr(current, rex_type)))
+    return ok
+
+
+def _visit_selection(expr: Expression, visit, stack: list[Expression]) -> bool:
+    ref = expr.selection
+    root_type = ref.WhichOneof("root_type")
+    if root_type == "expression":
+        # The reference indexes into the expression's value, not the input.
+        stack.append(ref.expression)
+        return True
+    if root_type in ("outer_reference", "lambda_parameter_reference"):
+        return True
+    if _is_struct_field_reference(ref):
+        visit(expr)
+        return True
+    return False
+
+
+def _is_struct_field_reference(ref) -> bool:
+    return (
+        ref.WhichOneof("reference_type") == "direct_reference"
+        and ref.direct_reference.WhichOneof("reference_type") == "struct_field"
+    )
+
+
+def _visit_subquery(subquery, depth: int, visit, stack: list[Expression]) -> bool:
+    """Visit a subquery `depth` subqueries below the rel owning the expression.
+
+    Its expressions are evaluated in the enclosing scope and go on `stack`
+    (at depth 0) or are searched for outer references like its rels.
+    """
+    ok = True
+    variant = getattr(subquery, subquery.WhichOneof("subquery_type"))
+    for field, value in variant.ListFields():
+        if field.message_type is None:
+            continue
+        values = value if field.label == field.LABEL_REPEATED else (value,)
+        for item in values:
+            if type(item) is Rel:
+                ok = _visit_outer_references(item, depth + 1, visit) and ok
+            elif depth == 0:
+                stack.append(item)
+            else:
+                ok = _visit_outer_references(item, depth, visit) and ok
+    return ok
+
+
+def _visit_outer_references(message, depth: int, visit) -> bool:
+    """Visit the outer references stepping out `depth` subqueries in a message
+    nested `depth` subqueries below the rel owning the expression."""
+    if type(message) is Expression:
+        rex_type = message.WhichOneof("rex_type")
+        if rex_type == "selection":
+            ref = message.selection
+            outer = ref.WhichOneof("root_type") == "outer_reference"
+            if outer and ref.outer_reference.steps_out == depth:
+                if not _is_struct_field_reference(ref):
+                    return False
+                visit(message)
+                return True
+        elif rex_type == "subquery":
+            return _visit_subquery(message.subquery, depth, visit, [])
+
+    ok = True
+    for field, value in message.ListFields():
+        if field.message_type is None:
+            continue
+        values = value if field.label == field.LABEL_REPEATED else (value,)
+        for item in values:
+            ok = _visit_outer_references(item, depth, visit) and ok
+    return ok
+
+
+def _function_arguments(function) -> list[Expression]:
+    exprs = [arg.value for arg in function.arguments if arg.HasField("value")]
+    exprs.extend(function.args)
+    return exprs
+
+
+def _window_function_children(window) -> list[Expression]:
+    exprs = _function_arguments(window)
+    exprs.extend(window.partitions)
+    exprs.extend(sort.expr for sort in window.sorts if sort.HasField("expr"))
+    return exprs
+
+
+def _if_then_children(if_then) -> list[Expression]:
+    exprs = []
+    for clause in if_then.ifs:
+        if clause.HasField("if"):
+            exprs.append(getattr(clause, "if"))
+        if clause.HasField("then"):
+            exprs.append(clause.then)
+    if if_then.HasField("else"):
+        exprs.append(getattr(if_then, "else"))
+    return exprs
+
+
+def _switch_children(switch) -> list[Expression]:
+    # The `if` of each case is a literal.
+    exprs = [clause.then for clause in switch.ifs if clause.HasField("then")]
+    if switch.HasField("match"):
+        exprs.append(switch.match)
+    if switch.HasField("else"):
+        exprs.append(getattr(switch, "else"))
+    return exprs
+
+
+def _singular_or_list_children(or_list) -> list[Expression]:
+    exprs = list(or_list.options)
+    if or_list.HasField("value"):
+        exprs.append(or_list.value)
+    return exprs
+
+
+def _multi_or_list_children(or_list) -> list[Expression]:
+    exprs = list(or_list.value)
+    for record in or_list.options:
+        exprs.extend(record.fields)
+    return exprs
+
+
+def _nested_children(nested) -> list[Expression]:
+    nested_type = nested.WhichOneof("nested_type")
+    if nested_type == "struct":
+        return list(nested.struct.fields)
+    if nested_type == "list":
+        return list(nested.list.values)
+    if nested_type == "map":
+        exprs = []
+        for kv in nested.map.key_values:
+            exprs.extend((kv.key, kv.value))
+        return exprs
+    return []
+
+
+def _lambda_children(lambda_) -> list[Expression]:
+    # Parameter references resolve to the lambda's arguments; any other
+    # reference in the body is to the input.
+    return [lambda_.body] if lambda_.HasField("body") else []
+
+
+def _lambda_invocation_children(invocation) -> list[Expression]:
+    exprs = list(invocation.arguments.fields)
+    exprs.extend(_lambda_children(getattr(invocation, "lambda")))
+    return exprs
+
+
+def _no_children(_) -> tuple:
+    return ()
+
+
+# Subexpressions of each rex type evaluated against the same input, for
+# `visit_field_references`. Selections and subqueries are handled there.
+_SUBEXPRESSIONS = {
+    "literal": _no_children,
+    "scalar_function": _function_arguments,
+    "window_function": _window_function_children,
+    "if_then": _if_then_children,
+    "switch_expression": _switch_children,
+    "singular_or_list": _singular_or_list_children,
+    "multi_or_list": _multi_or_list_children,
+    "cast": lambda cast: [cast.input] if cast.HasField("input") else [],
+    "nested": _nested_children,
+    "dynamic_parameter": _no_children,
+    "lambda": _lambda_children,
+    "lambda_invocation": _lambda_invocation_children,
+    "enum": _no_children,
+}
+
+
+def expression_nodes(expr: Expression):
+    """Yield `expr` and its subexpressions evaluated against the same input.
+
+    Subqueries are yielded but not entered.
+    """
+    stack = [expr]
+    while stack:
+        current = stack.pop()
+        yield current
+        rex_type = current.WhichOneof("rex_type")
+        if rex_type == "selection":
+            if current.selection.WhichOneof("root_type") == "expression":
+                stack.append(current.selection.expression)
+        else:
+            children = _SUBEXPRESSIONS.get(rex_type)
+            if children is not None:
+                stack.extend(children(getattr(current, rex_type)))
 
 
 def collect_field_indices(expr: Expression) -> set[int] | None:
@@ -223,143 +382,162 @@ def collect_field_indices(expr: Expression) -> set[int] | None:
 
 
 def _collect_field_indices_impl(expr: Expression, indices: set[int]) -> bool:
-    """Recursively collect field indices. Returns False if we encounter something we can't handle."""
-    rex_type = expr.WhichOneof("rex_type")
-
-    if rex_type == "selection":
-        ref = expr.selection
-        ref_type = ref.WhichOneof("reference_type")
-        if ref_type == "direct_reference":
-            segment = ref.direct_reference
-            seg_type = segment.WhichOneof("reference_type")
-            if seg_type == "struct_field":
-                indices.add(segment.struct_field.field)
-                return True
-        return False
+    """Collect field indices into `indices`. Returns False if we encounter something we can't handle."""
 
-    elif rex_type == "scalar_function":
-        for arg in expr.scalar_function.arguments:
-            if arg.HasField("value"):
-                if not _collect_field_indices_impl(arg.value, indices):
-                    return False
-        return True
+    def add(node):
+        indices.add(node.selection.direct_reference.struct_field.field)
 
-    elif rex_type == "literal":
-        return True
+    return visit_field_references(expr, add)
 
-    elif rex_type == "cast":
-        if expr.cast.HasField("input"):
-            return _collect_field_indices_impl(expr.cast.input, indices)
-        return True
 
-    elif rex_type == "if_then":
-        for clause in expr.if_then.ifs:
-            if clause.HasField("if_"):
-                if not _collect_field_indices_impl(clause.if_, indices):
-                    return False
-            if clause.HasField("then"):
-                if not _collect_field_indices_impl(clause.then, indices):
-                    return False
-        if expr.if_then.HasField("else_"):
-            if not _collect_field_indices_impl(expr.if_then.else_, indices):
-                return False
-        return True
+def collect_field_paths(expr: Expression) -> set[tuple[int, ...]] | None:
+    """Collect the struct field paths of all input references in an expression.
 
-    return False
+    A path is the input field index followed by the struct members the
+    reference steps into: `payload.user.id` is (payload, user, id). A
+    reference into a list or map element ends at the field holding it.
+    Returns None where collect_field_indices does."""
+    paths: set[tuple[int, ...]] = set()
+
+    def add(node):
+        segment = node.selection.direct_reference.struct_field
+        path = [segment.field]
+        while segment.child.WhichOneof("reference_type") == "struct_field":
+            segment = segment.child.struct_field
+            path.append(segment.field)
+        paths.add(tuple(path))
+
+    if not visit_field_references(expr, add):
+        return None
+    return paths
 
 
 def adjust_field_indices(expr: Expression, offset: int) -> Expression:
     """Create a copy of the expression with all field reference indices adjusted by offset."""
     new_expr = Expression()
     new_expr.CopyFrom(expr)
-    _adjust_field_indices_in_place(new_expr, offset)
+    adjust_field_indices_in_place(new_expr, offset)
     return new_expr
 
 
-def _adjust_field_indices_in_place(expr: Expression, offset: int) -> None:
+def adjust_field_indices_in_place(expr: Expression, offset: int) -> None:
     """Adjust field reference indices in-place."""
-    rex_type = expr.WhichOneof("rex_type")
-
-    if rex_type == "selection":
-        ref = expr.selection
-        if ref.WhichOneof("reference_type") == "direct_reference":
-            segment = ref.direct_reference
-            if segment.WhichOneof("reference_type") == "struct_field":
-                segment.struct_field.field += offset
-
-    elif rex_type == "scalar_function":
-        for arg in expr.scalar_function.arguments:
-            if arg.HasField("value"):
-                _adjust_field_indices_in_place(arg.value, offset)
-
-    elif rex_type == "cast":
-        if expr.cast.HasField("input"):
-            _adjust_field_indices_in_place(expr.cast.input, offset)
-
-    elif rex_type == "if_then":
-        for clause in expr.if_then.ifs:
-            if clause.HasField("if_"):
-                _adjust_field_indices_in_place(clause.if_, offset)
-            if clause.HasField("then"):
-                _adjust_field_indices_in_place(clause.then, offset)
-        if expr.if_then.HasField("else_"):
-            _adjust_field_indices_in_place(expr.if_then.else_, offset)
+
+    def adjust(node):
+        node.selection.direct_reference.struct_field.field += offset
+
+    visit_field_references(expr, adjust)
 
 
 def remap_field_indices(expr: Expression, mapping: dict[int, int]) -> Expression:
     """Create a copy of the expression with field reference indices remapped according to mapping."""
     new_expr = Expression()
     new_expr.CopyFrom(expr)
-    _remap_field_indices_in_place(new_expr, mapping)
+    remap_field_indices_in_place(new_expr, mapping)
     return new_expr
 
 
-def _remap_field_indices_in_place(expr: Expression, mapping: dict[int, int]) -> None:
+def remap_field_indices_in_place(expr: Expression, mapping: dict[int, int]) -> None:
     """Remap field reference indices in-place using a mapping dict."""
-    rex_type = expr.WhichOneof("rex_type")
-
-    if rex_type == "selection":
-        ref = expr.selection
-        if ref.WhichOneof("reference_type") == "direct_reference":
-            segment = ref.direct_reference
-            if segment.WhichOneof("reference_type") == "struct_field":
-                segment.struct_field.field = mapping[segment.struct_field.field]
-
-    elif rex_type == "scalar_function":
-        for arg in expr.scalar_function.arguments:
-            if arg.HasField("value"):
-                _remap_field_indices_in_place(arg.value, mapping)
-
-    elif rex_type == "cast":
-        if expr.cast.HasField("input"):
-            _remap_field_indices_in_place(expr.cast.input, mapping)
-
-    elif rex_type == "if_then":
-        for clause in expr.if_then.ifs:
-            if clause.HasField("if_"):
-                _remap_field_indices_in_place(clause.if_, mapping)
-            if clause.HasField("then"):
-                _remap_field_indices_in_place(clause.then, mapping)
-        if expr.if_then.HasField("else_"):
-            _remap_field_indices_in_place(expr.if_then.else_, mapping)
+
+    def remap(node):
+        field = node.selection.direct_reference.struct_field
+        field.field = mapping[field.field]
+
+    visit_field_references(expr, remap)
 
 
 def split_conjunction(
     condition: Expression, fn_names: dict[int, str]
 ) -> list[Expression]:
     """Recursively split a condition into conjuncts. Nested AND expressions like
-    AND(AND(a, b), c) are fully flattened to [a, b, c]."""
+    AND(AND(a, b), c) are fully flattened to [a, b, c], and repeated conjuncts
+    are dropped (see `dedupe_conjuncts`)."""
+    conjuncts: list[Expression] = []
+    _split_conjunction(condition, fn_names, conjuncts)
+    if len(conjuncts) == 1:
+        return conjuncts
+    return dedupe_conjuncts(conjuncts, fn_names)
+
+
+def _split_conjunction(
+    condition: Expression, fn_names: dict[int, str], result: list[Expression]
+) -> None:
     if condition.WhichOneof("rex_type") == "scalar_function":
         sf = condition.scalar_function
         name = fn_names.get(sf.function_reference, "")
         if name == "and" or name.startswith("and:"):
-            result = []
             for arg in sf.arguments:
                 if arg.HasField("value"):
-                    result.extend(split_conjunction(arg.value, fn_names))
-            return result
+                    _split_conjunction(arg.value, fn_names, result)
+            return
+
+    result.append(condition)
+
+
+def dedupe_conjuncts(
+    conjuncts: list[Expression], fn_names: dict[int, str]
+) -> list[Expression]:
+    """Drop conjuncts structurally equal to an earlier one, keeping the first.
+
+    Conjuncts calling a nondeterministic function are always kept, since two
+    evaluations of them can differ.
+    """
+    seen: set[int] = set()
+    result = []
+    for conjunct in conjuncts:
+        node_id = intern(conjunct)
+        if node_id in seen and is_deterministic(node_id, fn_names):
+            continue
+        seen.add(node_id)
+        result.append(conjunct)
+    return result
+
+
+def is_deterministic(node_id: int, fn_names: dict[int, str]) -> bool:
+    """Whether an interned expression calls only deterministic functions."""
+    for anchor in calls(node_id):
+        name = fn_names.get(anchor, "").split(":", 1)[0]
+        if name in NONDETERMINISTIC_FUNCTIONS:
+            return False
+    return True
+
+
+def function_anchor(name: str, fn_names: dict[int, str]) -> int | None:
+    """The anchor the plan declares function `name` under, or None."""
+    for anchor, fn_name in fn_names.items():
+        if fn_name == name or fn_name.startswith(name + ":"):
+            return anchor
+    return None
+
+
+def equalities_first(
+    conjuncts: list[Expression], left_field_count: int, fn_names: dict[int, str]
+) -> list[Expression]:
+    """Order join condition conjuncts with `equal`s of a left-only and a
+    right-only expression first, keeping the order otherwise, so engines can
+    pick them out as hash join keys."""
+
+    def is_equi(conjunct: Expression) -> bool:
+        if conjunct.WhichOneof("rex_type") != "scalar_function":
+            return False
+        sf = conjunct.scalar_function
+        if fn_names.get(sf.function_reference, "").split(":", 1)[0] != "equal":
+            return False
+        sides = []
+        for arg in sf.arguments:
+            indices = collect_field_indices(arg.value) if arg.HasField("value") else None
+            if not indices:
+                return False
+            if all(idx < left_field_count for idx in indices):
+                sides.append("left")
+            elif all(idx >= left_field_count for idx in indices):
+                sides.append("right")
+            else:
+                return False
+        return sorted(sides) == ["left", "right"]
 
-    return [condition]
+    return sorted(conjuncts, key=lambda conjunct: not is_equi(conjunct))
 
 
 def make_conjunction(
@@ -367,7 +545,10 @@ def make_conjunction(
     function_reference: int,
     output_type,
 ) -> Expression:
-    """Combine expressions with AND. Returns the expression directly if only one."""
+    """Combine expressions with AND. Returns the expression directly if only one.
+
+    The expressions are moved, not copied, into the result.
+    """
     assert len(exprs) >= 1
     if len(exprs) == 1:
         return exprs[0]
@@ -377,7 +558,54 @@ def make_conjunction(
     if output_type is not None:
         result.scalar_function.output_type.CopyFrom(output_type)
     for expr in exprs:
-        arg = FunctionArgument()
-        arg.value.CopyFrom(expr)
-        result.scalar_function.arguments.append(arg)
+        put(result.scalar_function.arguments.add(), "value", expr)
+    return result
+
+
+_INTEGER_LITERALS = ("i8", "i16", "i32", "i64")
+
+
+def fetch_bounds(fetch) -> tuple[int, int | None] | None:
+    """Return the (offset, count) of a FetchRel, with count None for all rows.
+
+    Returns None if either is given by an expression other than an integer
+    literal.
+    """
+    bounds = []
+    for mode, default in (("offset_mode", 0), ("count_mode", None)):
+        name = fetch.WhichOneof(mode)
+        if name is None:
+            bounds.append(default)
+        elif not name.endswith("_expr"):
+            value = getattr(fetch, name)
+            # The deprecated count field spells "all rows" as -1.
+            bounds.append(None if value < 0 else value)
+        else:
+            literal = getattr(fetch, name).literal
+            kind = literal.WhichOneof("literal_type")
+            if kind not in _INTEGER_LITERALS:
+                return None
+            bounds.append(getattr(literal, kind))
+    return bounds[0], bounds[1]
+
+
+def limited_to(rel: Rel, count: int) -> bool:
+    """Whether `rel` is a fetch that returns at most `count` rows, possibly
+    under projects, filters and sorts (which return no more rows than their
+    input, e.g. once a fetch was pushed below a project)."""
+    rel_type = rel.WhichOneof("rel_type")
+    while rel_type in ("project", "filter", "sort"):
+        rel = getattr(rel, rel_type).input
+        rel_type = rel.WhichOneof("rel_type")
+    if rel_type != "fetch":
+        return False
+    bounds = fetch_bounds(rel.fetch)
+    return bounds is not None and bounds[1] is not None and bounds[1] <= count
+
+
+def make_limit(input_rel: Rel, count: int) -> Rel:
+    """Build a Fetch of the first `count` rows of `input_rel`, which it takes ownership of."""
+    result = Rel()
+    put(result.fetch, "input", input_rel)
+    result.fetch.count_expr.literal.i64 = count
     return result
@@ -0,0 +1,118 @@
+"""Hash-consed store of expressions.
+
+Interning maps an Expression to an integer id such that two expressions get
+the same id exactly when they are structurally equal. Each node's key is
+built from its scalar fields and the ids of its submessages, so interning is
+linear in the expression's size and structurally equal subexpressions share
+one entry. Once interned, equality and hashing are int operations, where
+comparing two predicates would otherwise mean serializing both.
+
+A protobuf submessage has a single parent, so a plan cannot physically share
+one subtree between two places. Rules use the ids to find duplicates and
+only copy what they keep.
+
+The store lives for one optimize call (`reset_expression_store`); ids stay
+valid across passes because keys depend only on content.
+"""
+
+from google.protobuf.descriptor import FieldDescriptor
+from substrait.algebra_pb2 import AggregateFunction, Expression
+
+_EXPRESSION = Expression.DESCRIPTOR
+
+# Messages whose `function_reference` names the function they call.
+_CALLS = frozenset(
+    (
+        Expression.ScalarFunction.DESCRIPTOR.full_name,
+        Expression.WindowFunction.DESCRIPTOR.full_name,
+        AggregateFunction.DESCRIPTOR.full_name,
+    )
+)
+
+_FLOATS = (FieldDescriptor.CPPTYPE_FLOAT, FieldDescriptor.CPPTYPE_DOUBLE)
+
+_NO_CALLS: frozenset[int] = frozenset()
+
+
+class ExpressionStore:
+    """Interned expression nodes, keyed by structure."""
+
+    def __init__(self):
+        self._ids: dict[tuple, int] = {}
+        # Function anchors called anywhere in each node, indexed by id.
+        self._calls: list[frozenset[int]] = []
+        self.expression_count = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def intern(self, msg) -> int:
+        """Return the id of `msg`, interning it and its submessages if new."""
+        items = []
+        calls = _NO_CALLS
+        for field, value in msg.ListFields():
+            repeated = field.label == FieldDescriptor.LABEL_REPEATED
+            if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+                if repeated:
+                    value = tuple(self.intern(item) for item in value)
+                    for item in value:
+                        calls = self._union(calls, item)
+                else:
+                    value = self.intern(value)
+                    calls = self._union(calls, value)
+            elif field.cpp_type in _FLOATS:
+                # hex() tells -0.0 from 0.0 and makes NaN equal to itself.
+                value = tuple(v.hex() for v in value) if repeated else value.hex()
+            elif repeated:
+                value = tuple(value)
+            items.append((field.number, value))
+
+        desc = msg.DESCRIPTOR
+        key = (desc.full_name, tuple(items))
+        node_id = self._ids.get(key)
+        if node_id is None:
+            node_id = self._ids[key] = len(self._calls)
+            if desc.full_name in _CALLS:
+                calls = calls | {msg.function_reference}
+            self._calls.append(calls)
+            if desc is _EXPRESSION:
+                self.expression_count += 1
+        return node_id
+
+    def calls(self, node_id: int) -> frozenset[int]:
+        """Return the function anchors called anywhere in an interned node."""
+        return self._calls[node_id]
+
+    def _union(self, calls: frozenset[int], node_id: int) -> frozenset[int]:
+        child = self._calls[node_id]
+        if not child:
+            return calls
+        if not calls:
+            return child
+        return calls | child
+
+
+_store = ExpressionStore()
+
+
+def reset_expression_store() -> None:
+    """Drop all interned expressions; call at the start of each optimize call."""
+    global _store
+    _store = ExpressionStore()
+
+
+def intern(expr: Expression) -> int:
+    """Return the id of `expr`: equal ids mean structurally equal expressions."""
+    return _store.intern(expr)
+
+
+def calls(node_id: int) -> frozenset[int]:
+    """Return the function anchors called anywhere in an interned expression."""
+    return _store.calls(node_id)
+
+
+def plan_expression_count(plan) -> int:
+    """Return how many structurally distinct Expression nodes `plan` contains."""
+    store = ExpressionStore()
+    store.intern(plan)
+    return store.expression_count
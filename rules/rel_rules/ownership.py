@@ -0,0 +1,99 @@
+"""Move protobuf submessages between parents without copying them.
+
+The public protobuf API only places a message into a field via CopyFrom or
+MergeFrom, which deep-copies the whole subtree. A rewrite that reparents a
+child, e.g. Filter(Sort(X)) -> Sort(Filter(X)), therefore copies X, and a
+rewrite cascading down a plan copies every subtree below it: quadratic in
+plan depth.
+
+Inside the component, protobuf runs its pure-Python implementation, where a
+submessage is an object held in its parent's field dict. `take` detaches
+such an object and `put` links it under a new parent, so ownership moves in
+O(1). Under other implementations both fall back to copying.
+
+A message passed to `put`/`put_all` is owned by its new parent afterwards;
+a message returned by `take`/`take_all` is no longer part of its old one.
+"""
+
+from google.protobuf.internal import api_implementation
+
+_PURE_PYTHON = api_implementation.Type() == "python"
+
+if _PURE_PYTHON:
+    from google.protobuf.internal.python_message import _OneofListener
+
+
+def take(msg, name: str):
+    """Detach and return the submessage in field `name`, clearing the field."""
+    child = getattr(msg, name)
+    if _PURE_PYTHON:
+        # Stop the child from notifying (and re-activating oneofs in) msg.
+        child._SetListener(None)
+    else:
+        child = _copy(child)
+    msg.ClearField(name)
+    return child
+
+
+def put(msg, name: str, child) -> None:
+    """Make `child` the value of submessage field `name`, replacing any previous value."""
+    if not _PURE_PYTHON:
+        getattr(msg, name).CopyFrom(child)
+        return
+    field = msg.DESCRIPTOR.fields_by_name[name]
+    if field.containing_oneof is not None:
+        child._SetListener(_OneofListener(msg, field))
+    else:
+        child._SetListener(msg._listener_for_children)
+    child._is_present_in_parent = True
+    msg._fields[field] = child
+    if field.containing_oneof is not None:
+        msg._UpdateOneofState(field)
+    msg._Modified()
+
+
+def take_all(msg, name: str) -> list:
+    """Detach and return all items of repeated submessage field `name`."""
+    items = list(getattr(msg, name))
+    if _PURE_PYTHON:
+        for item in items:
+            item._SetListener(None)
+    else:
+        items = [_copy(item) for item in items]
+    msg.ClearField(name)
+    return items
+
+
+def put_all(msg, name: str, children) -> None:
+    """Append `children` to repeated submessage field `name`."""
+    container = getattr(msg, name)
+    if not _PURE_PYTHON:
+        for child in children:
+            container.add().CopyFrom(child)
+        return
+    listener = container._message_listener
+    for child in children:
+        child._SetListener(listener)
+        child._is_present_in_parent = True
+        container._values.append(child)
+    listener.Modified()
+
+
+def put_at(msg, name: str, index: int, child) -> None:
+    """Make `child` item `index` of repeated submessage field `name`, replacing the old item."""
+    container = getattr(msg, name)
+    if not _PURE_PYTHON:
+        container[index].CopyFrom(child)
+        return
+    container._values[index]._SetListener(None)
+    listener = container._message_listener
+    child._SetListener(listener)
+    child._is_present_in_parent = True
+    container._values[index] = child
+    listener.Modified()
+
+
+def _copy(msg):
+    result = type(msg)()
+    result.CopyFrom(msg)
+    return result
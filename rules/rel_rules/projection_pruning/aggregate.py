@@ -0,0 +1,96 @@
+from substrait.algebra_pb2 import Rel
+
+from dispatch import matches
+from helpers import (
+    collect_field_indices,
+    emit_mapping,
+    prune_input,
+    remap_field_indices_in_place,
+)
+from schema import grouping_key_sets
+
+
+def _measure_expressions(measure) -> list:
+    """The expressions of a measure evaluated over the aggregate's input."""
+    function = measure.measure
+    exprs = [arg.value for arg in function.arguments if arg.HasField("value")]
+    exprs.extend(function.args)
+    exprs.extend(sort.expr for sort in function.sorts if sort.HasField("expr"))
+    if measure.HasField("filter"):
+        exprs.append(measure.filter)
+    return exprs
+
+
+def _grouping_expressions(agg) -> list:
+    exprs = list(agg.grouping_expressions)
+    for grouping in agg.groupings:
+        exprs.extend(grouping.grouping_expressions)
+    return exprs
+
+
+@matches(("aggregate", None))
+def prune_aggregate(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    """Drop unused measures and prune unused input fields from an AggregateRel.
+
+    With an emit, measures the emit does not reference are dropped (a
+    global aggregate keeps one, as it needs at least one output). Grouping
+    keys stay even when unused, since they decide the groups. The input is
+    then pruned to the fields used by the grouping expressions and the
+    remaining measures' arguments, sorts and filters.
+    """
+    if rel.WhichOneof("rel_type") != "aggregate":
+        return None
+    agg = rel.aggregate
+    if not agg.HasField("input"):
+        return None
+
+    key_count = len(grouping_key_sets(agg)[0])
+    measure_count = len(agg.measures)
+
+    emit = emit_mapping(agg)
+    needed_measures = set(range(measure_count))
+    if emit is not None:
+        needed_measures = {
+            idx - key_count for idx in emit if key_count <= idx < key_count + measure_count
+        }
+        if not needed_measures and not key_count and measure_count:
+            needed_measures = {0}
+    can_prune_measures = len(needed_measures) < measure_count
+
+    needed_fields: set[int] = set()
+    expressions = _grouping_expressions(agg)
+    for i in sorted(needed_measures):
+        expressions.extend(_measure_expressions(agg.measures[i]))
+    for expr in expressions:
+        indices = collect_field_indices(expr)
+        if indices is None:
+            return None
+        needed_fields.update(indices)
+
+    input_mapping = prune_input(agg.input, needed_fields)
+    if input_mapping is None and not can_prune_measures:
+        return None
+
+    if can_prune_measures:
+        for i in range(measure_count - 1, -1, -1):
+            if i not in needed_measures:
+                del agg.measures[i]
+        measure_mapping = {old: new for new, old in enumerate(sorted(needed_measures))}
+        new_emit = []
+        for idx in emit:
+            if key_count <= idx < key_count + measure_count:
+                idx = key_count + measure_mapping[idx - key_count]
+            elif idx >= key_count + measure_count:
+                # The grouping set index follows the measures.
+                idx -= measure_count - len(needed_measures)
+            new_emit.append(idx)
+        agg.common.emit.output_mapping[:] = new_emit
+
+    if input_mapping is not None:
+        for expr in _grouping_expressions(agg):
+            remap_field_indices_in_place(expr, input_mapping)
+        for measure in agg.measures:
+            for expr in _measure_expressions(measure):
+                remap_field_indices_in_place(expr, input_mapping)
+
+    return rel
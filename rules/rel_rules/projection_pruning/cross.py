@@ -1,8 +1,10 @@
 from substrait.algebra_pb2 import Rel
 
+from dispatch import matches
 from helpers import prune_bilateral_inputs
 
 
+@matches(("cross", None), requires_emit=True)
 def prune_cross_inputs(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Prune unused input fields from a CrossRel by modifying each input's emit.
 
@@ -23,20 +25,10 @@ def prune_cross_inputs(rel: Rel, optimize_rel, fn_names) -> Rel | None:
 
     emit = list(cross_rel.common.emit.output_mapping)
 
-    pruned = prune_bilateral_inputs(cross_rel.left, cross_rel.right, set(emit))
-    if pruned is None:
+    mapping = prune_bilateral_inputs(cross_rel.left, cross_rel.right, set(emit))
+    if mapping is None:
         return None
-    new_left, new_right, mapping = pruned
 
-    # Build result.
-    result = Rel()
-    result.CopyFrom(rel)
+    cross_rel.common.emit.output_mapping[:] = [mapping[idx] for idx in emit]
 
-    if new_left is not None:
-        result.cross.left.CopyFrom(new_left)
-    if new_right is not None:
-        result.cross.right.CopyFrom(new_right)
-
-    result.cross.common.emit.output_mapping[:] = [mapping[idx] for idx in emit]
-
-    return result
+    return rel
@@ -1,8 +1,10 @@
 from substrait.algebra_pb2 import Rel
 
+from dispatch import matches
 from helpers import prune_single_input_rel
 
 
+@matches(("fetch", None), requires_emit=True)
 def prune_fetch_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Prune unused input fields from a FetchRel by modifying the input's emit.
 
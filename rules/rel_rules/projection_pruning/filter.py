@@ -1,9 +1,10 @@
 from substrait.algebra_pb2 import Rel
 
+from dispatch import matches
 from helpers import (
-    _remap_field_indices_in_place,
     collect_field_indices,
     prune_single_input_rel,
+    remap_field_indices_in_place,
 )
 
 
@@ -15,9 +16,10 @@ def _collect_extra_needed(inner):
 
 def _remap(inner, mapping):
     if inner.HasField("condition"):
-        _remap_field_indices_in_place(inner.condition, mapping)
+        remap_field_indices_in_place(inner.condition, mapping)
 
 
+@matches(("filter", None), requires_emit=True)
 def prune_filter_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Prune unused input fields from a FilterRel by modifying the input's emit.
 
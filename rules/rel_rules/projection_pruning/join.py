@@ -1,34 +1,65 @@
 from substrait.algebra_pb2 import Rel
 
+from dispatch import matches
 from helpers import (
-    _remap_field_indices_in_place,
     collect_field_indices,
+    emit_mapping,
     prune_bilateral_inputs,
+    remap_field_indices_in_place,
 )
+from schema import join_type_name, output_field_count
 
 
+@matches(("join", None))
 def prune_join_inputs(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Prune unused input fields from a JoinRel by modifying each input's emit.
 
     When a JoinRel has an emit mapping, determines which fields are needed
-    from each side (from emit + join expression), then prunes left and right
-    inputs independently. Remaps the join expression and emit accordingly.
+    from each side (from emit + join expression + post-join filter), then
+    prunes left and right inputs independently. Remaps the expressions and
+    emit accordingly. The post-join filter, like the emit, refers to the
+    join's output fields.
+
+    Semi and anti joins output one side only, so their emit is placed on
+    that side of the combined index space. Without an emit they need all of
+    that side, and of the other only the fields the expression uses. Mark
+    joins are left alone: their mark column has no input field to prune
+    against.
     """
     if rel.WhichOneof("rel_type") != "join":
         return None
 
     join_rel = rel.join
 
-    if not join_rel.HasField("common") or not join_rel.common.HasField("emit"):
+    if not join_rel.HasField("left") or not join_rel.HasField("right"):
         return None
 
-    if not join_rel.HasField("left") or not join_rel.HasField("right"):
+    join_type = join_type_name(join_rel)
+    if join_type in ("LEFT_MARK", "RIGHT_MARK"):
+        return None
+
+    left_field_count = output_field_count(join_rel.left)
+    if left_field_count is None:
         return None
 
-    emit = list(join_rel.common.emit.output_mapping)
+    # Offset of the join's output fields in the combined index space.
+    offset = left_field_count if join_type in ("RIGHT_SEMI", "RIGHT_ANTI") else 0
+
+    emit = emit_mapping(join_rel)
+    has_emit = emit is not None
+    if not has_emit:
+        if join_type in ("LEFT_SEMI", "LEFT_ANTI"):
+            emit = list(range(left_field_count))
+        elif join_type in ("RIGHT_SEMI", "RIGHT_ANTI"):
+            right_field_count = output_field_count(join_rel.right)
+            if right_field_count is None:
+                return None
+            emit = list(range(right_field_count))
+        else:
+            return None
 
     # Collect all needed fields (combined index space).
-    needed: set[int] = set(emit)
+    needed: set[int] = {offset + idx for idx in emit}
 
     if join_rel.HasField("expression"):
         expr_indices = collect_field_indices(join_rel.expression)
@@ -36,23 +67,33 @@ def prune_join_inputs(rel: Rel, optimize_rel, fn_names) -> Rel | None:
             return None
         needed.update(expr_indices)
 
-    pruned = prune_bilateral_inputs(join_rel.left, join_rel.right, needed)
-    if pruned is None:
-        return None
-    new_left, new_right, mapping = pruned
-
-    # Build result.
-    result = Rel()
-    result.CopyFrom(rel)
-
-    if new_left is not None:
-        result.join.left.CopyFrom(new_left)
-    if new_right is not None:
-        result.join.right.CopyFrom(new_right)
+    # The post-join filter reads the join's output, like the emit.
+    filter_indices: set[int] = set()
+    if join_rel.HasField("post_join_filter"):
+        filter_indices = collect_field_indices(join_rel.post_join_filter)
+        if filter_indices is None:
+            return None
+        needed.update(offset + idx for idx in filter_indices)
 
-    if result.join.HasField("expression"):
-        _remap_field_indices_in_place(result.join.expression, mapping)
+    mapping = prune_bilateral_inputs(join_rel.left, join_rel.right, needed)
+    if mapping is None:
+        return None
 
-    result.join.common.emit.output_mapping[:] = [mapping[idx] for idx in emit]
+    new_offset = sum(1 for idx in mapping if idx < left_field_count) if offset else 0
 
-    return result
+    if join_rel.HasField("expression"):
+        remap_field_indices_in_place(join_rel.expression, mapping)
+    if join_rel.HasField("post_join_filter"):
+        remap_field_indices_in_place(
+            join_rel.post_join_filter,
+            {idx: mapping[offset + idx] - new_offset for idx in filter_indices},
+        )
+
+    # Without an emit the output side is kept whole, so its fields keep
+    # their positions.
+    if has_emit:
+        join_rel.common.emit.output_mapping[:] = [
+            mapping[offset + idx] - new_offset for idx in emit
+        ]
+
+    return rel
@@ -1,13 +1,15 @@
 from substrait.algebra_pb2 import Rel
 
+from dispatch import matches
 from helpers import (
-    _remap_field_indices_in_place,
     collect_field_indices,
     prune_input,
-    resolve_output_field_count,
+    remap_field_indices_in_place,
 )
+from schema import output_field_count
 
 
+@matches(("project", None), requires_emit=True)
 def prune_project_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Prune unused expressions and input fields from a ProjectRel.
 
@@ -29,7 +31,7 @@ def prune_project_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
 
     emit = list(project_rel.common.emit.output_mapping)
 
-    input_field_count = resolve_output_field_count(project_rel.input)
+    input_field_count = output_field_count(project_rel.input)
     if input_field_count is None:
         return None
 
@@ -53,21 +55,14 @@ def prune_project_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
             needed_input_fields.update(field_indices)
 
     can_prune_exprs = len(needed_expr_indices) < num_expressions
-    pruned = prune_input(project_rel.input, needed_input_fields)
+    input_mapping = prune_input(project_rel.input, needed_input_fields)
 
-    if pruned is None and not can_prune_exprs:
+    if input_mapping is None and not can_prune_exprs:
         return None
 
-    # Build result.
-    result = Rel()
-    result.CopyFrom(rel)
-
-    if pruned is not None:
-        new_input, input_mapping = pruned
-        result.project.input.CopyFrom(new_input)
+    if input_mapping is not None:
         new_input_count = len(input_mapping)
     else:
-        input_mapping = None
         new_input_count = input_field_count
 
     # Drop unused expressions (remove from end to avoid index shift).
@@ -76,14 +71,14 @@ def prune_project_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
         expr_mapping = {old: new for new, old in enumerate(sorted_needed)}
         for i in range(num_expressions - 1, -1, -1):
             if i not in needed_expr_indices:
-                del result.project.expressions[i]
+                del project_rel.expressions[i]
     else:
         expr_mapping = {i: i for i in range(num_expressions)}
 
     # Remap expression field references if input was pruned.
     if input_mapping is not None:
-        for expr in result.project.expressions:
-            _remap_field_indices_in_place(expr, input_mapping)
+        for expr in project_rel.expressions:
+            remap_field_indices_in_place(expr, input_mapping)
 
     # Remap emit.
     new_emit = []
@@ -93,6 +88,6 @@ def prune_project_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
         else:
             expr_idx = idx - input_field_count
             new_emit.append(new_input_count + expr_mapping[expr_idx])
-    result.project.common.emit.output_mapping[:] = new_emit
+    project_rel.common.emit.output_mapping[:] = new_emit
 
-    return result
+    return rel
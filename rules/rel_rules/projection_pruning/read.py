@@ -0,0 +1,209 @@
+from substrait.algebra_pb2 import Expression, Rel
+
+from dispatch import matches
+from helpers import collect_field_paths, emit_mapping, visit_field_references
+from schema import output_types
+
+
+@matches(("read", None), requires_emit=True)
+def push_emit_into_read_projection(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    """Move the field selection of a ReadRel's emit into its projection.
+
+    Readers decode the fields of ReadRel.projection (a MaskExpression) and
+    many ignore the emit, so pruning a read by emit alone still decodes
+    every column. The fields the emit uses become the projection's
+    top-level struct items, composed with any existing projection; the emit
+    is rewritten to index the projected fields, and dropped when it then
+    just passes them through in order.
+
+    Reads of virtual tables are left alone: they have no columns to skip.
+    """
+    if rel.WhichOneof("rel_type") != "read":
+        return None
+    read = rel.read
+    if not read.HasField("base_schema") or read.HasField("virtual_table"):
+        return None
+
+    emit = emit_mapping(read)
+    if emit is None:
+        return None
+
+    items = list(read.projection.select.struct_items)
+    # Setting maintain_singular_struct would wrap the fields that existing
+    # child selections narrow to a single member.
+    if items and not read.projection.maintain_singular_struct:
+        if any(item.HasField("child") for item in items):
+            return None
+    field_count = len(items) if items else len(read.base_schema.struct.types)
+    selected = sorted(set(emit))
+    if any(idx < 0 or idx >= field_count for idx in selected):
+        return None
+    # An empty mask would select every field.
+    if not selected or len(selected) == field_count:
+        return None
+
+    new_items = []
+    for idx in selected:
+        item = Expression.MaskExpression.StructItem(field=idx)
+        if items:
+            item.CopyFrom(items[idx])
+        new_items.append(item)
+    del read.projection.select.struct_items[:]
+    read.projection.select.struct_items.extend(new_items)
+    read.projection.maintain_singular_struct = True
+
+    position = {old: new for new, old in enumerate(selected)}
+    new_emit = [position[idx] for idx in emit]
+    if new_emit == list(range(len(selected))):
+        read.common.direct.SetInParent()
+    else:
+        read.common.emit.output_mapping[:] = new_emit
+    return rel
+
+
+@matches(("project", None), requires_emit=True)
+def prune_nested_read_fields(rel: Rel, optimize_rel, fn_names) -> Rel | None:
+    """Narrow the struct columns of a read to the members a project uses.
+
+    A project over a read (possibly through filters) that only references
+    `payload.user.id`, never `payload` as a whole, needs just that leaf. The read's projection then selects it with a nested
+    StructSelect, so readers skip the rest of `payload`, and the struct
+    member indices in the project's and filters' references are rewritten
+    to index the narrowed struct. Nesting is kept
+    (maintain_singular_struct), so only member positions change.
+
+    Fields the project passes through by emit are needed whole.
+    """
+    if rel.WhichOneof("rel_type") != "project":
+        return None
+    project_rel = rel.project
+    emit = emit_mapping(project_rel)
+    if emit is None:
+        return None
+
+    filters = []
+    input_rel = project_rel.input
+    while input_rel.WhichOneof("rel_type") == "filter":
+        filters.append(input_rel.filter)
+        input_rel = input_rel.filter.input
+    if input_rel.WhichOneof("rel_type") != "read":
+        return None
+    read = input_rel.read
+    if not read.HasField("base_schema") or read.HasField("virtual_table"):
+        return None
+    mask = read.projection
+    if mask.select.struct_items and not mask.maintain_singular_struct:
+        if any(item.HasField("child") for item in mask.select.struct_items):
+            return None
+
+    types = output_types(input_rel)
+    if types is None:
+        return None
+    read_emit = emit_mapping(read)
+    positions = read_emit if read_emit is not None else list(range(len(types)))
+
+    # The expressions of each rel from the read up, with the read output
+    # field each of their input fields is.
+    fields = list(range(len(types)))
+    scopes = []
+    for filter_rel in reversed(filters):
+        scopes.append(([filter_rel.condition], fields))
+        filter_emit = emit_mapping(filter_rel)
+        if filter_emit is not None:
+            if any(idx >= len(fields) for idx in filter_emit):
+                return None
+            fields = [fields[idx] for idx in filter_emit]
+    scopes.append((list(project_rel.expressions), fields))
+
+    paths = {(fields[idx],) for idx in emit if idx < len(fields)}
+    for expressions, fields in scopes:
+        for expr in expressions:
+            expr_paths = collect_field_paths(expr)
+            if expr_paths is None or any(path[0] >= len(fields) for path in expr_paths):
+                return None
+            paths.update((fields[path[0]], *path[1:]) for path in expr_paths)
+
+    # Members used of each projected field: member -> members used of it,
+    # or None where it is used whole. Fields of the read's output that the
+    # emit maps to the same projected field share it.
+    used: dict[int, dict | None] = {}
+    for path in paths:
+        _add_path(used, (positions[path[0]], *path[1:]), types[path[0]])
+
+    items = list(mask.select.struct_items)
+    base_types = read.base_schema.struct.types
+    field_count = len(items) if items else len(base_types)
+    selections = {}
+    for position, members in used.items():
+        if members is None:
+            continue
+        field_type = types[positions.index(position)]
+        existing = items[position].child.struct.struct_items if items else []
+        selected = _select_members(field_type, members, existing)
+        if selected is not None:
+            selections[position] = selected
+    if not selections:
+        return None
+
+    if not items:
+        items = [Expression.MaskExpression.StructItem(field=i) for i in range(field_count)]
+    for position, selected in selections.items():
+        item = items[position]
+        del item.child.struct.struct_items[:]
+        item.child.struct.struct_items.extend(selected)
+    del mask.select.struct_items[:]
+    mask.select.struct_items.extend(items)
+    mask.maintain_singular_struct = True
+
+    def remap(node, fields):
+        segment = node.selection.direct_reference.struct_field
+        position = positions[fields[segment.field]]
+        if position not in selections:
+            return
+        members = used[position]
+        while members and segment.child.WhichOneof("reference_type") == "struct_field":
+            segment = segment.child.struct_field
+            old = segment.field
+            segment.field = sorted(members).index(old)
+            members = members[old]
+
+    for expressions, fields in scopes:
+        for expr in expressions:
+            visit_field_references(expr, lambda node: remap(node, fields))
+    return rel
+
+
+def _add_path(used: dict, path: tuple[int, ...], field_type) -> None:
+    """Record that `path` is used. Paths stop at fields that aren't structs."""
+    key, rest = path[0], path[1:]
+    if key in used and used[key] is None:
+        return
+    members = field_type.struct.types if field_type.WhichOneof("kind") == "struct" else ()
+    if not rest or rest[0] >= len(members):
+        used[key] = None
+        return
+    _add_path(used.setdefault(key, {}), rest, members[rest[0]])
+
+
+def _select_members(field_type, members: dict, existing) -> list | None:
+    """The struct items selecting `members` of a struct field of
+    `field_type`, composed with the `existing` items that already narrow it.
+
+    Returns None if every member is used in full.
+    """
+    types = field_type.struct.types
+    narrowed = len(members) < len(types)
+    selected = []
+    for member in sorted(members):
+        item = Expression.MaskExpression.StructItem(field=member)
+        if existing:
+            item.CopyFrom(existing[member])
+        if members[member] is not None:
+            children = item.child.struct.struct_items if item.HasField("child") else []
+            nested = _select_members(types[member], members[member], children)
+            if nested is not None:
+                del item.child.struct.struct_items[:]
+                item.child.struct.struct_items.extend(nested)
+                narrowed = True
+        selected.append(item)
+    return selected if narrowed else None
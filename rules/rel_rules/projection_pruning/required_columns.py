@@ -0,0 +1,79 @@
+"""Whole-tree required-columns pass.
+
+Each projection pruning rule prunes one node's inputs to the columns the
+node needs, which gives those inputs the emit the rule for the next level
+prunes by. Under the fixed-point driver they meet the plan in whatever
+order the other rules leave it, and a prune that a rewrite higher up
+enables waits for the next pass to reach the nodes below it.
+
+`prune_required_columns` runs them from the root down in one traversal
+instead: a node is pruned only after its parent, so the columns it must
+produce are final when its own inputs are pruned, and every emit and read
+projection in the plan is set by the time the walk reaches the leaves.
+Nodes the parent needs whole (no emit) still prune what only they use,
+e.g. the inner side of a semi join or an aggregate's input.
+"""
+
+from substrait.algebra_pb2 import Rel
+
+from children import child_at, child_slots
+from dispatch import RuleIndex
+from projection_pruning.aggregate import prune_aggregate
+from projection_pruning.cross import prune_cross_inputs
+from projection_pruning.fetch import prune_fetch_input
+from projection_pruning.filter import prune_filter_input
+from projection_pruning.join import prune_join_inputs
+from projection_pruning.projection import prune_project_input
+from projection_pruning.read import prune_nested_read_fields, push_emit_into_read_projection
+from projection_pruning.set_op import prune_set_inputs
+from projection_pruning.sort import prune_sort_input
+from schema import reset_type_cache
+
+# The pruning rules. They apply to a node in the rule index's order.
+PRUNING_RULES = frozenset(
+    (
+        prune_project_input,
+        prune_filter_input,
+        prune_join_inputs,
+        prune_cross_inputs,
+        prune_sort_input,
+        prune_fetch_input,
+        prune_set_inputs,
+        prune_aggregate,
+        push_emit_into_read_projection,
+        prune_nested_read_fields,
+    )
+)
+
+
+def prune_required_columns(rel: Rel, rule_index: RuleIndex, fn_names: dict[int, str]) -> bool:
+    """Prune every node of the tree under `rel`, top-down, to the columns
+    the nodes above it use. `rel` itself keeps all of its outputs.
+
+    The pruning rules among `rule_index`'s candidates for each node run on
+    it, counted in its stats. They update nodes in place, so the tree is
+    pruned where it stands. Returns whether anything changed.
+    """
+    changed = False
+    stack = [rel]
+    while stack:
+        node = stack.pop()
+        for rule in rule_index.candidates(node):
+            if rule not in PRUNING_RULES:
+                continue
+            rule_index.start()
+            result = rule(node, _unchanged, fn_names)
+            rule_index.record(rule, result is not None)
+            if result is not None:
+                # The node's inputs have new emits.
+                reset_type_cache()
+                changed = True
+        # Pruning leaves the children where they are; they are only looked
+        # up now, after their emits are set.
+        stack.extend(child_at(slot) for slot in child_slots(node))
+    return changed
+
+
+def _unchanged(rel: Rel) -> Rel:
+    # The pruning rules do not build subtrees to optimize.
+    return rel
@@ -1,8 +1,10 @@
 from substrait.algebra_pb2 import Rel
 
+from dispatch import matches
 from helpers import prune_input
 
 
+@matches(("set", None), requires_emit=True)
 def prune_set_inputs(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Prune unused input fields from a SetRel by modifying each input's emit.
 
@@ -23,23 +25,14 @@ def prune_set_inputs(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     emit = list(set_rel.common.emit.output_mapping)
     needed = set(emit)
 
-    # Try pruning the first input to check feasibility and get the mapping.
-    pruned_first = prune_input(set_rel.inputs[0], needed)
-    if pruned_first is None:
+    # Pruning the first input checks feasibility and yields the mapping.
+    old_to_new = prune_input(set_rel.inputs[0], needed)
+    if old_to_new is None:
         return None
-    _, old_to_new = pruned_first
 
-    # Prune all inputs (including re-pruning the first for simplicity).
-    new_inputs = []
-    for inp in set_rel.inputs:
-        pruned = prune_input(inp, needed)
-        new_inputs.append(pruned[0] if pruned is not None else inp)
+    for inp in set_rel.inputs[1:]:
+        prune_input(inp, needed)
 
-    result = Rel()
-    result.CopyFrom(rel)
-    for i, new_inp in enumerate(new_inputs):
-        result.set.inputs[i].CopyFrom(new_inp)
+    set_rel.common.emit.output_mapping[:] = [old_to_new[idx] for idx in emit]
 
-    result.set.common.emit.output_mapping[:] = [old_to_new[idx] for idx in emit]
-
-    return result
+    return rel
@@ -1,9 +1,10 @@
 from substrait.algebra_pb2 import Rel
 
+from dispatch import matches
 from helpers import (
-    _remap_field_indices_in_place,
     collect_field_indices,
     prune_single_input_rel,
+    remap_field_indices_in_place,
 )
 
 
@@ -21,9 +22,10 @@ def _collect_extra_needed(inner):
 def _remap(inner, mapping):
     for sort_field in inner.sorts:
         if sort_field.HasField("expr"):
-            _remap_field_indices_in_place(sort_field.expr, mapping)
+            remap_field_indices_in_place(sort_field.expr, mapping)
 
 
+@matches(("sort", None), requires_emit=True)
 def prune_sort_input(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Prune unused input fields from a SortRel by modifying the input's emit.
 
@@ -0,0 +1,61 @@
+"""The rel-rules, in priority order.
+
+Shared by every rule group that runs them (see `rules/memo_rules`).
+"""
+
+from fetch_pushdown.join import push_fetch_into_outer_join
+from fetch_pushdown.project import push_fetch_through_project
+from fetch_pushdown.set_op import push_fetch_into_union
+from filter_pushdown.aggregate import push_filter_through_aggregate
+from filter_pushdown.cross import push_filter_through_cross
+from filter_pushdown.join import push_filter_through_join
+from filter_pushdown.join_condition import push_join_conditions_into_inputs
+from filter_pushdown.join_keys import infer_join_key_not_null
+from filter_pushdown.merge import merge_adjacent_filters
+from filter_pushdown.outer_join import simplify_outer_join
+from filter_pushdown.partition import prune_partitions
+from filter_pushdown.passthrough import push_filter_through_passthrough
+from filter_pushdown.project import push_filter_through_project
+from filter_pushdown.read import push_filter_into_read
+from filter_pushdown.set_op import push_filter_through_set
+from filter_pushdown.transitive import infer_transitive_predicates
+from projection_pruning.aggregate import prune_aggregate
+from projection_pruning.cross import prune_cross_inputs
+from projection_pruning.fetch import prune_fetch_input
+from projection_pruning.filter import prune_filter_input
+from projection_pruning.join import prune_join_inputs
+from projection_pruning.projection import prune_project_input
+from projection_pruning.read import prune_nested_read_fields, push_emit_into_read_projection
+from projection_pruning.set_op import prune_set_inputs
+from projection_pruning.sort import prune_sort_input
+from simplification.project import remove_identity_project
+
+RULES = [
+    merge_adjacent_filters,
+    push_filter_through_cross,
+    simplify_outer_join,
+    push_filter_through_join,
+    push_join_conditions_into_inputs,
+    infer_transitive_predicates,
+    infer_join_key_not_null,
+    push_filter_through_project,
+    push_filter_through_aggregate,
+    push_filter_through_set,
+    push_filter_through_passthrough,
+    push_filter_into_read,
+    prune_partitions,
+    push_fetch_through_project,
+    push_fetch_into_union,
+    push_fetch_into_outer_join,
+    prune_project_input,
+    prune_filter_input,
+    prune_join_inputs,
+    prune_cross_inputs,
+    prune_sort_input,
+    prune_fetch_input,
+    prune_set_inputs,
+    prune_aggregate,
+    push_emit_into_read_projection,
+    prune_nested_read_fields,
+    remove_identity_project,
+]
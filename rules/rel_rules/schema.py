@@ -0,0 +1,537 @@
+"""Output type derivation for Substrait relations.
+
+`output_types(rel)` derives the types of the fields a relation produces,
+after applying its emit mapping, as a tuple of `Type` messages. Fields whose
+type cannot be derived (e.g. an expression kind not modeled here) are given
+as an empty `Type()`, so the field count is still known; None means the
+shape of the output itself is unknown.
+
+Results are cached per pass (see `reset_type_cache`) and shared between
+nodes: a filter returns its input's tuple as is. Callers must not mutate the
+returned messages.
+"""
+
+from substrait.algebra_pb2 import AggregateRel, Expression, Rel
+from substrait.type_pb2 import Type
+
+_UNKNOWN = Type()
+
+_NULLABLE = Type.NULLABILITY_NULLABLE
+_REQUIRED = Type.NULLABILITY_REQUIRED
+
+# Per-pass cache of output_types results, keyed by node identity. The node is
+# stored alongside its types so its id cannot be reused while the entry is
+# alive.
+_cache: dict[int, tuple[Rel, tuple[Type, ...] | None]] = {}
+
+
+def reset_type_cache() -> None:
+    """Drop all cached output types.
+
+    Called at the start of each pass and whenever a rule rewrites the plan:
+    rewrites mutate nodes in place and can change the types of the nodes
+    inside the rewritten subtree (e.g. an input pruned by a new emit).
+    """
+    _cache.clear()
+
+
+def output_types(rel: Rel) -> tuple[Type, ...] | None:
+    """Derive the output field types of `rel`, after its emit. None if unknown."""
+    entry = _cache.get(id(rel))
+    if entry is not None and entry[0] is rel:
+        return entry[1]
+    types = _derive(rel)
+    _cache[id(rel)] = (rel, types)
+    return types
+
+
+def output_type(rel: Rel) -> Type.Struct | None:
+    """Derive the output struct type of `rel`, after its emit. None if unknown."""
+    types = output_types(rel)
+    if types is None:
+        return None
+    struct = Type.Struct(nullability=_REQUIRED)
+    struct.types.extend(types)
+    return struct
+
+
+def output_field_count(rel: Rel) -> int | None:
+    """Count the fields `rel` outputs, after its emit. None if unknown."""
+    types = output_types(rel)
+    return None if types is None else len(types)
+
+
+def _derive(rel: Rel) -> tuple[Type, ...] | None:
+    rel_type = rel.WhichOneof("rel_type")
+    if rel_type is None:
+        return None
+    inner = getattr(rel, rel_type)
+    derive = _DERIVERS.get(rel_type)
+    types = derive(inner) if derive is not None else None
+    common = inner.common if "common" in inner.DESCRIPTOR.fields_by_name else None
+    if types is None:
+        # Fall back to the declared output names, which give the shape of
+        # the output when its types cannot be derived (e.g. extension rels).
+        if common is None or not common.hint.output_names:
+            return None
+        return (_UNKNOWN,) * len(common.hint.output_names)
+    if common is not None and common.HasField("emit"):
+        mapping = common.emit.output_mapping
+        if any(idx < 0 or idx >= len(types) for idx in mapping):
+            return None
+        return tuple(types[idx] for idx in mapping)
+    return types
+
+
+def _input_types(inner) -> tuple[Type, ...] | None:
+    if not inner.HasField("input"):
+        return None
+    return output_types(inner.input)
+
+
+# -- Relations -----------------------------------------------------------------
+
+
+def _derive_read(read) -> tuple[Type, ...] | None:
+    if read.HasField("base_schema"):
+        types = tuple(read.base_schema.struct.types)
+    elif read.HasField("virtual_table"):
+        types = _virtual_table_types(read.virtual_table)
+        if types is None:
+            return None
+    else:
+        return None
+    if read.HasField("projection"):
+        return _apply_mask(types, read.projection)
+    return types
+
+
+def _virtual_table_types(table) -> tuple[Type, ...] | None:
+    if table.expressions:
+        return tuple(expression_type(e, ()) for e in table.expressions[0].fields)
+    if table.values:
+        return tuple(literal_type(lit) for lit in table.values[0].fields)
+    return None
+
+
+def _apply_mask(types: tuple[Type, ...], mask) -> tuple[Type, ...] | None:
+    items = mask.select.struct_items
+    if not items:
+        return types
+    result = []
+    for item in items:
+        if item.field < 0 or item.field >= len(types):
+            return None
+        field_type = types[item.field]
+        if item.HasField("child"):
+            field_type = _apply_select(field_type, item.child, mask.maintain_singular_struct)
+        result.append(field_type)
+    return tuple(result)
+
+
+def _apply_select(field_type: Type, select, maintain_singular_struct: bool) -> Type:
+    """Narrow a field's type by a nested mask selection."""
+    if select.WhichOneof("type") != "struct" or field_type.WhichOneof("kind") != "struct":
+        # List and map selections pick elements, not a different type.
+        return field_type
+    items = select.struct.struct_items
+    if not items:
+        return field_type
+    members = field_type.struct.types
+    narrowed = []
+    for item in items:
+        if item.field < 0 or item.field >= len(members):
+            return _UNKNOWN
+        member = members[item.field]
+        if item.HasField("child"):
+            member = _apply_select(member, item.child, maintain_singular_struct)
+        narrowed.append(member)
+    if len(narrowed) == 1 and not maintain_singular_struct:
+        return narrowed[0]
+    result = Type()
+    result.struct.nullability = field_type.struct.nullability
+    result.struct.types.extend(narrowed)
+    return result
+
+
+def _derive_passthrough(inner) -> tuple[Type, ...] | None:
+    return _input_types(inner)
+
+
+def _derive_project(project) -> tuple[Type, ...] | None:
+    input_types = _input_types(project)
+    if input_types is None:
+        return None
+    return input_types + tuple(expression_type(e, input_types) for e in project.expressions)
+
+
+def _derive_cross(cross) -> tuple[Type, ...] | None:
+    if not cross.HasField("left") or not cross.HasField("right"):
+        return None
+    left = output_types(cross.left)
+    right = output_types(cross.right)
+    if left is None or right is None:
+        return None
+    return left + right
+
+
+def _derive_join(join) -> tuple[Type, ...] | None:
+    if not join.HasField("left") or not join.HasField("right"):
+        return None
+    left = output_types(join.left)
+    right = output_types(join.right)
+    if left is None or right is None:
+        return None
+    return join_output_types(join_type_name(join), left, right)
+
+
+def join_type_name(join) -> str:
+    """The join's type as a name shared by all join rels, e.g. "LEFT_SEMI".
+
+    Join, hash join, merge join and nested loop join each declare their own
+    JoinType enum, and the enum values differ between them.
+    """
+    return type(join).JoinType.Name(join.type).removeprefix("JOIN_TYPE_")
+
+
+def join_output_types(
+    join_type: str, left: tuple[Type, ...], right: tuple[Type, ...]
+) -> tuple[Type, ...] | None:
+    """Output types of a join of `left` and `right` with the given type name.
+
+    Semi and anti joins return one side only; mark joins return one side plus
+    a nullable boolean mark column; outer sides become nullable.
+    """
+    if join_type == "UNSPECIFIED":
+        return None
+    if join_type in ("LEFT_SEMI", "LEFT_ANTI"):
+        return left
+    if join_type in ("RIGHT_SEMI", "RIGHT_ANTI"):
+        return right
+    if join_type == "LEFT_MARK":
+        return left + (_MARK,)
+    if join_type == "RIGHT_MARK":
+        return right + (_MARK,)
+    if join_type in ("RIGHT", "OUTER", "RIGHT_SINGLE"):
+        left = tuple(nullable(t) for t in left)
+    if join_type in ("LEFT", "OUTER", "LEFT_SINGLE"):
+        right = tuple(nullable(t) for t in right)
+    return left + right
+
+
+def _derive_aggregate(agg) -> tuple[Type, ...] | None:
+    input_types = _input_types(agg) or ()
+    keys, sets = grouping_key_sets(agg)
+    result = []
+    for i, key in enumerate(keys):
+        key_type = expression_type(key, input_types)
+        if len(sets) > 1 and not all(i in s for s in sets):
+            # Keys missing from some grouping set are null in its rows.
+            key_type = nullable(key_type)
+        result.append(key_type)
+    for measure in agg.measures:
+        result.append(measure.measure.output_type)
+    if len(sets) > 1:
+        result.append(_GROUPING_SET_INDEX)
+    return tuple(result)
+
+
+def grouping_key_sets(agg: AggregateRel) -> tuple[list[Expression], list[list[int]]]:
+    """Split an aggregate's groupings into output keys and per-set key indices.
+
+    The aggregate outputs each distinct grouping expression once, in order
+    of first appearance. Returns those expressions and, for each grouping
+    set, the indices (into the key list) of the keys it groups by. Handles
+    both groupings listing their own expressions and groupings referencing
+    `AggregateRel.grouping_expressions`.
+    """
+    if agg.grouping_expressions:
+        keys = list(agg.grouping_expressions)
+        sets = [list(g.expression_references) for g in agg.groupings]
+        return keys, sets
+    keys = []
+    positions: dict[bytes, int] = {}
+    sets = []
+    for grouping in agg.groupings:
+        indices = []
+        for expr in grouping.grouping_expressions:
+            key = expr.SerializeToString(deterministic=True)
+            if key not in positions:
+                positions[key] = len(keys)
+                keys.append(expr)
+            indices.append(positions[key])
+        sets.append(indices)
+    return keys, sets
+
+
+def _derive_set(set_rel) -> tuple[Type, ...] | None:
+    if not set_rel.inputs:
+        return None
+    inputs = [output_types(inp) for inp in set_rel.inputs]
+    first = inputs[0]
+    if first is None:
+        return None
+    # A field is nullable if it is nullable in any input.
+    result = list(first)
+    for other in inputs[1:]:
+        if other is None or len(other) != len(first):
+            continue
+        for i, t in enumerate(other):
+            if is_nullable(t) and not is_nullable(result[i]):
+                result[i] = nullable(result[i])
+    return tuple(result)
+
+
+def _derive_window(window) -> tuple[Type, ...] | None:
+    input_types = _input_types(window)
+    if input_types is None:
+        return None
+    return input_types + tuple(f.output_type for f in window.window_functions)
+
+
+def _derive_expand(expand) -> tuple[Type, ...] | None:
+    input_types = _input_types(expand) or ()
+    result = []
+    for field in expand.fields:
+        if field.HasField("consistent_field"):
+            result.append(expression_type(field.consistent_field, input_types))
+        elif field.switching_field.duplicates:
+            result.append(expression_type(field.switching_field.duplicates[0], input_types))
+        else:
+            result.append(_UNKNOWN)
+    return tuple(result)
+
+
+# Extension, reference and write/ddl rels define their own output shape and
+# are only known through their declared output names (see `_derive`).
+_DERIVERS = {
+    "read": _derive_read,
+    "filter": _derive_passthrough,
+    "fetch": _derive_passthrough,
+    "sort": _derive_passthrough,
+    "exchange": _derive_passthrough,
+    "project": _derive_project,
+    "cross": _derive_cross,
+    "join": _derive_join,
+    "hash_join": _derive_join,
+    "merge_join": _derive_join,
+    "nested_loop_join": _derive_join,
+    "aggregate": _derive_aggregate,
+    "set": _derive_set,
+    "window": _derive_window,
+    "expand": _derive_expand,
+}
+
+
+# -- Types ---------------------------------------------------------------------
+
+
+def _boolean(nullability: int) -> Type:
+    result = Type()
+    result.bool.nullability = nullability
+    return result
+
+
+_MARK = _boolean(_NULLABLE)
+
+_GROUPING_SET_INDEX = Type()
+_GROUPING_SET_INDEX.i32.nullability = _REQUIRED
+
+
+def is_nullable(t: Type) -> bool:
+    """Whether values of type `t` may be null. Unknown types count as nullable."""
+    kind = t.WhichOneof("kind")
+    if kind is None:
+        return True
+    # The deprecated user_defined_type_reference is a bare uint32.
+    if Type.DESCRIPTOR.fields_by_name[kind].message_type is None:
+        return True
+    inner = getattr(t, kind)
+    if "nullability" not in inner.DESCRIPTOR.fields_by_name:
+        return True
+    return inner.nullability != _REQUIRED
+
+
+def nullable(t: Type) -> Type:
+    """Return `t` with nullable nullability (`t` itself if already nullable)."""
+    if is_nullable(t):
+        return t
+    result = Type()
+    result.CopyFrom(t)
+    getattr(result, result.WhichOneof("kind")).nullability = _NULLABLE
+    return result
+
+
+# -- Expressions ---------------------------------------------------------------
+
+
+def expression_type(expr: Expression, input_types: tuple[Type, ...]) -> Type:
+    """Derive the type of `expr` evaluated over fields of `input_types`.
+
+    Returns an empty `Type()` when the type cannot be derived.
+    """
+    rex_type = expr.WhichOneof("rex_type")
+    if rex_type == "selection":
+        return _selection_type(expr.selection, input_types)
+    if rex_type == "literal":
+        return literal_type(expr.literal)
+    if rex_type in ("scalar_function", "window_function"):
+        return getattr(expr, rex_type).output_type
+    if rex_type == "cast":
+        return expr.cast.type
+    if rex_type in ("if_then", "switch_expression"):
+        branches = getattr(expr, rex_type)
+        if branches.ifs:
+            return expression_type(branches.ifs[0].then, input_types)
+        # `else` is a Python keyword, so the field is only reachable by name.
+        if not branches.HasField("else"):
+            return _UNKNOWN
+        return expression_type(getattr(branches, "else"), input_types)
+    if rex_type in ("singular_or_list", "multi_or_list"):
+        return _MARK
+    if rex_type == "subquery":
+        return _subquery_type(expr.subquery)
+    if rex_type == "nested":
+        return _nested_type(expr.nested, input_types)
+    if rex_type == "dynamic_parameter":
+        return expr.dynamic_parameter.type
+    return _UNKNOWN
+
+
+def _selection_type(ref, input_types: tuple[Type, ...]) -> Type:
+    if ref.WhichOneof("reference_type") != "direct_reference":
+        return _UNKNOWN
+    if ref.WhichOneof("root_type") not in (None, "root_reference"):
+        return _UNKNOWN
+    segment = ref.direct_reference
+    if segment.WhichOneof("reference_type") != "struct_field":
+        return _UNKNOWN
+    field = segment.struct_field.field
+    if field < 0 or field >= len(input_types):
+        return _UNKNOWN
+    result = input_types[field]
+    segment = segment.struct_field
+    while segment.HasField("child"):
+        segment = segment.child
+        if segment.WhichOneof("reference_type") != "struct_field":
+            return _UNKNOWN
+        if result.WhichOneof("kind") != "struct":
+            return _UNKNOWN
+        members = result.struct.types
+        field = segment.struct_field.field
+        if field < 0 or field >= len(members):
+            return _UNKNOWN
+        # A member of a nullable struct is null whenever the struct is.
+        parent_nullable = is_nullable(result)
+        result = members[field]
+        if parent_nullable:
+            result = nullable(result)
+        segment = segment.struct_field
+    return result
+
+
+def _subquery_type(subquery) -> Type:
+    kind = subquery.WhichOneof("subquery_type")
+    if kind is None:
+        return _UNKNOWN
+    if kind != "scalar":
+        # IN, EXISTS/UNIQUE and ANY/ALL subqueries are predicates.
+        return _MARK
+    if not subquery.scalar.HasField("input"):
+        return _UNKNOWN
+    types = output_types(subquery.scalar.input)
+    if not types:
+        return _UNKNOWN
+    # An empty subquery result yields null.
+    return nullable(types[0])
+
+
+def _nested_type(nested, input_types: tuple[Type, ...]) -> Type:
+    nullability = _NULLABLE if nested.nullable else _REQUIRED
+    kind = nested.WhichOneof("nested_type")
+    result = Type()
+    if kind == "struct":
+        result.struct.nullability = nullability
+        result.struct.types.extend(expression_type(f, input_types) for f in nested.struct.fields)
+    elif kind == "list" and nested.list.values:
+        result.list.nullability = nullability
+        result.list.type.CopyFrom(expression_type(nested.list.values[0], input_types))
+    elif kind == "map" and nested.map.key_values:
+        first = nested.map.key_values[0]
+        result.map.nullability = nullability
+        result.map.key.CopyFrom(expression_type(first.key, input_types))
+        result.map.value.CopyFrom(expression_type(first.value, input_types))
+    else:
+        return _UNKNOWN
+    return result
+
+
+# Literal kinds whose type carries nothing but nullability, mapped to the
+# corresponding type kind.
+_SIMPLE_LITERAL_KINDS = {
+    "boolean": "bool",
+    "i8": "i8",
+    "i16": "i16",
+    "i32": "i32",
+    "i64": "i64",
+    "fp32": "fp32",
+    "fp64": "fp64",
+    "string": "string",
+    "binary": "binary",
+    "timestamp": "timestamp",
+    "date": "date",
+    "time": "time",
+    "interval_year_to_month": "interval_year",
+    "timestamp_tz": "timestamp_tz",
+    "uuid": "uuid",
+}
+
+
+def literal_type(literal: Expression.Literal) -> Type:
+    """Derive the type of a literal value. Empty `Type()` if not derivable."""
+    kind = literal.WhichOneof("literal_type")
+    nullability = _NULLABLE if literal.nullable else _REQUIRED
+    result = Type()
+    if kind in _SIMPLE_LITERAL_KINDS:
+        getattr(result, _SIMPLE_LITERAL_KINDS[kind]).nullability = nullability
+    elif kind == "null":
+        return nullable(literal.null)
+    elif kind == "empty_list":
+        result.list.CopyFrom(literal.empty_list)
+    elif kind == "empty_map":
+        result.map.CopyFrom(literal.empty_map)
+    elif kind == "fixed_char":
+        result.fixed_char.length = len(literal.fixed_char)
+        result.fixed_char.nullability = nullability
+    elif kind == "var_char":
+        result.varchar.length = literal.var_char.length
+        result.varchar.nullability = nullability
+    elif kind == "fixed_binary":
+        result.fixed_binary.length = len(literal.fixed_binary)
+        result.fixed_binary.nullability = nullability
+    elif kind == "decimal":
+        result.decimal.precision = literal.decimal.precision
+        result.decimal.scale = literal.decimal.scale
+        result.decimal.nullability = nullability
+    elif kind in ("precision_time", "precision_timestamp", "precision_timestamp_tz"):
+        target = getattr(result, kind)
+        target.precision = getattr(literal, kind).precision
+        target.nullability = nullability
+    elif kind == "interval_day_to_second":
+        result.interval_day.nullability = nullability
+        if literal.interval_day_to_second.HasField("precision"):
+            result.interval_day.precision = literal.interval_day_to_second.precision
+    elif kind == "struct":
+        result.struct.nullability = nullability
+        result.struct.types.extend(literal_type(f) for f in literal.struct.fields)
+    elif kind == "list" and literal.list.values:
+        result.list.nullability = nullability
+        result.list.type.CopyFrom(literal_type(literal.list.values[0]))
+    elif kind == "map" and literal.map.key_values:
+        first = literal.map.key_values[0]
+        result.map.nullability = nullability
+        result.map.key.CopyFrom(literal_type(first.key))
+        result.map.value.CopyFrom(literal_type(first.value))
+    else:
+        return _UNKNOWN
+    return result
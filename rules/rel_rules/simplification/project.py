@@ -1,8 +1,11 @@
 from substrait.algebra_pb2 import Expression, Rel
 
-from helpers import resolve_output_field_count
+from dispatch import matches
+from ownership import take
+from schema import output_field_count
 
 
+@matches(("project", None))
 def remove_identity_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     """Remove a ProjectRel that is an identity (output equals input).
 
@@ -20,7 +23,7 @@ def remove_identity_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if not project_rel.HasField("input"):
         return None
 
-    input_field_count = resolve_output_field_count(project_rel.input)
+    input_field_count = output_field_count(project_rel.input)
     if input_field_count is None:
         return None
 
@@ -29,9 +32,7 @@ def remove_identity_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
     if not project_rel.HasField("common") or not project_rel.common.HasField("emit"):
         # Without emit: output = input fields + expressions. Identity iff no expressions.
         if num_expressions == 0:
-            result = Rel()
-            result.CopyFrom(project_rel.input)
-            return result
+            return take(project_rel, "input")
         return None
 
     emit = list(project_rel.common.emit.output_mapping)
@@ -56,9 +57,7 @@ def remove_identity_project(rel: Rel, optimize_rel, fn_names) -> Rel | None:
             # Pass-through of wrong input field.
             return None
 
-    result = Rel()
-    result.CopyFrom(project_rel.input)
-    return result
+    return take(project_rel, "input")
 
 
 def _is_field_ref(expr: Expression, expected_field: int) -> bool:
@@ -71,4 +70,6 @@ def _is_field_ref(expr: Expression, expected_field: int) -> bool:
     segment = ref.direct_reference
     if segment.WhichOneof("reference_type") != "struct_field":
         return False
+    if segment.struct_field.HasField("child"):
+        return False
     return segment.struct_field.field == expected_field
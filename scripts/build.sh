@@ -12,6 +12,22 @@ for rule_dir in "$REPO_ROOT"/rules/*/; do
     rule_name="$(basename "$rule_dir")"
     echo "Building rule group: $rule_name"
 
+    # Optional per-group settings in build.env: PYTHON_PATH lists other rule
+    # group directories (under rules/) whose modules the group imports, and
+    # OUTPUT_DIR puts the component in a subdirectory of components/, which
+    # the manager does not load by default.
+    PYTHON_PATH=""
+    OUTPUT_DIR=""
+    if [ -f "$rule_dir/build.env" ]; then
+        source "$rule_dir/build.env"
+    fi
+    path_args=(-p "$rule_dir")
+    for dep in $PYTHON_PATH; do
+        path_args+=(-p "$REPO_ROOT/rules/$dep")
+    done
+    out_dir="$COMPONENTS_DIR${OUTPUT_DIR:+/$OUTPUT_DIR}"
+    mkdir -p "$out_dir"
+
     # Generate guest-side bindings (clean first to avoid conflicts)
     rm -rf "$rule_dir/bindings"
     uv run componentize-py \
@@ -24,11 +40,11 @@ for rule_dir in "$REPO_ROOT"/rules/*/; do
         -d "$WIT_DIR" \
         -w distill-plugin \
         componentize \
-        -p "$rule_dir" \
+        "${path_args[@]}" \
         app \
-        -o "$COMPONENTS_DIR/${rule_name}.wasm"
+        -o "$out_dir/${rule_name}.wasm"
 
-    echo "  -> $COMPONENTS_DIR/${rule_name}.wasm"
+    echo "  -> $out_dir/${rule_name}.wasm"
 done
 
 echo "Done. Built $(ls "$COMPONENTS_DIR"/*.wasm 2>/dev/null | wc -l) component(s)."
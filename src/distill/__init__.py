@@ -1,3 +1,3 @@
-from distill.manager import Manager
+from distill.manager import Manager, OptimizeReport, RuleGroupReport, RuleStats
 
-__all__ = ["Manager"]
+__all__ = ["Manager", "OptimizeReport", "RuleGroupReport", "RuleStats"]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from wasmtime import Engine, Store, WasiConfig
@@ -13,6 +13,54 @@ class RuleGroupInfo:
     description: str
 
 
+@dataclass
+class RuleStats:
+    """How often one rule was tried and fired, and the time spent in it."""
+
+    name: str
+    invocations: int = 0
+    fires: int = 0
+    nanos: int = 0
+
+
+@dataclass
+class OptimizeOutput:
+    plan: bytes
+    passes: int
+    converged: bool
+    stats: list[RuleStats] = field(default_factory=list)
+
+
+@dataclass
+class RuleGroupReport:
+    """What one rule group did during a `Manager.optimize` call.
+
+    `rules` sums the per-rule statistics the group reported over all its
+    calls, keyed by rule name.
+    """
+
+    name: str
+    calls: int = 0
+    passes: int = 0
+    skipped: int = 0
+    rules: dict[str, RuleStats] = field(default_factory=dict)
+
+    def add_stats(self, stats: list[RuleStats]) -> None:
+        for rule in stats:
+            total = self.rules.setdefault(rule.name, RuleStats(rule.name))
+            total.invocations += rule.invocations
+            total.fires += rule.fires
+            total.nanos += rule.nanos
+
+
+@dataclass
+class OptimizeReport:
+    """What a `Manager.optimize` call did, per rule group."""
+
+    iterations: int = 0
+    groups: list[RuleGroupReport] = field(default_factory=list)
+
+
 class _LoadedRuleGroup:
     """A loaded WASM rule-group component ready to execute."""
 
@@ -20,6 +68,7 @@ class _LoadedRuleGroup:
         self._engine: Engine = engine
         self._component: Component = component
         self._linker: Linker = linker
+        self.name: str = ""
 
     def _make_instance(self) -> tuple[Store, Instance]:
         store = Store(self._engine)
@@ -51,14 +100,27 @@ class _LoadedRuleGroup:
         func.post_return(store)
         return RuleGroupInfo(name=result.name, description=result.description)
 
-    def optimize(self, plan_bytes: bytes) -> bytes:
+    def optimize(self, plan_bytes: bytes) -> OptimizeOutput:
         store, instance = self._make_instance()
         func = self._get_func(store, instance, "optimize")
         result = func(store, plan_bytes)
         func.post_return(store)
         if isinstance(result, str):
             raise RuntimeError(f"rule group returned error: {result}")
-        return result
+
+        # Stats live in the instance, so they are read from the same one.
+        stats_func = self._get_func(store, instance, "stats")
+        stats = stats_func(store)
+        stats_func.post_return(store)
+
+        return OptimizeOutput(
+            plan=bytes(result.plan),
+            passes=result.passes,
+            converged=result.converged,
+            stats=[
+                RuleStats(s.name, s.invocations, s.fires, s.nanos) for s in stats
+            ],
+        )
 
 
 class Manager:
@@ -66,6 +128,10 @@ class Manager:
 
     Loads rule-group components from a directory and applies them in a fixed-point
     loop until the plan stabilizes or a maximum iteration count is reached.
+
+    Rule groups iterate internally and report whether they converged; a
+    converged group is not called again on its own output. The report of the
+    latest `optimize` call is kept in `last_report`.
     """
 
     def __init__(self, components_dir: str | Path, max_iterations: int = 10):
@@ -75,6 +141,7 @@ class Manager:
         self._linker = Linker(self._engine)
         self._linker.add_wasip2()
         self._rule_groups: list[_LoadedRuleGroup] = []
+        self.last_report: OptimizeReport = OptimizeReport()
 
     def load_components(self) -> list[RuleGroupInfo]:
         """Load all .wasm rule-group components from the components directory.
@@ -88,6 +155,7 @@ class Manager:
             component = Component.from_file(self._engine, str(wasm_path))
             rg = _LoadedRuleGroup(self._engine, component, self._linker)
             info = rg.info()
+            rg.name = info.name
             self._rule_groups.append(rg)
             infos.append(info)
 
@@ -103,17 +171,30 @@ class Manager:
             The optimized serialized plan.
         """
         current = plan_bytes
+        report = OptimizeReport(groups=[RuleGroupReport(rg.name) for rg in self._rule_groups])
+        # Output of each rule group's last call, if it reached its fixed point.
+        converged_at: list[bytes | None] = [None] * len(self._rule_groups)
 
         for _ in range(self._max_iterations):
+            report.iterations += 1
             changed = False
 
-            for rg in self._rule_groups:
+            for i, rg in enumerate(self._rule_groups):
+                group_report = report.groups[i]
+                if converged_at[i] is not None and converged_at[i] == current:
+                    group_report.skipped += 1
+                    continue
                 result = rg.optimize(current)
-                if result != current:
-                    current = result
+                group_report.calls += 1
+                group_report.passes += result.passes
+                group_report.add_stats(result.stats)
+                converged_at[i] = result.plan if result.converged else None
+                if result.plan != current:
+                    current = result.plan
                     changed = True
 
             if not changed:
                 break
 
+        self.last_report = report
         return current
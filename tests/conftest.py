@@ -23,6 +23,15 @@ def make_read(table_name: str, field_names: list[str]) -> PlanOrUnbound:
     return pb.read_named_table(table_name, schema)
 
 
+def read_fields(read) -> list[int]:
+    """The base_schema fields a read outputs, through its projection and emit."""
+    items = read.projection.select.struct_items
+    fields = [item.field for item in items] or list(range(len(read.base_schema.struct.types)))
+    if read.common.HasField("emit"):
+        return [fields[i] for i in read.common.emit.output_mapping]
+    return fields
+
+
 def make_fetch(
     plan: PlanOrUnbound, offset: int, count: int
 ) -> PlanOrUnbound:
@@ -0,0 +1,89 @@
+from substrait.algebra_pb2 import JoinRel, SetRel
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+
+from ..conftest import get_rel_type, make_read, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+
+# Stay below the protobuf parser's nesting limit when reading results back.
+DEPTH = 40
+
+
+def _sort_stack(plan, depth):
+    for _ in range(depth):
+        plan = pb.sort(plan, [column(0)])
+    return plan
+
+
+def _join_tree(levels, first_table=0, extra=None):
+    """Balanced inner-join tree over 2-field reads, each join under a filter
+    spanning both sides (ANDed with `extra` at the top). Returns (plan, field_count)."""
+    if levels == 0:
+        return make_read(f"t{first_table}", ["a", "b"]), 2
+    left, left_count = _join_tree(levels - 1, first_table)
+    right, right_count = _join_tree(levels - 1, first_table + 2 ** (levels - 1))
+    cond = scalar_function(COMPARISON_URN, "equal", [column(0), column(left_count)])
+    joined = pb.join(left, right, cond, JoinRel.JOIN_TYPE_INNER)
+    mixed = scalar_function(COMPARISON_URN, "equal", [column(1), column(left_count + 1)])
+    if extra is not None:
+        mixed = scalar_function(BOOLEAN_URN, "and", [mixed, extra])
+    return pb.filter(joined, mixed), left_count + right_count
+
+
+class TestDeepPlans:
+    def test_filter_pushed_through_deep_sort_stack(self, manager):
+        """A filter above many sorts ends up directly above the read."""
+        plan = pb.filter(_sort_stack(make_read("t", ["a", "b"]), DEPTH), column(1))
+        result = optimize(manager, plan)
+
+        rel = result.relations[0].root.input
+        for _ in range(DEPTH):
+            assert get_rel_type(rel) == "sort"
+            assert len(rel.sort.sorts) == 1
+            rel = rel.sort.input
+        assert get_rel_type(rel) == "filter"
+        assert get_rel_type(rel.filter.input) == "read"
+        assert rel.filter.input.read.HasField("best_effort_filter")
+
+    def test_filter_pushed_into_every_union_input(self, manager):
+        """Each input of a wide union gets its own copy of the filter."""
+        inputs = [_sort_stack(make_read(f"t{i}", ["a", "b"]), 3) for i in range(20)]
+        unioned = pb.set(inputs, SetRel.SET_OP_UNION_ALL)
+        result = optimize(manager, pb.filter(unioned, column(1)))
+
+        set_rel = result.relations[0].root.input.set
+        assert len(set_rel.inputs) == 20
+        for i, inp in enumerate(set_rel.inputs):
+            rel = inp
+            for _ in range(3):
+                assert get_rel_type(rel) == "sort"
+                rel = rel.sort.input
+            assert get_rel_type(rel) == "filter"
+            assert rel.filter.condition.selection.direct_reference.struct_field.field == 1
+            assert rel.filter.input.read.named_table.names[0] == f"t{i}"
+
+    def test_pushdown_through_join_tree(self, manager):
+        """A single-table conjunct descends a join tree to the right read,
+        with its field index adjusted at every level."""
+        # Field 13 = second field of t6 (right -> right -> left).
+        pred = scalar_function(COMPARISON_URN, "is_not_null", [column(13)])
+        plan, _ = _join_tree(3, extra=pred)
+        result = optimize(manager, plan)
+
+        # The mixed filters are absorbed into the join conditions.
+        rel = result.relations[0].root.input
+        for side in ("right", "right", "left"):
+            assert get_rel_type(rel) == "join"
+            assert len(rel.join.expression.scalar_function.arguments) == 2
+            rel = getattr(rel.join, side)
+        assert get_rel_type(rel) == "filter"
+        assert rel.filter.input.read.named_table.names[0] == "t6"
+        # ANDed with the is_not_null inferred on t6's join key, field 0.
+        conjuncts = [arg.value for arg in rel.filter.condition.scalar_function.arguments]
+        fields = {
+            c.scalar_function.arguments[0].value.selection.direct_reference.struct_field.field
+            for c in conjuncts
+        }
+        assert fields == {0, 1}
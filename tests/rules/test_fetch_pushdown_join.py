@@ -0,0 +1,48 @@
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+from substrait.proto import JoinRel
+
+from ..conftest import get_rel_type, make_fetch, make_read, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+
+
+def _fetch_over_join(join_type):
+    left = make_read("l", ["a", "b"])
+    right = make_read("r", ["c", "d"])
+    joined = pb.join(
+        left,
+        right,
+        scalar_function(COMPARISON_URN, "equal", [column(0), column(2)]),
+        join_type,
+    )
+    return make_fetch(joined, 5, 10)
+
+
+class TestFetchPushdownJoin:
+    def test_limit_copied_into_left_join_left_side(self, manager):
+        """Fetch(5, 10, LeftJoin(L, R)) limits L to 15 rows and keeps the outer fetch."""
+        result = optimize(manager, _fetch_over_join(JoinRel.JOIN_TYPE_LEFT))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "fetch"
+        join = root_input.fetch.input.join
+        assert get_rel_type(join.left) == "fetch"
+        assert join.left.fetch.count_expr.literal.i64 == 15
+        assert get_rel_type(join.left.fetch.input) == "read"
+        assert get_rel_type(join.right) == "read"
+
+    def test_right_join_limits_right_side(self, manager):
+        result = optimize(manager, _fetch_over_join(JoinRel.JOIN_TYPE_RIGHT))
+
+        join = result.relations[0].root.input.fetch.input.join
+        assert get_rel_type(join.left) == "read"
+        assert get_rel_type(join.right) == "fetch"
+
+    def test_inner_join_not_limited(self, manager):
+        """Unmatched rows of an inner join's inputs produce no output."""
+        result = optimize(manager, _fetch_over_join(JoinRel.JOIN_TYPE_INNER))
+
+        join = result.relations[0].root.input.fetch.input.join
+        assert get_rel_type(join.left) != "fetch"
+        assert get_rel_type(join.right) != "fetch"
@@ -0,0 +1,48 @@
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+
+from ..conftest import get_rel_type, make_fetch, make_read, materialize, optimize
+
+ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
+
+
+def _bounds(fetch) -> tuple[int, int]:
+    return fetch.offset_expr.literal.i64, fetch.count_expr.literal.i64
+
+
+class TestFetchPushdownProject:
+    def test_fetch_moves_below_project(self, manager):
+        """Fetch(Select(a + b)) should become Project(Fetch(Read))."""
+        read = make_read("t", ["a", "b"])
+        selected = pb.select(
+            read, [scalar_function(ARITHMETIC_URN, "add", [column(0), column(1)])]
+        )
+        result = optimize(manager, make_fetch(selected, 5, 10))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "project"
+        fetch = root_input.project.input
+        assert get_rel_type(fetch) == "fetch"
+        assert _bounds(fetch.fetch) == (5, 10)
+        assert get_rel_type(fetch.fetch.input) == "read"
+
+    def test_fetch_emit_folded_into_project(self, manager):
+        """A fetch's emit over the project's outputs moves into the project's emit."""
+        read = make_read("t", ["a", "b"])
+        selected = pb.select(
+            read,
+            [scalar_function(ARITHMETIC_URN, "add", [column(0), column(1)]), column(0)],
+        )
+        plan = materialize(make_fetch(selected, 0, 10))
+        plan.relations[0].root.input.fetch.common.emit.output_mapping[:] = [0]
+
+        result = optimize(manager, plan)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "project"
+        project = root_input.project
+        assert len(project.common.emit.output_mapping) == 1
+        assert get_rel_type(project.input) == "fetch"
+        assert not project.input.fetch.common.HasField("emit")
+        expr_index = project.common.emit.output_mapping[0] - 2
+        assert project.expressions[expr_index].WhichOneof("rex_type") == "scalar_function"
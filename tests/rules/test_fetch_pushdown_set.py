@@ -0,0 +1,59 @@
+from substrait.algebra_pb2 import SetRel
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+
+from ..conftest import get_rel_type, make_fetch, make_read, optimize
+
+ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
+
+
+def _count(fetch) -> int:
+    return fetch.count_expr.literal.i64
+
+
+class TestFetchPushdownSet:
+    def test_limit_copied_into_union_all_inputs(self, manager):
+        """Fetch(offset 2, count 10, UnionAll(A, B, C)) limits each input to 12 rows."""
+        inputs = [make_read(name, ["x", "y"]) for name in ("a", "b", "c")]
+        union = pb.set(inputs, SetRel.SET_OP_UNION_ALL)
+        result = optimize(manager, make_fetch(union, 2, 10))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "fetch"
+        assert root_input.fetch.offset_expr.literal.i64 == 2
+        assert _count(root_input.fetch) == 10
+        set_rel = root_input.fetch.input.set
+        assert len(set_rel.inputs) == 3
+        for inp in set_rel.inputs:
+            assert get_rel_type(inp) == "fetch"
+            assert _count(inp.fetch) == 12
+            assert get_rel_type(inp.fetch.input) == "read"
+
+    def test_union_distinct_not_limited(self, manager):
+        """Duplicates removed by a UNION DISTINCT may be needed to fill the limit."""
+        inputs = [make_read(name, ["x", "y"]) for name in ("a", "b")]
+        union = pb.set(inputs, SetRel.SET_OP_UNION_DISTINCT)
+        result = optimize(manager, make_fetch(union, 0, 10))
+
+        set_rel = result.relations[0].root.input.fetch.input.set
+        assert all(get_rel_type(inp) == "read" for inp in set_rel.inputs)
+
+    def test_inputs_limited_once_through_projects(self, manager):
+        """A limit pushed below an input's project is not copied in again."""
+        inputs = [
+            pb.select(
+                make_read(name, ["x", "y"]),
+                [scalar_function(ARITHMETIC_URN, "add", [column(0), column(1)])],
+            )
+            for name in ("a", "b")
+        ]
+        union = pb.set(inputs, SetRel.SET_OP_UNION_ALL)
+        result = optimize(manager, make_fetch(union, 0, 10))
+
+        set_rel = result.relations[0].root.input.fetch.input.set
+        for inp in set_rel.inputs:
+            assert get_rel_type(inp) == "project"
+            fetch = inp.project.input
+            assert get_rel_type(fetch) == "fetch"
+            assert _count(fetch.fetch) == 10
+            assert get_rel_type(fetch.fetch.input) == "read"
@@ -33,6 +33,32 @@ class TestFilterMerge:
         assert get_rel_type(root_input) == "filter"
         assert get_rel_type(root_input.filter.input) == "read"
 
+    def test_merge_drops_repeated_conjunct(self, manager):
+        """A conjunct present in both filters appears once in the merged filter."""
+        read = make_read("my_table", ["a", "b", "c"])
+        inner_cond = scalar_function(
+            BOOLEAN_URN,
+            "and",
+            [
+                scalar_function(COMPARISON_URN, "is_not_null", [column(0)]),
+                scalar_function(COMPARISON_URN, "is_not_null", [column(1)]),
+            ],
+        )
+        outer_filtered = pb.filter(
+            pb.filter(read, inner_cond),
+            scalar_function(COMPARISON_URN, "is_not_null", [column(1)]),
+        )
+        result = optimize(manager, outer_filtered)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "filter"
+        assert get_rel_type(root_input.filter.input) == "read"
+        fields = []
+        for arg in root_input.filter.condition.scalar_function.arguments:
+            column_ref = arg.value.scalar_function.arguments[0].value
+            fields.append(column_ref.selection.direct_reference.struct_field.field)
+        assert fields == [1, 0]
+
     def test_merge_enables_cross_pushdown(self, manager):
         """Merged filter enables cross pushdown.
         Filter(left_pred, Filter(AND(right_a, right_b), Cross(L,R)))
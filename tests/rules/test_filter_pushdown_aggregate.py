@@ -5,13 +5,39 @@ from substrait.builders.extended_expression import (
     scalar_function,
 )
 
-from ..conftest import get_rel_type, make_read, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
 
 COMPARISON_URN = "extension:io.substrait:functions_comparison"
 BOOLEAN_URN = "extension:io.substrait:functions_boolean"
 ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
 
 
+def _grouping_sets(sets, by_reference=True):
+    """Aggregate over read(a, b, c) grouping by the given sets of keys (0 = a,
+    1 = b), with sum(c). Outputs the keys a, b, then the sum and the grouping
+    set index."""
+    read = make_read("my_table", ["a", "b", "c"])
+    plan = materialize(
+        pb.aggregate(
+            read,
+            grouping_expressions=[column(0), column(1)],
+            measures=[aggregate_function(ARITHMETIC_URN, "sum", [column(2)])],
+        )
+    )
+    agg = plan.relations[0].root.input.aggregate
+    keys = list(agg.grouping_expressions)
+    del agg.groupings[:]
+    for key_set in sets:
+        grouping = agg.groupings.add()
+        if by_reference:
+            grouping.expression_references.extend(key_set)
+        else:
+            grouping.grouping_expressions.extend(keys[i] for i in key_set)
+    if not by_reference:
+        del agg.grouping_expressions[:]
+    return plan
+
+
 class TestFilterPushdownAggregate:
     def test_push_filter_on_grouping_column(self, manager):
         """Filter on grouping key column should be pushed below aggregate."""
@@ -84,7 +110,45 @@ class TestFilterPushdownAggregate:
         assert get_rel_type(root_input) == "aggregate"
         pushed = root_input.aggregate.input
         assert get_rel_type(pushed) == "filter"
-        # Verify the field index was remapped from 0 (output) to 1 (input)
+        # Verify the field index was remapped from 0 (output) to b, which is
+        # input field 0 once the unused field a is pruned.
         cond = pushed.filter.condition
         assert cond.WhichOneof("rex_type") == "selection"
-        assert cond.selection.direct_reference.struct_field.field == 1
+        assert cond.selection.direct_reference.struct_field.field == 0
+        assert read_fields(pushed.filter.input.read) == [1, 2, 3]
+
+    def test_push_filter_on_key_common_to_all_grouping_sets(self, manager):
+        """ROLLUP-style sets (a, b), (a): a filter on a is pushed below."""
+        plan = _grouping_sets([[0, 1], [0]])
+        result = optimize(manager, pb.filter(plan, column(0)))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "aggregate"
+        assert get_rel_type(root_input.aggregate.input) == "filter"
+
+    def test_filter_on_null_filled_key_not_pushed(self, manager):
+        """Sets (a, b), (a): b is null in the (a) rows, so a filter on b stays."""
+        plan = _grouping_sets([[0, 1], [0]])
+        result = optimize(manager, pb.filter(plan, column(1)))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "filter"
+        assert get_rel_type(root_input.filter.input) == "aggregate"
+
+    def test_grand_total_set_blocks_pushdown(self, manager):
+        """With an empty grouping set no key is common to all sets."""
+        plan = _grouping_sets([[0, 1], [0], []])
+        result = optimize(manager, pb.filter(plan, column(0)))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "filter"
+
+    def test_grouping_sets_listing_their_expressions(self, manager):
+        """Groupings listing their own expressions are handled like references."""
+        plan = _grouping_sets([[0, 1], [1]], by_reference=False)
+        result = optimize(manager, pb.filter(plan, column(1)))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "aggregate"
+        pushed = root_input.aggregate.input
+        assert pushed.filter.condition.selection.direct_reference.struct_field.field == 1
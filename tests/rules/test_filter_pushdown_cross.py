@@ -1,12 +1,25 @@
-from substrait.algebra_pb2 import JoinRel
+from substrait.algebra_pb2 import Expression, JoinRel
 from substrait.builders import plan as pb
-from substrait.builders.extended_expression import column, scalar_function
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import (
+    column,
+    literal,
+    scalar_function,
+    singular_or_list,
+)
 
-from ..conftest import get_rel_type, make_filter_over_cross, make_read, optimize
+from ..conftest import get_rel_type, make_filter_over_cross, make_read, materialize, optimize
 
 COMPARISON_URN = "extension:io.substrait:functions_comparison"
 
 
+def _field(index: int) -> Expression:
+    expr = Expression()
+    expr.selection.direct_reference.struct_field.field = index
+    expr.selection.root_reference.SetInParent()
+    return expr
+
+
 class TestFilterPushdownCross:
     def test_pushdown_filter_to_left(self, manager):
         """Filter on left-side field should be pushed below the cross join."""
@@ -59,3 +72,45 @@ class TestFilterPushdownCross:
         assert get_rel_type(root_input) == "join"
         assert root_input.join.type == JoinRel.JOIN_TYPE_INNER
         assert root_input.join.HasField("expression")
+
+    def test_in_list_pushed_to_right(self, manager):
+        """An IN-list over a right-side field is pushed below the cross join."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        in_list = singular_or_list(
+            column(3), [literal(1, tb.i32()), literal(2, tb.i32())]
+        )
+        result = optimize(manager, pb.filter(pb.cross(left, right), in_list))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "cross"
+        assert get_rel_type(root_input.cross.right) == "filter"
+        cond = root_input.cross.right.filter.condition
+        assert cond.singular_or_list.value.selection.direct_reference.struct_field.field == 1
+
+    def test_correlated_subquery_pushed_to_right(self, manager):
+        """An IN subquery over right-side fields is pushed below the cross
+        join, adjusting both its needle and its outer references."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        plan = materialize(make_filter_over_cross(left, right, filter_field_index=0))
+        haystack_read = materialize(make_read("s", ["x"])).relations[0].root.input
+
+        cond = plan.relations[0].root.input.filter.condition
+        cond.Clear()
+        in_predicate = cond.subquery.in_predicate
+        in_predicate.needles.add().CopyFrom(_field(2))
+        haystack = in_predicate.haystack.filter
+        haystack.input.CopyFrom(haystack_read)
+        outer = haystack.condition.selection
+        outer.outer_reference.steps_out = 1
+        outer.direct_reference.struct_field.field = 3
+        result = optimize(manager, plan)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "cross"
+        assert get_rel_type(root_input.cross.right) == "filter"
+        pushed = root_input.cross.right.filter.condition.subquery.in_predicate
+        assert pushed.needles[0].selection.direct_reference.struct_field.field == 0
+        pushed_outer = pushed.haystack.filter.condition.selection
+        assert pushed_outer.direct_reference.struct_field.field == 1
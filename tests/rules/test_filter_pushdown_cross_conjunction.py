@@ -43,6 +43,23 @@ class TestFilterPushdownCrossConjunction:
         assert get_rel_type(root_input.cross.left) == "filter"
         assert get_rel_type(root_input.cross.right) == "read"
 
+    def test_repeated_conjunct_pushed_once(self, manager):
+        """AND(pred, pred) pushes a single copy of pred."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        crossed = pb.cross(left, right)
+
+        pred = scalar_function(COMPARISON_URN, "is_not_null", [column(0)])
+        and_cond = scalar_function(BOOLEAN_URN, "and", [pred, pred])
+        filtered = pb.filter(crossed, and_cond)
+        result = optimize(manager, filtered)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "cross"
+        left_filter = root_input.cross.left.filter
+        assert len(left_filter.condition.scalar_function.arguments) == 1
+        assert get_rel_type(root_input.cross.right) == "read"
+
     def test_split_with_mixed_converts_to_join(self, manager):
         """AND(left_pred, mixed_pred) should push left down, mixed becomes join expression."""
         left = make_read("left_table", ["a", "b"])
@@ -49,7 +49,8 @@ class TestFilterPushdownJoin:
         assert pushed_cond.selection.direct_reference.struct_field.field == 0
 
     def test_inner_mixed_pred_stays_above(self, manager):
-        """INNER join: mixed predicate not pushed."""
+        """INNER join: mixed predicate stays above when the plan declares no
+        `and` to add it to the join condition with."""
         left = make_read("left_table", ["a", "b"])
         right = make_read("right_table", ["c", "d"])
         joined = pb.join(
@@ -114,7 +115,7 @@ class TestFilterPushdownJoin:
             scalar_function(COMPARISON_URN, "equal", [column(0), column(2)]),
             JoinRel.JOIN_TYPE_LEFT,
         )
-        filtered = pb.filter(joined, column(2))
+        filtered = pb.filter(joined, scalar_function(COMPARISON_URN, "is_null", [column(2)]))
         result = optimize(manager, filtered)
 
         root_input = result.relations[0].root.input
@@ -148,7 +149,7 @@ class TestFilterPushdownJoin:
             scalar_function(COMPARISON_URN, "equal", [column(0), column(2)]),
             JoinRel.JOIN_TYPE_RIGHT,
         )
-        filtered = pb.filter(joined, column(0))
+        filtered = pb.filter(joined, scalar_function(COMPARISON_URN, "is_null", [column(0)]))
         result = optimize(manager, filtered)
 
         root_input = result.relations[0].root.input
@@ -165,9 +166,68 @@ class TestFilterPushdownJoin:
             scalar_function(COMPARISON_URN, "equal", [column(0), column(2)]),
             JoinRel.JOIN_TYPE_OUTER,
         )
-        filtered = pb.filter(joined, column(0))
+        filtered = pb.filter(joined, scalar_function(COMPARISON_URN, "is_null", [column(0)]))
         result = optimize(manager, filtered)
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "filter"
         assert get_rel_type(root_input.filter.input) == "join"
+
+    def test_inner_absorbs_mixed_preds_equalities_first(self, manager):
+        """INNER join: mixed predicates join the condition, with the
+        equalities between the sides before the other conjuncts."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        joined = pb.join(
+            left,
+            right,
+            scalar_function(COMPARISON_URN, "lt", [column(0), column(2)]),
+            JoinRel.JOIN_TYPE_INNER,
+        )
+        mixed = scalar_function(
+            BOOLEAN_URN,
+            "and",
+            [
+                scalar_function(COMPARISON_URN, "gt", [column(1), column(3)]),
+                scalar_function(COMPARISON_URN, "equal", [column(1), column(3)]),
+            ],
+        )
+        result = optimize(manager, pb.filter(joined, mixed))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "join"
+        names = {
+            ext.extension_function.function_anchor: ext.extension_function.name.split(":")[0]
+            for ext in result.extensions
+        }
+        conjuncts = root_input.join.expression.scalar_function.arguments
+        assert [names[c.value.scalar_function.function_reference] for c in conjuncts] == [
+            "equal",
+            "lt",
+            "gt",
+        ]
+
+    def test_left_join_mixed_pred_stays_above(self, manager):
+        """LEFT join: the condition decides which left rows go unmatched, so
+        mixed predicates are not absorbed."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        joined = pb.join(
+            left,
+            right,
+            scalar_function(COMPARISON_URN, "equal", [column(0), column(2)]),
+            JoinRel.JOIN_TYPE_LEFT,
+        )
+        mixed = scalar_function(
+            BOOLEAN_URN,
+            "or",
+            [
+                scalar_function(COMPARISON_URN, "is_null", [column(3)]),
+                scalar_function(COMPARISON_URN, "equal", [column(1), column(3)]),
+            ],
+        )
+        result = optimize(manager, pb.filter(joined, mixed))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "filter"
+        assert root_input.filter.input.join.type == JoinRel.JOIN_TYPE_LEFT
@@ -0,0 +1,105 @@
+from substrait.algebra_pb2 import JoinRel
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+
+from ..conftest import get_rel_type, make_read, materialize, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+
+
+def _join_on(join_type, *preds):
+    """Join(left(a, b), right(c, d)) ON a = c AND preds."""
+    left = make_read("left_table", ["a", "b"])
+    right = make_read("right_table", ["c", "d"])
+    equal = scalar_function(COMPARISON_URN, "equal", [column(0), column(2)])
+    cond = scalar_function(BOOLEAN_URN, "and", [equal, *preds]) if preds else equal
+    return pb.join(left, right, cond, join_type)
+
+
+def _not_null(field: int):
+    return scalar_function(COMPARISON_URN, "is_not_null", [column(field)])
+
+
+def _fields(call) -> list[int]:
+    """Field indices of a function call's column arguments."""
+    return [
+        arg.value.selection.direct_reference.struct_field.field
+        for arg in call.scalar_function.arguments
+    ]
+
+
+def _conjunct_fields(cond) -> list[list[int]]:
+    """Field indices referenced by each argument of a conjunction."""
+    return [_fields(arg.value) for arg in cond.scalar_function.arguments]
+
+
+class TestJoinConditionPushdown:
+    def test_inner_pushes_both_sides(self, manager):
+        """INNER: ON a = c AND b IS NOT NULL AND d IS NOT NULL pushes b to the
+        left, d to the right and keeps a = c. The inferred c IS NOT NULL
+        joins d's filter on the right."""
+        joined = _join_on(JoinRel.JOIN_TYPE_INNER, _not_null(1), _not_null(3))
+        result = optimize(manager, joined)
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "filter"
+        assert get_rel_type(join.right) == "filter"
+        assert sorted(_conjunct_fields(join.right.filter.condition)) == [[0], [1]]
+        assert _fields(join.expression) == [0, 2]
+
+    def test_left_join_pushes_right_only(self, manager):
+        """LEFT: a right-only ON conjunct is pushed to the right; a left-only
+        one stays, since unmatched left rows are kept."""
+        joined = _join_on(JoinRel.JOIN_TYPE_LEFT, _not_null(1), _not_null(3))
+        result = optimize(manager, joined)
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "read"
+        assert get_rel_type(join.right) == "filter"
+        assert _conjunct_fields(join.expression) == [[0, 2], [1]]
+
+    def test_right_join_pushes_left_only(self, manager):
+        joined = _join_on(JoinRel.JOIN_TYPE_RIGHT, _not_null(1), _not_null(3))
+        result = optimize(manager, joined)
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "filter"
+        assert get_rel_type(join.right) == "read"
+        assert _conjunct_fields(join.expression) == [[0, 2], [3]]
+
+    def test_outer_join_not_pushed(self, manager):
+        joined = _join_on(JoinRel.JOIN_TYPE_OUTER, _not_null(1), _not_null(3))
+        result = optimize(manager, joined)
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "read"
+        assert get_rel_type(join.right) == "read"
+
+    def test_single_side_condition_leaves_true(self, manager):
+        """INNER ON b IS NOT NULL: the whole condition moves to the left."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        joined = pb.join(left, right, _not_null(1), JoinRel.JOIN_TYPE_INNER)
+        result = optimize(manager, joined)
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "filter"
+        assert join.expression.literal.boolean is True
+
+    def test_post_join_filter_follows_filter_rules(self, manager):
+        """LEFT join post_join_filter: the left-only conjunct is pushed to the
+        left, the right-only one stays."""
+        cond = scalar_function(BOOLEAN_URN, "and", [_not_null(1), _not_null(3)])
+        plan = materialize(pb.filter(_join_on(JoinRel.JOIN_TYPE_LEFT), cond))
+        root = plan.relations[0].root
+        filtered = root.input.filter
+        filtered.input.join.post_join_filter.CopyFrom(filtered.condition)
+        root.input.CopyFrom(filtered.input)
+        result = optimize(manager, plan)
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "filter"
+        assert get_rel_type(join.right) == "read"
+        remaining = join.post_join_filter.scalar_function.arguments[0].value
+        assert remaining.selection.direct_reference.struct_field.field == 3
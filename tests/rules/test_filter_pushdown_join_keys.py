@@ -0,0 +1,108 @@
+from substrait.algebra_pb2 import JoinRel
+from substrait.builders import plan as pb
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column, scalar_function
+
+from ..conftest import get_rel_type, make_read, materialize, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+
+
+def _required_read(table_name: str, field_names: list[str]):
+    """A read whose fields are non-nullable in its base_schema."""
+    schema = tb.named_struct(
+        field_names, tb.struct([tb.i32(nullable=False) for _ in field_names], nullable=False)
+    )
+    return pb.read_named_table(table_name, schema)
+
+
+def _not_null(field: int):
+    return scalar_function(COMPARISON_URN, "is_not_null", [column(field)])
+
+
+def _join(left, right, join_type, *fields):
+    """Join(left(a, b), right(c, d)) ON a = c under a filter requiring the
+    given fields not to be null, which declares is_not_null in the plan."""
+    equal = scalar_function(COMPARISON_URN, "equal", [column(0), column(2)])
+    preds = [_not_null(field) for field in fields]
+    cond = scalar_function(BOOLEAN_URN, "and", preds) if len(preds) > 1 else preds[0]
+    return pb.filter(pb.join(left, right, equal, join_type), cond)
+
+
+def _read(rel):
+    while get_rel_type(rel) == "filter":
+        rel = rel.filter.input
+    return rel.read
+
+
+def _hint_fields(read) -> list[int]:
+    """Fields of the is_not_null conjuncts in a read's best_effort_filter."""
+    hint = read.best_effort_filter.scalar_function
+    conjuncts = [arg.value.scalar_function for arg in hint.arguments]
+    if hint.arguments[0].value.HasField("selection"):
+        conjuncts = [hint]
+    return sorted(
+        c.arguments[0].value.selection.direct_reference.struct_field.field for c in conjuncts
+    )
+
+
+class TestJoinKeyNotNull:
+    def test_inner_keys_reach_both_reads(self, manager):
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        result = optimize(manager, _join(left, right, JoinRel.JOIN_TYPE_INNER, 1, 3))
+
+        join = result.relations[0].root.input.join
+        assert _hint_fields(_read(join.left)) == [0, 1]
+        assert _hint_fields(_read(join.right)) == [0, 1]
+
+    def test_non_nullable_key_not_filtered(self, manager):
+        """c is non-nullable in the right read's base_schema."""
+        left = make_read("left_table", ["a", "b"])
+        right = _required_read("right_table", ["c", "d"])
+        result = optimize(manager, _join(left, right, JoinRel.JOIN_TYPE_INNER, 1))
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "filter"
+        assert get_rel_type(join.right) == "read"
+
+    def test_left_join_not_filtered(self, manager):
+        """Unmatched left rows are kept, null key or not."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        result = optimize(manager, _join(left, right, JoinRel.JOIN_TYPE_LEFT, 1))
+
+        join = result.relations[0].root.input.join
+        assert _hint_fields(_read(join.left)) == [1]
+        assert get_rel_type(join.right) == "read"
+
+    def test_user_defined_type_reference_key(self, manager):
+        """A key typed by the deprecated uint32 user_defined_type_reference
+        counts as nullable."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        plan = materialize(_join(left, right, JoinRel.JOIN_TYPE_INNER, 1))
+        right_read = plan.relations[0].root.input.filter.input.join.right.read
+        right_read.base_schema.struct.types[0].user_defined_type_reference = 1
+
+        result = optimize(manager, plan)
+
+        join = result.relations[0].root.input.join
+        assert _hint_fields(_read(join.right)) == [0]
+
+    def test_without_is_not_null_declared(self, manager):
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        equal = scalar_function(COMPARISON_URN, "equal", [column(0), column(2)])
+        result = optimize(manager, pb.join(left, right, equal, JoinRel.JOIN_TYPE_INNER))
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "read"
+        assert get_rel_type(join.right) == "read"
+
+    def test_stable(self, manager):
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        first = optimize(manager, _join(left, right, JoinRel.JOIN_TYPE_INNER, 1, 3))
+        assert manager.optimize(first.SerializeToString()) == first.SerializeToString()
@@ -0,0 +1,75 @@
+from substrait.algebra_pb2 import JoinRel
+from substrait.builders import plan as pb
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column, literal, scalar_function
+
+from ..conftest import get_rel_type, make_read, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
+
+
+def _join(join_type):
+    """Join(left(a, b), right(c, d)) ON a = c."""
+    left = make_read("left_table", ["a", "b"])
+    right = make_read("right_table", ["c", "d"])
+    equal = scalar_function(COMPARISON_URN, "equal", [column(0), column(2)])
+    return pb.join(left, right, equal, join_type)
+
+
+def _gt_zero(expr):
+    return scalar_function(COMPARISON_URN, "gt", [expr, literal(0, tb.i32())])
+
+
+def _join_under(result):
+    rel = result.relations[0].root.input
+    while get_rel_type(rel) == "filter":
+        rel = rel.filter.input
+    return rel.join
+
+
+class TestOuterJoinSimplification:
+    def test_left_becomes_inner(self, manager):
+        """Filter(d > 0) over a LEFT join drops the null-extended rows, so the
+        join is INNER and the predicate moves to the right side."""
+        result = optimize(manager, pb.filter(_join(JoinRel.JOIN_TYPE_LEFT), _gt_zero(column(3))))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "join"
+        assert root_input.join.type == JoinRel.JOIN_TYPE_INNER
+        assert get_rel_type(root_input.join.right) == "filter"
+
+    def test_is_null_keeps_left(self, manager):
+        """Filter(d IS NULL) keeps exactly the null-extended rows (anti-join)."""
+        is_null = scalar_function(COMPARISON_URN, "is_null", [column(3)])
+        result = optimize(manager, pb.filter(_join(JoinRel.JOIN_TYPE_LEFT), is_null))
+
+        assert _join_under(result).type == JoinRel.JOIN_TYPE_LEFT
+
+    def test_is_not_null_of_arithmetic(self, manager):
+        add = scalar_function(ARITHMETIC_URN, "add", [column(3), literal(1, tb.i32())])
+        is_not_null = scalar_function(COMPARISON_URN, "is_not_null", [add])
+        result = optimize(manager, pb.filter(_join(JoinRel.JOIN_TYPE_LEFT), is_not_null))
+
+        assert _join_under(result).type == JoinRel.JOIN_TYPE_INNER
+
+    def test_right_becomes_inner(self, manager):
+        result = optimize(manager, pb.filter(_join(JoinRel.JOIN_TYPE_RIGHT), _gt_zero(column(1))))
+
+        assert _join_under(result).type == JoinRel.JOIN_TYPE_INNER
+
+    def test_outer_becomes_left(self, manager):
+        """A filter on a left field drops the rows only the right side kept."""
+        result = optimize(manager, pb.filter(_join(JoinRel.JOIN_TYPE_OUTER), _gt_zero(column(1))))
+
+        join = _join_under(result)
+        assert join.type == JoinRel.JOIN_TYPE_LEFT
+        assert get_rel_type(join.left) == "filter"
+
+    def test_disjunction_across_sides_keeps_outer(self, manager):
+        """b > 0 OR d > 0 holds for rows with only one side null."""
+        cond = scalar_function(BOOLEAN_URN, "or", [_gt_zero(column(1)), _gt_zero(column(3))])
+        result = optimize(manager, pb.filter(_join(JoinRel.JOIN_TYPE_OUTER), cond))
+
+        assert _join_under(result).type == JoinRel.JOIN_TYPE_OUTER
@@ -0,0 +1,107 @@
+from substrait.builders import plan as pb
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import (
+    column,
+    literal,
+    scalar_function,
+    singular_or_list,
+)
+
+from ..conftest import get_rel_type, materialize, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+
+PATHS = [
+    "s3://bucket/events/year=2023/country=NL/part-0.parquet",
+    "s3://bucket/events/year=2024/country=NL/part-0.parquet",
+    "s3://bucket/events/year=2024/country=DE/part-0.parquet",
+    "s3://bucket/events/year=__HIVE_DEFAULT_PARTITION__/country=DE/part-0.parquet",
+]
+
+
+def _filtered_files(condition):
+    """Filter(condition) over a local_files read of `PATHS`, whose
+    partition columns are `year` (i32) and `country` (string)."""
+    schema = tb.named_struct(
+        ["year", "country", "value"],
+        tb.struct([tb.i32(), tb.string(), tb.i32()], nullable=False),
+    )
+    plan = materialize(pb.filter(pb.read_named_table("events", schema), condition))
+    read = plan.relations[0].root.input.filter.input.read
+    read.ClearField("named_table")
+    for path in PATHS:
+        item = read.local_files.items.add(uri_path=path)
+        item.parquet.SetInParent()
+    return plan
+
+
+def _read(result):
+    rel = result.relations[0].root.input
+    assert get_rel_type(rel) == "filter"
+    return rel.filter.input.read
+
+
+def _paths(read) -> list[str]:
+    return [item.uri_path for item in read.local_files.items]
+
+
+def _year_is(op: str, year: int):
+    return scalar_function(COMPARISON_URN, op, [column(0), literal(year, tb.i32())])
+
+
+class TestPartitionPruning:
+    def test_comparison_prunes_files(self, manager):
+        result = optimize(manager, _filtered_files(_year_is("gt", 2023)))
+
+        assert _paths(_read(result)) == PATHS[1:3]
+
+    def test_string_partition(self, manager):
+        nl = scalar_function(COMPARISON_URN, "equal", [column(1), literal("NL", tb.string())])
+        result = optimize(manager, _filtered_files(nl))
+
+        assert _paths(_read(result)) == PATHS[:2]
+
+    def test_in_list(self, manager):
+        years = singular_or_list(column(0), [literal(2023, tb.i32()), literal(2025, tb.i32())])
+        result = optimize(manager, _filtered_files(years))
+
+        assert _paths(_read(result)) == PATHS[:1]
+
+    def test_null_partition(self, manager):
+        """The Hive default partition holds the null values."""
+        is_null = scalar_function(COMPARISON_URN, "is_null", [column(0)])
+        result = optimize(manager, _filtered_files(is_null))
+
+        assert _paths(_read(result)) == PATHS[3:]
+
+    def test_non_partition_column_keeps_files(self, manager):
+        value = scalar_function(COMPARISON_URN, "gt", [column(2), literal(0, tb.i32())])
+        result = optimize(manager, _filtered_files(value))
+
+        assert _paths(_read(result)) == PATHS
+
+    def test_no_match_becomes_empty_virtual_table(self, manager):
+        result = optimize(manager, _filtered_files(_year_is("equal", 2030)))
+
+        read = _read(result)
+        assert not read.HasField("local_files")
+        assert read.HasField("virtual_table")
+        assert len(read.virtual_table.values) == 0
+
+    def test_fp32_partition(self, manager):
+        """fp32 partition values compare equal to the float32 literal they
+        round to."""
+        paths = ["s3://bucket/m/x=0.1/part-0.parquet", "s3://bucket/m/x=0.2/part-0.parquet"]
+        schema = tb.named_struct(
+            ["x", "value"], tb.struct([tb.fp32(), tb.i32()], nullable=False)
+        )
+        x_is = scalar_function(COMPARISON_URN, "equal", [column(0), literal(0.1, tb.fp32())])
+        plan = materialize(pb.filter(pb.read_named_table("m", schema), x_is))
+        read = plan.relations[0].root.input.filter.input.read
+        read.ClearField("named_table")
+        for path in paths:
+            read.local_files.items.add(uri_path=path).parquet.SetInParent()
+
+        result = optimize(manager, plan)
+
+        assert _paths(_read(result)) == paths[:1]
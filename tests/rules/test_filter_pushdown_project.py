@@ -1,10 +1,24 @@
 from substrait.builders import plan as pb
-from substrait.builders.extended_expression import column, scalar_function
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column, literal, scalar_function
 
-from ..conftest import get_rel_type, make_read, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize
 
 COMPARISON_URN = "extension:io.substrait:functions_comparison"
 BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
+
+
+def _add_one(expr):
+    return scalar_function(ARITHMETIC_URN, "add", [expr, literal(1, tb.i32())])
+
+
+def _large_expression():
+    """col(0) + 1 + 1 + 1 + 1: too large to copy into a pushed predicate."""
+    expr = column(0)
+    for _ in range(4):
+        expr = _add_one(expr)
+    return scalar_function(COMPARISON_URN, "is_not_null", [expr])
 
 
 class TestFilterPushdownProject:
@@ -21,9 +35,9 @@ class TestFilterPushdownProject:
         assert get_rel_type(root_input.project.input.filter.input) == "read"
 
     def test_no_pushdown_filter_on_computed_field(self, manager):
-        """Filter on a computed expression field should NOT be pushed down."""
+        """Filter on a large computed expression field should NOT be pushed down."""
         read = make_read("my_table", ["a", "b"])
-        projected = pb.project(read, [column(0)])
+        projected = pb.project(read, [_large_expression()])
         # Field 2 is the computed expression (indices 0,1 from read, 2 from expression)
         filtered = pb.filter(projected, column(2))
         result = optimize(manager, filtered)
@@ -32,9 +46,10 @@ class TestFilterPushdownProject:
         assert get_rel_type(root_input) == "filter"
         assert get_rel_type(root_input.filter.input) == "project"
 
-    def test_no_pushdown_with_emit_mapping(self, manager):
-        """Filter on a project with emit mapping (select) should NOT be pushed down.
-        The identity project is removed after pruning, leaving filter on read."""
+    def test_pushdown_with_emit_mapping(self, manager):
+        """Filter on a select of col(0) is pushed below the project as a filter
+        on input field 0. The identity project is removed after pruning,
+        leaving filter on read."""
         read = make_read("my_table", ["a", "b"])
         selected = pb.select(read, [column(0)])
         filtered = pb.filter(selected, column(0))
@@ -48,7 +63,7 @@ class TestFilterPushdownProject:
     def test_split_and_push_passthrough_only(self, manager):
         """AND(pred_on_input, pred_on_computed) should push only the input pred below."""
         read = make_read("my_table", ["a", "b"])
-        projected = pb.project(read, [column(0)])
+        projected = pb.project(read, [_large_expression()])
         # col(0) references input field, col(2) references computed field
         input_pred = scalar_function(COMPARISON_URN, "is_not_null", [column(0)])
         computed_pred = scalar_function(COMPARISON_URN, "is_not_null", [column(2)])
@@ -64,6 +79,65 @@ class TestFilterPushdownProject:
         assert get_rel_type(root_input.filter.input.project.input) == "filter"
         assert get_rel_type(root_input.filter.input.project.input.filter.input) == "read"
 
+    def test_pushdown_translates_through_emit(self, manager):
+        """Project(emit=[2, 1]) outputs (computed, b): a filter on its output
+        field 1 is pushed below it as a filter on input field 1."""
+        read = make_read("my_table", ["a", "b"])
+        computed = scalar_function(COMPARISON_URN, "is_not_null", [column(0)])
+        plan = materialize(pb.project(read, [computed]))
+        plan.relations[0].root.input.project.common.emit.output_mapping[:] = [2, 1]
+        filtered = pb.filter(plan, scalar_function(COMPARISON_URN, "is_not_null", [column(1)]))
+        result = optimize(manager, filtered)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "project"
+        assert list(root_input.project.common.emit.output_mapping) == [2, 1]
+        pushed = root_input.project.input.filter
+        arg = pushed.condition.scalar_function.arguments[0].value
+        assert arg.selection.direct_reference.struct_field.field == 1
+
+    def test_computed_field_through_emit_stays_above(self, manager):
+        """A filter on the (large) computed output of Project(emit=[2, 1]) stays above."""
+        read = make_read("my_table", ["a", "b"])
+        plan = materialize(pb.project(read, [_large_expression()]))
+        plan.relations[0].root.input.project.common.emit.output_mapping[:] = [2, 1]
+        result = optimize(manager, pb.filter(plan, column(0)))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "filter"
+        assert get_rel_type(root_input.filter.input) == "project"
+
+    def test_substitute_computed_field(self, manager):
+        """Filter(is_not_null(col(2))) over Project([col(1) + 1]) is pushed below
+        as is_not_null(col(1) + 1) and reaches the read's best_effort_filter."""
+        read = make_read("my_table", ["a", "b"])
+        projected = pb.project(read, [_add_one(column(1))])
+        pred = scalar_function(COMPARISON_URN, "is_not_null", [column(2)])
+        result = optimize(manager, pb.filter(projected, pred))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "project"
+        pushed = root_input.project.input.filter
+        arg = pushed.condition.scalar_function.arguments[0].value
+        assert arg.WhichOneof("rex_type") == "scalar_function"
+        add_input = arg.scalar_function.arguments[0].value
+        assert add_input.selection.direct_reference.struct_field.field == 1
+        assert pushed.input.read.HasField("best_effort_filter")
+
+    def test_no_substitution_of_nondeterministic_field(self, manager):
+        """A computed field calling a nondeterministic function stays above."""
+        read = make_read("my_table", ["a", "b"])
+        plan = materialize(pb.project(read, [_add_one(column(1))]))
+        for ext in plan.extensions:
+            if ext.extension_function.name.startswith("add"):
+                ext.extension_function.name = "random"
+        pred = scalar_function(COMPARISON_URN, "is_not_null", [column(2)])
+        result = optimize(manager, pb.filter(plan, pred))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "filter"
+        assert get_rel_type(root_input.filter.input) == "project"
+
     def test_pushdown_filter_through_project_and_cross(self, manager):
         """Filter(Project(Cross(L,R))) with left-only predicate should push through both."""
         left = make_read("left_table", ["a", "b"])
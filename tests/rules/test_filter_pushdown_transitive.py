@@ -0,0 +1,86 @@
+from substrait.algebra_pb2 import JoinRel
+from substrait.builders import plan as pb
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column, literal, scalar_function
+
+from ..conftest import get_rel_type, make_read, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+
+
+def _gt(field: int, value: int):
+    return scalar_function(COMPARISON_URN, "gt", [column(field), literal(value, tb.i32())])
+
+
+def _join(left, right, join_type):
+    """Join(left(a, b), right(c, d)) ON a = c."""
+    equal = scalar_function(COMPARISON_URN, "equal", [column(0), column(2)])
+    return pb.join(left, right, equal, join_type)
+
+
+def _fn_name(plan, expr) -> str:
+    anchor = expr.scalar_function.function_reference
+    for ext in plan.extensions:
+        if ext.extension_function.function_anchor == anchor:
+            return ext.extension_function.name.split(":")[0]
+    return ""
+
+
+class TestTransitivePredicates:
+    def test_filter_above_join_reaches_other_read(self, manager):
+        """Filter(a > 5) over Join(a = c): the right read gets c > 5 as its
+        best_effort_filter."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        joined = _join(left, right, JoinRel.JOIN_TYPE_INNER)
+        result = optimize(manager, pb.filter(joined, _gt(0, 5)))
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.right) == "read"
+        hint = join.right.read.best_effort_filter
+        assert _fn_name(result, hint) == "gt"
+        arg = hint.scalar_function.arguments[0].value
+        assert arg.selection.direct_reference.struct_field.field == 0
+
+    def test_combined_with_the_reads_own_filter(self, manager):
+        """The right read's own conjuncts and the derived predicate all reach
+        its best_effort_filter."""
+        left = pb.filter(make_read("left_table", ["a", "b"]), _gt(0, 5))
+        own = scalar_function(BOOLEAN_URN, "and", [_gt(1, 7), _gt(1, 3)])
+        right = pb.filter(make_read("right_table", ["c", "d"]), own)
+        result = optimize(manager, _join(left, right, JoinRel.JOIN_TYPE_INNER))
+
+        right_read = result.relations[0].root.input.join.right.filter.input.read
+        hint = right_read.best_effort_filter
+        assert _fn_name(result, hint) == "and"
+        fields = sorted(
+            arg.value.scalar_function.arguments[0].value.selection.direct_reference.struct_field.field
+            for arg in hint.scalar_function.arguments
+        )
+        assert fields == [0, 1, 1]
+
+    def test_left_join_derives_into_right(self, manager):
+        left = pb.filter(make_read("left_table", ["a", "b"]), _gt(0, 5))
+        right = make_read("right_table", ["c", "d"])
+        result = optimize(manager, _join(left, right, JoinRel.JOIN_TYPE_LEFT))
+
+        join = result.relations[0].root.input.join
+        assert join.right.read.HasField("best_effort_filter")
+
+    def test_right_join_does_not_derive_into_right(self, manager):
+        """RIGHT: right rows are kept unmatched, so a left filter implies
+        nothing about them."""
+        left = pb.filter(make_read("left_table", ["a", "b"]), _gt(0, 5))
+        right = make_read("right_table", ["c", "d"])
+        result = optimize(manager, _join(left, right, JoinRel.JOIN_TYPE_RIGHT))
+
+        join = result.relations[0].root.input.join
+        assert not join.right.read.HasField("best_effort_filter")
+
+    def test_stable(self, manager):
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        joined = _join(left, right, JoinRel.JOIN_TYPE_INNER)
+        first = optimize(manager, pb.filter(joined, _gt(0, 5)))
+        assert manager.optimize(first.SerializeToString()) == first.SerializeToString()
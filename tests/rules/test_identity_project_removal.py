@@ -1,7 +1,7 @@
 from substrait.builders import plan as pb
 from substrait.builders.extended_expression import column, scalar_function
 
-from ..conftest import get_rel_type, make_read, materialize, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
 
 ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
 
@@ -15,7 +15,7 @@ class TestIdentityProjectRemoval:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "read"
-        assert not root_input.read.common.HasField("emit")
+        assert not root_input.read.HasField("projection")
 
     def test_select_subset_not_removed(self, manager):
         """select(read([a,b,c]), [col(0)]) is not identity — project pruned but
@@ -27,7 +27,7 @@ class TestIdentityProjectRemoval:
         # The identity project is removed, leaving the pruned read.
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "read"
-        assert list(root_input.read.common.emit.output_mapping) == [0]
+        assert read_fields(root_input.read) == [0]
 
     def test_project_with_no_expressions_no_emit_removed(self, manager):
         """Project(input, expressions=[], no emit) is identity — removed."""
@@ -0,0 +1,46 @@
+from substrait.algebra_pb2 import Expression, Rel
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column
+
+from ..conftest import get_rel_type, make_filter_over_cross, make_read, materialize, optimize
+
+
+def _scalar_subquery(rel: Rel) -> Expression:
+    expr = Expression()
+    expr.subquery.scalar.input.CopyFrom(rel)
+    return expr
+
+
+class TestNestedRels:
+    def test_rel_inside_subquery_is_optimized(self, manager):
+        """Rels nested in subquery expressions are reached by the walker."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        inner = materialize(make_filter_over_cross(left, right, 0))
+
+        plan = materialize(pb.project(make_read("t", ["x"]), [column(0)]))
+        project = plan.relations[0].root.input.project
+        project.expressions.append(_scalar_subquery(inner.relations[0].root.input))
+
+        result = optimize(manager, plan)
+
+        exprs = result.relations[0].root.input.project.expressions
+        sub_rel = exprs[-1].subquery.scalar.input
+        assert get_rel_type(sub_rel) == "cross"
+        assert get_rel_type(sub_rel.cross.left) == "filter"
+        assert get_rel_type(sub_rel.cross.right) == "read"
+
+    def test_in_list_without_subquery_unchanged(self, manager):
+        """An IN-list of literals contains no Rels and is left untouched."""
+        plan = materialize(pb.project(make_read("t", ["x", "y"]), [column(0)]))
+        project = plan.relations[0].root.input.project
+        in_list = project.expressions.add().singular_or_list
+        in_list.value.CopyFrom(project.expressions[0])
+        for i in range(100):
+            in_list.options.add().literal.i32 = i
+
+        result = optimize(manager, plan)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "project"
+        assert root_input.project.expressions[-1] == project.expressions[-1]
@@ -0,0 +1,138 @@
+from substrait.algebra_pb2 import Expression, JoinRel, Rel
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+
+from ..conftest import get_rel_type, make_filter_over_cross, make_read, materialize, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+
+
+def _field(index: int) -> Expression:
+    expr = Expression()
+    expr.selection.direct_reference.struct_field.field = index
+    expr.selection.root_reference.SetInParent()
+    return expr
+
+
+def _field_ref(expr: Expression) -> int:
+    return expr.selection.direct_reference.struct_field.field
+
+
+def _filter_over_cross(left: Rel, filter_field_index: int):
+    """Filter(col(filter_field_index)) over Cross(left, Read(c, d))."""
+    plan = materialize(
+        make_filter_over_cross(
+            make_read("left_table", ["a", "b"]),
+            make_read("right_table", ["c", "d"]),
+            filter_field_index,
+        )
+    )
+    plan.relations[0].root.input.filter.input.cross.left.CopyFrom(left)
+    return plan
+
+
+def _read_rel(names: list[str]) -> Rel:
+    return materialize(make_read("left_table", names)).relations[0].root.input
+
+
+class TestOutputTypes:
+    def test_multi_grouping_aggregate_field_count(self, manager):
+        """An aggregate with several grouping sets outputs its distinct keys,
+        its measures and a grouping set index, so a right-side filter above a
+        cross with it on the left is pushed with the right offset."""
+        left = Rel()
+        agg = left.aggregate
+        agg.input.CopyFrom(_read_rel(["a", "b"]))
+        agg.groupings.add().grouping_expressions.append(_field(0))
+        agg.groupings.add().grouping_expressions.append(_field(1))
+
+        # Keys a, b and the grouping set index make 3 fields; 3 is right field 0.
+        result = optimize(manager, _filter_over_cross(left, 3))
+
+        cross = result.relations[0].root.input.cross
+        assert get_rel_type(cross.left) == "aggregate"
+        assert get_rel_type(cross.right) == "filter"
+        assert _field_ref(cross.right.filter.condition) == 0
+
+    def test_child_emit_respected(self, manager):
+        """A left input with an emit contributes only its emitted fields."""
+        left = _read_rel(["a", "b"])
+        left.read.common.emit.output_mapping.append(1)
+
+        result = optimize(manager, _filter_over_cross(left, 1))
+
+        cross = result.relations[0].root.input.cross
+        assert get_rel_type(cross.right) == "filter"
+        assert _field_ref(cross.right.filter.condition) == 0
+
+    def test_else_only_if_then(self, manager):
+        """An if_then or switch with no clauses takes the type of its else;
+        one without an else is still counted as a field."""
+        for rex_type, has_else in (("if_then", True), ("switch_expression", True), ("if_then", False)):
+            left = Rel()
+            left.project.input.CopyFrom(_read_rel(["a", "b"]))
+            branches = getattr(left.project.expressions.add(), rex_type)
+            branches.SetInParent()
+            if has_else:
+                getattr(branches, "else").CopyFrom(_field(0))
+
+            # a, b and the expression make 3 fields; 3 is right field 0.
+            result = optimize(manager, _filter_over_cross(left, 3))
+
+            cross = result.relations[0].root.input.cross
+            assert get_rel_type(cross.right) == "filter"
+            assert _field_ref(cross.right.filter.condition) == 0
+
+    def test_extension_output_names(self, manager):
+        """An extension rel's declared output names give its field count."""
+        left = Rel()
+        left.extension_leaf.common.hint.output_names.extend(["x", "y", "z"])
+
+        result = optimize(manager, _filter_over_cross(left, 3))
+
+        cross = result.relations[0].root.input.cross
+        assert get_rel_type(cross.left) == "extension_leaf"
+        assert get_rel_type(cross.right) == "filter"
+        assert _field_ref(cross.right.filter.condition) == 0
+
+    def test_right_semi_join_outputs_right_side(self, manager):
+        """A filter above a right semi join references the right input only."""
+        left = make_read("left_table", ["a", "b"])
+        right = make_read("right_table", ["c", "d"])
+        cond = scalar_function(COMPARISON_URN, "equal", [column(0), column(2)])
+        plan = materialize(
+            pb.filter(pb.join(left, right, cond, JoinRel.JOIN_TYPE_INNER), column(1))
+        )
+        plan.relations[0].root.input.filter.input.join.type = JoinRel.JOIN_TYPE_RIGHT_SEMI
+
+        result = optimize(manager, plan)
+
+        join = result.relations[0].root.input.join
+        assert get_rel_type(join.left) == "read"
+        assert get_rel_type(join.right) == "filter"
+        assert _field_ref(join.right.filter.condition) == 1
+
+    def test_filter_mapped_through_sort_emit(self, manager):
+        """Pushing a filter below a sort with an emit maps its references
+        back to the sort's input."""
+        plan = materialize(pb.filter(pb.sort(make_read("t", ["a", "b"]), [column(0)]), column(0)))
+        sort = plan.relations[0].root.input.filter.input.sort
+        sort.common.emit.output_mapping.extend([1, 0])
+
+        result = optimize(manager, plan)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "sort"
+        assert _field_ref(root_input.sort.input.filter.condition) == 1
+
+    def test_best_effort_filter_uses_base_schema(self, manager):
+        """A read's best_effort_filter refers to base schema fields, not to
+        the read's emitted ones."""
+        plan = materialize(pb.filter(make_read("t", ["a", "b", "c"]), column(0)))
+        read = plan.relations[0].root.input.filter.input.read
+        read.common.emit.output_mapping.extend([2, 0])
+
+        result = optimize(manager, plan)
+
+        read = result.relations[0].root.input.filter.input.read
+        assert _field_ref(read.best_effort_filter) == 2
@@ -1,7 +1,7 @@
 from substrait.builders import plan as pb
 from substrait.builders.extended_expression import column, scalar_function
 
-from ..conftest import get_rel_type, make_read, materialize, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
 
 ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
 
@@ -17,8 +17,8 @@ class TestProjectionPushdown:
         root_input = result.relations[0].root.input
         # Identity project removed — just the read with emit remains.
         assert get_rel_type(root_input) == "read"
-        assert root_input.read.common.HasField("emit")
-        assert list(root_input.read.common.emit.output_mapping) == [0]
+        assert root_input.read.HasField("projection")
+        assert read_fields(root_input.read) == [0]
 
     def test_select_two_columns_prunes_middle(self, manager):
         """select(read([a,b,c,d]), [column(0), column(3)]) should prune b,c.
@@ -30,8 +30,8 @@ class TestProjectionPushdown:
         root_input = result.relations[0].root.input
         # Identity project removed — just the read with emit remains.
         assert get_rel_type(root_input) == "read"
-        assert root_input.read.common.HasField("emit")
-        assert list(root_input.read.common.emit.output_mapping) == [0, 3]
+        assert root_input.read.HasField("projection")
+        assert read_fields(root_input.read) == [0, 3]
 
     def test_select_expression_prunes_unreferenced(self, manager):
         """select(read([a,b,c,d]), [add(col(0), col(1))]) should prune c,d."""
@@ -45,8 +45,8 @@ class TestProjectionPushdown:
         proj = root_input.project
 
         # Input emit should select only needed fields [0, 1].
-        assert proj.input.read.common.HasField("emit")
-        input_emit = list(proj.input.read.common.emit.output_mapping)
+        assert proj.input.read.HasField("projection")
+        input_emit = read_fields(proj.input.read)
         assert input_emit == [0, 1]
 
     def test_all_fields_referenced_no_change(self, manager):
@@ -59,7 +59,7 @@ class TestProjectionPushdown:
         root_input = result.relations[0].root.input
         # Identity project removed — just the read remains, no emit needed.
         assert get_rel_type(root_input) == "read"
-        assert not root_input.read.common.HasField("emit")
+        assert not root_input.read.HasField("projection")
 
     def test_project_without_emit_no_change(self, manager):
         """project(read, [expr]) without emit should not trigger the rule."""
@@ -72,7 +72,7 @@ class TestProjectionPushdown:
         proj = root_input.project
 
         # No emit on project → rule doesn't fire → input should not have emit.
-        assert not proj.input.read.common.HasField("emit")
+        assert not proj.input.read.HasField("projection")
 
     def test_idempotent(self, manager):
         """Running optimization twice should produce the same result."""
@@ -116,8 +116,8 @@ class TestProjectionPushdown:
         assert len(proj.expressions) == 1
 
         # Input should be pruned: only a,b needed (c no longer referenced).
-        assert proj.input.read.common.HasField("emit")
-        assert list(proj.input.read.common.emit.output_mapping) == [0, 1]
+        assert proj.input.read.HasField("projection")
+        assert read_fields(proj.input.read) == [0, 1]
 
         # Emit remapped: 0→0 (input a), 3→new_input(2)+expr_map[0](0)=2.
         assert list(proj.common.emit.output_mapping) == [0, 2]
@@ -148,7 +148,7 @@ class TestProjectionPushdown:
         assert len(proj.expressions) == 1
 
         # All input fields needed — no input pruning.
-        assert not proj.input.read.common.HasField("emit")
+        assert not proj.input.read.HasField("projection")
 
         # Emit: 0→0, 1→1, 2→2+0=2.
         assert list(proj.common.emit.output_mapping) == [0, 1, 2]
@@ -197,5 +197,5 @@ class TestProjectionPushdown:
         root_input = result.relations[0].root.input
         # Both identity projects removed — just the pruned read remains.
         assert get_rel_type(root_input) == "read"
-        assert root_input.read.common.HasField("emit")
-        assert list(root_input.read.common.emit.output_mapping) == [0]
+        assert root_input.read.HasField("projection")
+        assert read_fields(root_input.read) == [0]
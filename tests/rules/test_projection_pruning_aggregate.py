@@ -0,0 +1,94 @@
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import aggregate_function, column
+
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
+
+ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
+
+
+def _aggregate(keys, measure_fields):
+    """Aggregate over read(a, b, c, d) grouping by the given fields, with a
+    sum of each of `measure_fields`."""
+    read = make_read("t", ["a", "b", "c", "d"])
+    return materialize(
+        pb.aggregate(
+            read,
+            grouping_expressions=[column(k) for k in keys],
+            measures=[aggregate_function(ARITHMETIC_URN, "sum", [column(f)]) for f in measure_fields],
+        )
+    )
+
+
+def _sum_field(measure) -> int:
+    return measure.measure.arguments[0].value.selection.direct_reference.struct_field.field
+
+
+class TestAggregateProjectionPruning:
+    def test_unused_measure_dropped(self, manager):
+        """Aggregate(emit=[a, sum(c)]) drops sum(b) and stops reading b and d."""
+        plan = _aggregate([0], [1, 2])
+        plan.relations[0].root.input.aggregate.common.emit.output_mapping[:] = [0, 2]
+
+        result = optimize(manager, plan)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "aggregate"
+        agg = root_input.aggregate
+        assert len(agg.measures) == 1
+        assert list(agg.common.emit.output_mapping) == [0, 1]
+        assert read_fields(agg.input.read) == [0, 2]
+        assert _sum_field(agg.measures[0]) == 1
+
+    def test_input_pruned_without_emit(self, manager):
+        """An aggregate only reads the fields its keys and measures use."""
+        plan = _aggregate([0], [2])
+
+        result = optimize(manager, plan)
+
+        agg = result.relations[0].root.input.aggregate
+        assert len(agg.measures) == 1
+        assert read_fields(agg.input.read) == [0, 2]
+        assert agg.grouping_expressions[0].selection.direct_reference.struct_field.field == 0
+        assert _sum_field(agg.measures[0]) == 1
+
+    def test_measure_filter_fields_kept(self, manager):
+        """Fields used by a measure's filter are still read."""
+        plan = _aggregate([0], [2])
+        agg = plan.relations[0].root.input.aggregate
+        agg.measures[0].filter.CopyFrom(agg.grouping_expressions[0])
+        agg.measures[0].filter.selection.direct_reference.struct_field.field = 3
+
+        result = optimize(manager, plan)
+
+        agg = result.relations[0].root.input.aggregate
+        assert read_fields(agg.input.read) == [0, 2, 3]
+        assert agg.measures[0].filter.selection.direct_reference.struct_field.field == 2
+
+    def test_grouping_set_index_remapped(self, manager):
+        """Dropping a measure shifts the grouping set index column."""
+        plan = _aggregate([0, 1], [2, 3])
+        agg = plan.relations[0].root.input.aggregate
+        del agg.groupings[:]
+        agg.groupings.add().expression_references.extend([0])
+        agg.groupings.add().expression_references.extend([1])
+        # Keys a, b, sum(c), sum(d), grouping set index.
+        agg.common.emit.output_mapping[:] = [0, 1, 3, 4]
+
+        result = optimize(manager, plan)
+
+        agg = result.relations[0].root.input.aggregate
+        assert len(agg.measures) == 1
+        assert list(agg.common.emit.output_mapping) == [0, 1, 2, 3]
+        assert read_fields(agg.input.read) == [0, 1, 3]
+        assert _sum_field(agg.measures[0]) == 2
+
+    def test_global_aggregate_keeps_a_measure(self, manager):
+        """Without keys, an aggregate keeps a measure even if none is used."""
+        plan = _aggregate([], [1, 2])
+        plan.relations[0].root.input.aggregate.common.emit.output_mapping[:] = []
+
+        result = optimize(manager, plan)
+
+        agg = result.relations[0].root.input.aggregate
+        assert len(agg.measures) == 1
+        assert read_fields(agg.input.read) == [1]
@@ -1,7 +1,7 @@
 from substrait.builders import plan as pb
 from substrait.builders.extended_expression import column
 
-from ..conftest import get_rel_type, make_read, materialize
+from ..conftest import get_rel_type, make_read, materialize, read_fields
 
 
 class TestCrossProjectionPruning:
@@ -25,8 +25,8 @@ class TestCrossProjectionPruning:
         cross = root_input.cross
 
         # Left needs only field 0. Prune to [0].
-        assert cross.left.read.common.HasField("emit")
-        assert list(cross.left.read.common.emit.output_mapping) == [0]
+        assert cross.left.read.HasField("projection")
+        assert read_fields(cross.left.read) == [0]
 
         # Right needs nothing from emit, but can't have 0 fields.
         # prune_input won't prune to empty — all right fields are unneeded
@@ -56,8 +56,8 @@ class TestCrossProjectionPruning:
         cross = root_input.cross
 
         # Right needs field 1 (3-2=1). Prune to [1].
-        assert cross.right.read.common.HasField("emit")
-        assert list(cross.right.read.common.emit.output_mapping) == [1]
+        assert cross.right.read.HasField("projection")
+        assert read_fields(cross.right.read) == [1]
 
         # Emit remapped: old 3 → new_left_count(0) + right_mapping[1](0) = 0.
         assert list(cross.common.emit.output_mapping) == [0]
@@ -83,10 +83,10 @@ class TestCrossProjectionPruning:
         cross = root_input.cross
 
         # Left needs {0}. Prune to [0].
-        assert list(cross.left.read.common.emit.output_mapping) == [0]
+        assert read_fields(cross.left.read) == [0]
 
         # Right needs {2} (5-3=2). Prune to [2].
-        assert list(cross.right.read.common.emit.output_mapping) == [2]
+        assert read_fields(cross.right.read) == [2]
 
         # Emit remapped: 0→0, 5→new_left(1)+right_map[2](0)=1.
         assert list(cross.common.emit.output_mapping) == [0, 1]
@@ -108,8 +108,8 @@ class TestCrossProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "cross"
-        assert not root_input.cross.left.read.common.HasField("emit")
-        assert not root_input.cross.right.read.common.HasField("emit")
+        assert not root_input.cross.left.read.HasField("projection")
+        assert not root_input.cross.right.read.HasField("projection")
 
     def test_cross_without_emit_no_change(self, manager):
         """Cross without emit should not trigger the rule."""
@@ -123,8 +123,8 @@ class TestCrossProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "cross"
-        assert not root_input.cross.left.read.common.HasField("emit")
-        assert not root_input.cross.right.read.common.HasField("emit")
+        assert not root_input.cross.left.read.HasField("projection")
+        assert not root_input.cross.right.read.HasField("projection")
 
     def test_idempotent(self, manager):
         """Running optimization twice should produce the same result."""
@@ -1,7 +1,7 @@
 from substrait.builders import plan as pb
 from substrait.builders.extended_expression import column
 
-from ..conftest import get_rel_type, make_fetch, make_read, materialize, optimize
+from ..conftest import get_rel_type, make_fetch, make_read, materialize, optimize, read_fields
 
 
 class TestFetchProjectionPruning:
@@ -24,8 +24,8 @@ class TestFetchProjectionPruning:
         fetch = root_input.fetch
 
         # Input should have emit pruning to just field 0.
-        assert fetch.input.read.common.HasField("emit")
-        assert list(fetch.input.read.common.emit.output_mapping) == [0]
+        assert fetch.input.read.HasField("projection")
+        assert read_fields(fetch.input.read) == [0]
 
         # Fetch emit should be [0].
         assert list(fetch.common.emit.output_mapping) == [0]
@@ -48,8 +48,8 @@ class TestFetchProjectionPruning:
         assert get_rel_type(root_input) == "fetch"
         fetch = root_input.fetch
 
-        assert fetch.input.read.common.HasField("emit")
-        assert list(fetch.input.read.common.emit.output_mapping) == [0, 3]
+        assert fetch.input.read.HasField("projection")
+        assert read_fields(fetch.input.read) == [0, 3]
 
         # Emit remapped: 0->0, 3->1.
         assert list(fetch.common.emit.output_mapping) == [0, 1]
@@ -70,7 +70,7 @@ class TestFetchProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "fetch"
-        assert not root_input.fetch.input.read.common.HasField("emit")
+        assert not root_input.fetch.input.read.HasField("projection")
 
     def test_fetch_without_emit_no_change(self, manager):
         """Fetch without emit should not trigger the rule."""
@@ -80,7 +80,7 @@ class TestFetchProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "fetch"
-        assert not root_input.fetch.input.read.common.HasField("emit")
+        assert not root_input.fetch.input.read.HasField("projection")
 
     def test_cascading_project_then_fetch_pruning(self, manager):
         """select(fetch(read([a,b,c,d]), 0, 10), [col(0)])
@@ -97,8 +97,8 @@ class TestFetchProjectionPruning:
         fetch = root_input.fetch
 
         assert get_rel_type(fetch.input) == "read"
-        assert fetch.input.read.common.HasField("emit")
-        assert list(fetch.input.read.common.emit.output_mapping) == [0]
+        assert fetch.input.read.HasField("projection")
+        assert read_fields(fetch.input.read) == [0]
 
     def test_idempotent(self, manager):
         """Running optimization twice should produce the same result."""
@@ -1,7 +1,8 @@
 from substrait.builders import plan as pb
-from substrait.builders.extended_expression import column, scalar_function
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column, literal, scalar_function, switch
 
-from ..conftest import get_rel_type, make_read, materialize, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
 
 COMPARISON_URN = "extension:io.substrait:functions_comparison"
 ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
@@ -30,8 +31,8 @@ class TestFilterProjectionPruning:
         filt = root_input.filter
 
         # Input should have emit pruning to just field 0.
-        assert filt.input.read.common.HasField("emit")
-        input_emit = list(filt.input.read.common.emit.output_mapping)
+        assert filt.input.read.HasField("projection")
+        input_emit = read_fields(filt.input.read)
         assert input_emit == [0]
 
         # Filter emit should be [0].
@@ -58,8 +59,8 @@ class TestFilterProjectionPruning:
         filt = root_input.filter
 
         # Input emit should select fields 0 and 2.
-        assert filt.input.read.common.HasField("emit")
-        input_emit = list(filt.input.read.common.emit.output_mapping)
+        assert filt.input.read.HasField("projection")
+        input_emit = read_fields(filt.input.read)
         assert input_emit == [0, 2]
 
         # Condition should be remapped: col(2) → col(1).
@@ -88,7 +89,7 @@ class TestFilterProjectionPruning:
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "filter"
         # Input should NOT have emit (no pruning needed).
-        assert not root_input.filter.input.read.common.HasField("emit")
+        assert not root_input.filter.input.read.HasField("projection")
 
     def test_filter_without_emit_no_change(self, manager):
         """Filter without emit should not trigger the rule."""
@@ -100,7 +101,7 @@ class TestFilterProjectionPruning:
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "filter"
         # Input should NOT have emit.
-        assert not root_input.filter.input.read.common.HasField("emit")
+        assert not root_input.filter.input.read.HasField("projection")
 
     def test_cascading_project_then_filter_pruning(self, manager):
         """select(filter(read([a,b,c,d]), col(2)>5), [col(0)])
@@ -119,8 +120,8 @@ class TestFilterProjectionPruning:
 
         # The read should have emit from cascading pruning.
         assert get_rel_type(filt.input) == "read"
-        assert filt.input.read.common.HasField("emit")
-        assert list(filt.input.read.common.emit.output_mapping) == [0, 2]
+        assert filt.input.read.HasField("projection")
+        assert read_fields(filt.input.read) == [0, 2]
 
     def test_input_already_has_emit(self, manager):
         """Filter with emit over an input that already has emit should compose correctly."""
@@ -145,7 +146,7 @@ class TestFilterProjectionPruning:
         filt = root_input.filter
 
         # Input emit should be composed: needed=[0] from [0,2,3] → [0].
-        input_emit = list(filt.input.read.common.emit.output_mapping)
+        input_emit = read_fields(filt.input.read)
         assert input_emit == [0]
 
     def test_idempotent(self, manager):
@@ -157,3 +158,17 @@ class TestFilterProjectionPruning:
         first = optimize(manager, selected)
         second_bytes = manager.optimize(first.SerializeToString())
         assert first.SerializeToString() == second_bytes
+
+    def test_switch_condition_prunes_unused_fields(self, manager):
+        """Filter(emit=[0], CASE col(1) WHEN 1 THEN col(2) ELSE false, Read([a,b,c,d]))
+        keeps the fields the switch reads and prunes d."""
+        read = make_read("t", ["a", "b", "c", "d"])
+        pred = scalar_function(COMPARISON_URN, "is_not_null", [column(2)])
+        cond = switch(column(1), [(literal(1, tb.i32()), pred)], literal(False, tb.boolean()))
+        plan = materialize(pb.filter(read, cond))
+        plan.relations[0].root.input.filter.common.emit.output_mapping[:] = [0]
+        result = optimize(manager, plan)
+
+        filt = result.relations[0].root.input.filter
+        assert read_fields(filt.input.read) == [0, 1, 2]
+        assert list(filt.common.emit.output_mapping) == [0]
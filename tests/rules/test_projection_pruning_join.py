@@ -2,7 +2,7 @@ from substrait.algebra_pb2 import JoinRel
 from substrait.builders import plan as pb
 from substrait.builders.extended_expression import column, scalar_function
 
-from ..conftest import get_rel_type, make_read, materialize, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
 
 COMPARISON_URN = "extension:io.substrait:functions_comparison"
 
@@ -36,13 +36,13 @@ class TestJoinProjectionPruning:
 
         # Left needs fields {0} (emit) + {0} (expression col(0)) = {0}.
         # Left has 2 fields, so prune to [0].
-        assert join.left.read.common.HasField("emit")
-        assert list(join.left.read.common.emit.output_mapping) == [0]
+        assert join.left.read.HasField("projection")
+        assert read_fields(join.left.read) == [0]
 
         # Right needs fields {0} (expression col(2) → right local 0).
         # Right has 2 fields, so prune to [0].
-        assert join.right.read.common.HasField("emit")
-        assert list(join.right.read.common.emit.output_mapping) == [0]
+        assert join.right.read.HasField("projection")
+        assert read_fields(join.right.read) == [0]
 
     def test_emit_right_only_prunes_left(self, manager):
         """Join(emit=[3], expr=equal(col(0),col(2)), L([a,b]), R([c,d]))
@@ -71,11 +71,11 @@ class TestJoinProjectionPruning:
         join = root_input.join
 
         # Left needs {0} from expression only. Prune to [0].
-        assert join.left.read.common.HasField("emit")
-        assert list(join.left.read.common.emit.output_mapping) == [0]
+        assert join.left.read.HasField("projection")
+        assert read_fields(join.left.read) == [0]
 
         # Right needs {1} (emit: 3-2=1) + {0} (expression: 2-2=0). Prune to [0,1] = all fields, no prune.
-        assert not join.right.read.common.HasField("emit")
+        assert not join.right.read.HasField("projection")
 
         # Emit should be remapped: old 3 → new_left_count(1) + right_mapping[1](1) = 2.
         assert list(join.common.emit.output_mapping) == [2]
@@ -107,10 +107,10 @@ class TestJoinProjectionPruning:
         join = root_input.join
 
         # Left needs {0, 2} (expr col(0) + emit 2). Prune to [0, 2].
-        assert list(join.left.read.common.emit.output_mapping) == [0, 2]
+        assert read_fields(join.left.read) == [0, 2]
 
         # Right needs {0, 2} (expr col(3)→0 + emit col(5)→2). Prune to [0, 2].
-        assert list(join.right.read.common.emit.output_mapping) == [0, 2]
+        assert read_fields(join.right.read) == [0, 2]
 
         # Expression remapped: col(0)→0, col(3)→new_left(2)+right_map[0](0)=2.
         expr = join.expression.scalar_function
@@ -142,8 +142,8 @@ class TestJoinProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "join"
-        assert not root_input.join.left.read.common.HasField("emit")
-        assert not root_input.join.right.read.common.HasField("emit")
+        assert not root_input.join.left.read.HasField("projection")
+        assert not root_input.join.right.read.HasField("projection")
 
     def test_join_without_emit_no_change(self, manager):
         """Join without emit should not trigger the rule."""
@@ -159,8 +159,8 @@ class TestJoinProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "join"
-        assert not root_input.join.left.read.common.HasField("emit")
-        assert not root_input.join.right.read.common.HasField("emit")
+        assert not root_input.join.left.read.HasField("projection")
+        assert not root_input.join.right.read.HasField("projection")
 
     def test_idempotent(self, manager):
         """Running optimization twice should produce the same result."""
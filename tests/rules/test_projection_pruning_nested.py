@@ -0,0 +1,110 @@
+from substrait.builders import plan as pb
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column, literal, scalar_function
+
+from ..conftest import get_rel_type, materialize, optimize
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+
+
+def _events():
+    """Read events(id, payload struct<user struct<id, name>, kind>, extra)."""
+    user = tb.struct([tb.i32(), tb.i32()])
+    payload = tb.struct([user, tb.i32()])
+    schema = tb.named_struct(
+        ["id", "payload", "user", "id", "name", "kind", "extra"],
+        tb.struct([tb.i32(), payload, tb.i32()], nullable=False),
+    )
+    return pb.read_named_table("events", schema)
+
+
+def _step_into(expr, *members):
+    """Make a field reference in `expr` step into the given struct members."""
+    segment = expr.selection.direct_reference.struct_field
+    for member in members:
+        segment = segment.child.struct_field
+        segment.field = member
+
+
+def _path(expr) -> list[int]:
+    segment = expr.selection.direct_reference.struct_field
+    path = [segment.field]
+    while segment.HasField("child"):
+        segment = segment.child.struct_field
+        path.append(segment.field)
+    return path
+
+
+def _mask(read) -> list:
+    """The read's projection as nested (field, [children]) pairs."""
+
+    def items(struct_items):
+        return [(item.field, items(item.child.struct.struct_items)) for item in struct_items]
+
+    return items(read.projection.select.struct_items)
+
+
+def _select_nested(input_plan, *paths):
+    """Select(payload.<path>, ...) over `input_plan`, as a bound Plan."""
+    plan = materialize(pb.select(input_plan, [column(1) for _ in paths]))
+    project = plan.relations[0].root.input.project
+    for expr, path in zip(project.expressions, paths):
+        _step_into(expr, *path)
+    # The builder counts nested names as fields; the read outputs 3.
+    project.common.emit.output_mapping[:] = [3 + i for i in range(len(paths))]
+    return plan
+
+
+class TestNestedProjectionPruning:
+    def test_leaf_reference_selects_leaf(self, manager):
+        """SELECT payload.user.id reads only that leaf of payload."""
+        result = optimize(manager, _select_nested(_events(), (0, 0)))
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "project"
+        project = root_input.project
+        read = project.input.read
+        assert _mask(read) == [(1, [(0, [(0, [])])])]
+        assert read.projection.maintain_singular_struct
+        assert _path(project.expressions[0]) == [0, 0, 0]
+
+    def test_sibling_members_remapped(self, manager):
+        """payload.user.name and payload.kind index the narrowed payload."""
+        result = optimize(manager, _select_nested(_events(), (0, 1), (1,)))
+
+        project = result.relations[0].root.input.project
+        assert _mask(project.input.read) == [(1, [(0, [(1, [])]), (1, [])])]
+        assert [_path(e) for e in project.expressions] == [[0, 0, 0], [0, 1]]
+
+    def test_whole_struct_not_narrowed(self, manager):
+        """A struct passed through by the emit is read whole."""
+        plan = _select_nested(_events(), (0, 0))
+        project = plan.relations[0].root.input.project
+        project.common.emit.output_mapping.append(1)
+
+        result = optimize(manager, plan)
+
+        project = result.relations[0].root.input.project
+        assert _mask(project.input.read) == [(1, [])]
+        assert _path(project.expressions[0]) == [0, 0, 0]
+
+    def test_through_filter(self, manager):
+        """Filter members are kept and mapped back to the base schema for the hint."""
+        condition = scalar_function(COMPARISON_URN, "equal", [column(0), literal(1, tb.i32())])
+        plan = _select_nested(pb.filter(_events(), condition), (0, 1))
+        filter_rel = plan.relations[0].root.input.project.input.filter
+        kind = filter_rel.condition.scalar_function.arguments[0].value
+        kind.selection.direct_reference.struct_field.field = 1
+        _step_into(kind, 1)
+
+        result = optimize(manager, plan)
+
+        project = result.relations[0].root.input.project
+        assert get_rel_type(project.input) == "filter"
+        filter_rel = project.input.filter
+        read = filter_rel.input.read
+        assert _mask(read) == [(1, [(0, [(1, [])]), (1, [])])]
+        assert _path(project.expressions[0]) == [0, 0, 0]
+        assert _path(filter_rel.condition.scalar_function.arguments[0].value) == [0, 1]
+        hint = read.best_effort_filter.scalar_function.arguments[0].value
+        assert _path(hint) == [1, 1]
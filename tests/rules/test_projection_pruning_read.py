@@ -0,0 +1,82 @@
+from substrait.builders import plan as pb
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column
+
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
+
+
+class TestReadProjectionPruning:
+    def test_pruned_fields_move_into_projection(self, manager):
+        """Select(b, d) over Read([a,b,c,d]) should project fields 1 and 3 with no emit."""
+        read = make_read("t", ["a", "b", "c", "d"])
+        selected = pb.select(read, [column("b"), column("d")])
+
+        result = optimize(manager, selected)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "read"
+        read_rel = root_input.read
+        items = read_rel.projection.select.struct_items
+        assert [item.field for item in items] == [1, 3]
+        assert read_rel.projection.maintain_singular_struct
+        assert not read_rel.common.HasField("emit")
+
+    def test_reordering_emit_is_kept(self, manager):
+        """Read([a,b,c,d]) with emit=[2,0,2] projects [0,2] and keeps emit=[1,0,1]."""
+        plan = materialize(make_read("t", ["a", "b", "c", "d"]))
+        plan.relations[0].root.input.read.common.emit.output_mapping[:] = [2, 0, 2]
+
+        result = optimize(manager, plan)
+
+        read_rel = result.relations[0].root.input.read
+        items = read_rel.projection.select.struct_items
+        assert [item.field for item in items] == [0, 2]
+        assert list(read_rel.common.emit.output_mapping) == [1, 0, 1]
+        assert read_fields(read_rel) == [2, 0, 2]
+
+    def test_composes_with_existing_projection(self, manager):
+        """An emit over a projected read selects among the projected fields."""
+        plan = materialize(make_read("t", ["a", "b", "c", "d"]))
+        read_rel = plan.relations[0].root.input.read
+        for field in (0, 2, 3):
+            read_rel.projection.select.struct_items.add(field=field)
+        read_rel.common.emit.output_mapping[:] = [2]
+
+        result = optimize(manager, plan)
+
+        read_rel = result.relations[0].root.input.read
+        assert [item.field for item in read_rel.projection.select.struct_items] == [3]
+        assert not read_rel.common.HasField("emit")
+
+    def test_full_selection_keeps_emit(self, manager):
+        """An emit that only reorders all fields leaves the projection unset."""
+        plan = materialize(make_read("t", ["a", "b"]))
+        plan.relations[0].root.input.read.common.emit.output_mapping[:] = [1, 0]
+
+        result = optimize(manager, plan)
+
+        read_rel = result.relations[0].root.input.read
+        assert not read_rel.HasField("projection")
+        assert list(read_rel.common.emit.output_mapping) == [1, 0]
+
+    def test_unwrapping_projection_left_alone(self, manager):
+        """A projection that unwraps single-member child selections
+        (maintain_singular_struct false) keeps its flag, so the emit stays."""
+        schema = tb.named_struct(
+            ["a", "s", "x", "y", "c"],
+            tb.struct([tb.i32(), tb.struct([tb.i64(), tb.i32()]), tb.i32()], nullable=False),
+        )
+        plan = materialize(pb.read_named_table("t", schema))
+        read_rel = plan.relations[0].root.input.read
+        read_rel.projection.select.struct_items.add(field=0)
+        nested = read_rel.projection.select.struct_items.add(field=1)
+        nested.child.struct.struct_items.add(field=0)
+        read_rel.projection.select.struct_items.add(field=2)
+        read_rel.common.emit.output_mapping[:] = [1]
+
+        result = optimize(manager, plan)
+
+        read_rel = result.relations[0].root.input.read
+        assert not read_rel.projection.maintain_singular_struct
+        assert [item.field for item in read_rel.projection.select.struct_items] == [0, 1, 2]
+        assert list(read_rel.common.emit.output_mapping) == [1]
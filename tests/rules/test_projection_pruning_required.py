@@ -0,0 +1,94 @@
+from substrait.builders import plan as pb
+from substrait.builders import type as tb
+from substrait.builders.extended_expression import column, literal, scalar_function
+from substrait.proto import JoinRel
+
+from ..conftest import (
+    get_rel_type,
+    make_fetch,
+    make_read,
+    materialize,
+    optimize,
+    read_fields,
+)
+
+ARITHMETIC_URN = "extension:io.substrait:functions_arithmetic"
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+
+
+class TestRequiredColumnsPass:
+    def test_deep_chain_pruned_before_passes(self, manager):
+        """Select(a + b) over Fetch(Sort(Read([a..e]))) is pruned to a, b
+        and the sort key before the first pass."""
+        read = make_read("t", ["a", "b", "c", "d", "e"])
+        sorted_rel = pb.sort(read, [column(2)])
+        plan = pb.select(
+            make_fetch(sorted_rel, 0, 10),
+            [scalar_function(ARITHMETIC_URN, "add", [column(0), column(1)])],
+        )
+
+        result = optimize(manager, plan)
+
+        project = result.relations[0].root.input.project
+        sort = project.input.fetch.input.sort
+        assert read_fields(sort.input.read) == [0, 1, 2]
+        groups = {g.name: g for g in manager.last_report.groups}
+        assert groups["rel-rules"].passes == 1
+
+    def test_semi_join_without_emit_prunes_inner_side(self, manager):
+        """A LEFT_SEMI join outputs its left side, so only the right's key is read."""
+        left = make_read("l", ["a", "b"])
+        right = make_read("r", ["x", "y", "z"])
+        joined = pb.join(
+            left,
+            right,
+            scalar_function(COMPARISON_URN, "equal", [column(0), column(3)]),
+            JoinRel.JOIN_TYPE_LEFT_SEMI,
+        )
+
+        result = optimize(manager, joined)
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "join"
+        join = root_input.join
+        assert not join.common.HasField("emit")
+        assert read_fields(join.left.read) == [0, 1]
+        assert read_fields(join.right.read) == [1]
+        condition = join.expression.scalar_function
+        assert condition.arguments[1].value.selection.direct_reference.struct_field.field == 2
+
+    def test_right_semi_and_anti_post_join_filter(self, manager):
+        """The post-join filter of a RIGHT_SEMI/RIGHT_ANTI join refers to
+        the join's output, the right side: d > 5 over l(a, b), r(c, d)
+        stays on d."""
+        for join_type in (JoinRel.JOIN_TYPE_RIGHT_SEMI, JoinRel.JOIN_TYPE_RIGHT_ANTI):
+            left = make_read("l", ["a", "b"])
+            right = make_read("r", ["c", "d"])
+            # Built as the join expression AND(b = c, field 1 > 5), then
+            # split into the expression and the post-join filter.
+            condition = scalar_function(
+                BOOLEAN_URN,
+                "and",
+                [
+                    scalar_function(COMPARISON_URN, "equal", [column(1), column(2)]),
+                    scalar_function(COMPARISON_URN, "gt", [column(1), literal(5, tb.i32())]),
+                ],
+            )
+            plan = materialize(pb.join(left, right, condition, join_type))
+            join = plan.relations[0].root.input.join
+            key, post = (arg.value for arg in join.expression.scalar_function.arguments)
+            join.post_join_filter.CopyFrom(post)
+            join.expression.CopyFrom(key)
+
+            result = optimize(manager, plan)
+
+            join = result.relations[0].root.input.join
+            assert read_fields(join.left.read) == [1]
+            if join.HasField("post_join_filter"):
+                post = join.post_join_filter
+            else:
+                assert get_rel_type(join.right) == "filter"
+                post = join.right.filter.condition
+            gt = post.scalar_function.arguments[0].value
+            assert gt.selection.direct_reference.struct_field.field == 1
@@ -2,7 +2,7 @@ from substrait.algebra_pb2 import SetRel
 from substrait.builders import plan as pb
 from substrait.builders.extended_expression import column
 
-from ..conftest import get_rel_type, make_read, materialize, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
 
 
 class TestSetProjectionPruning:
@@ -27,8 +27,8 @@ class TestSetProjectionPruning:
 
         # Both inputs should be pruned to just field 0.
         for inp in set_rel.inputs:
-            assert inp.read.common.HasField("emit")
-            assert list(inp.read.common.emit.output_mapping) == [0]
+            assert inp.read.HasField("projection")
+            assert read_fields(inp.read) == [0]
 
         # Set emit remapped: 0 -> 0.
         assert list(set_rel.common.emit.output_mapping) == [0]
@@ -52,8 +52,8 @@ class TestSetProjectionPruning:
         set_rel = root_input.set
 
         for inp in set_rel.inputs:
-            assert inp.read.common.HasField("emit")
-            assert list(inp.read.common.emit.output_mapping) == [0, 2]
+            assert inp.read.HasField("projection")
+            assert read_fields(inp.read) == [0, 2]
 
         # Emit remapped: 0->0, 2->1.
         assert list(set_rel.common.emit.output_mapping) == [0, 1]
@@ -79,8 +79,8 @@ class TestSetProjectionPruning:
 
         assert len(set_rel.inputs) == 3
         for inp in set_rel.inputs:
-            assert inp.read.common.HasField("emit")
-            assert list(inp.read.common.emit.output_mapping) == [1]
+            assert inp.read.HasField("projection")
+            assert read_fields(inp.read) == [1]
 
         assert list(set_rel.common.emit.output_mapping) == [0]
 
@@ -102,7 +102,7 @@ class TestSetProjectionPruning:
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "set"
         for inp in root_input.set.inputs:
-            assert not inp.read.common.HasField("emit")
+            assert not inp.read.HasField("projection")
 
     def test_set_without_emit_no_change(self, manager):
         """Set without emit should not trigger the rule."""
@@ -114,7 +114,7 @@ class TestSetProjectionPruning:
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "set"
         for inp in root_input.set.inputs:
-            assert not inp.read.common.HasField("emit")
+            assert not inp.read.HasField("projection")
 
     def test_cascading_project_then_set_pruning(self, manager):
         """select(union(A([a,b,c]), B([a,b,c])), [col(0)])
@@ -130,8 +130,8 @@ class TestSetProjectionPruning:
         # Identity project removed — set is now the root.
         assert get_rel_type(root_input) == "set"
         for inp in root_input.set.inputs:
-            assert inp.read.common.HasField("emit")
-            assert list(inp.read.common.emit.output_mapping) == [0]
+            assert inp.read.HasField("projection")
+            assert read_fields(inp.read) == [0]
 
     def test_idempotent(self, manager):
         """Running optimization twice should produce the same result."""
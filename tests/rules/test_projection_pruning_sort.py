@@ -1,7 +1,7 @@
 from substrait.builders import plan as pb
 from substrait.builders.extended_expression import column
 
-from ..conftest import get_rel_type, make_read, materialize, optimize
+from ..conftest import get_rel_type, make_read, materialize, optimize, read_fields
 
 
 class TestSortProjectionPruning:
@@ -25,8 +25,8 @@ class TestSortProjectionPruning:
         sort = root_input.sort
 
         # Input should have emit pruning to just field 0.
-        assert sort.input.read.common.HasField("emit")
-        assert list(sort.input.read.common.emit.output_mapping) == [0]
+        assert sort.input.read.HasField("projection")
+        assert read_fields(sort.input.read) == [0]
 
         # Sort emit should be [0].
         assert list(sort.common.emit.output_mapping) == [0]
@@ -51,8 +51,8 @@ class TestSortProjectionPruning:
         sort = root_input.sort
 
         # Input emit should select fields 0 and 2.
-        assert sort.input.read.common.HasField("emit")
-        assert list(sort.input.read.common.emit.output_mapping) == [0, 2]
+        assert sort.input.read.HasField("projection")
+        assert read_fields(sort.input.read) == [0, 2]
 
         # Sort expression should be remapped: col(2) -> col(1).
         sort_expr = sort.sorts[0].expr
@@ -78,7 +78,7 @@ class TestSortProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "sort"
-        assert not root_input.sort.input.read.common.HasField("emit")
+        assert not root_input.sort.input.read.HasField("projection")
 
     def test_sort_without_emit_no_change(self, manager):
         """Sort without emit should not trigger the rule."""
@@ -88,7 +88,7 @@ class TestSortProjectionPruning:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "sort"
-        assert not root_input.sort.input.read.common.HasField("emit")
+        assert not root_input.sort.input.read.HasField("projection")
 
     def test_cascading_project_then_sort_pruning(self, manager):
         """select(sort(read([a,b,c,d]), col(2)), [col(0)])
@@ -105,8 +105,8 @@ class TestSortProjectionPruning:
         sort = root_input.sort
 
         assert get_rel_type(sort.input) == "read"
-        assert sort.input.read.common.HasField("emit")
-        assert list(sort.input.read.common.emit.output_mapping) == [0, 2]
+        assert sort.input.read.HasField("projection")
+        assert read_fields(sort.input.read) == [0, 2]
 
     def test_idempotent(self, manager):
         """Running optimization twice should produce the same result."""
@@ -1,6 +1,11 @@
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+
 from distill import Manager
 
-from .conftest import COMPONENTS_DIR
+from .conftest import COMPONENTS_DIR, make_read, materialize, optimize, read_fields
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
 
 
 class TestManagerLoad:
@@ -16,3 +21,52 @@ class TestManagerLoad:
         m = Manager(tmp_path)
         infos = m.load_components()
         assert infos == []
+
+
+class TestManagerReport:
+    def _plan(self):
+        """Project(emit) over Filter over Sort over Read: pruning cascades one
+        level per rewrite."""
+        read = make_read("t", ["a", "b", "c", "d"])
+        pred = scalar_function(COMPARISON_URN, "is_not_null", [column(0)])
+        plan = materialize(pb.project(pb.filter(pb.sort(read, [column(1)]), pred), [column(0)]))
+        plan.relations[0].root.input.project.common.emit.output_mapping[:] = [4]
+        return plan
+
+    def test_single_call_reaches_fixed_point(self, manager):
+        """Rule groups iterate internally, so a single host iteration gives the
+        same plan as the full loop for a plan needing several rewrites in sequence."""
+        m = Manager(COMPONENTS_DIR, max_iterations=1)
+        m.load_components()
+        result = optimize(m, self._plan())
+
+        assert result == optimize(manager, self._plan())
+        read = result.relations[0].root.input.filter.input.sort.input.read
+        assert read_fields(read) == [0, 1]
+
+    def test_report_counts_calls_and_passes(self, manager):
+        """A converged rule group is called once and skipped afterwards."""
+        optimize(manager, self._plan())
+
+        report = manager.last_report
+        groups = {g.name: g for g in report.groups}
+        rel_rules = groups["rel-rules"]
+        assert rel_rules.calls == 1
+        assert rel_rules.passes > 1
+        assert rel_rules.skipped == 1
+        assert report.iterations == 2
+
+    def test_report_merges_rule_stats(self, manager):
+        """Per-rule counters from each rule group end up in the report."""
+        optimize(manager, self._plan())
+
+        groups = {g.name: g for g in manager.last_report.groups}
+        rules = groups["rel-rules"].rules
+        assert rules["prune_project_input"].fires >= 1
+        assert rules["prune_sort_input"].fires >= 1
+        assert all(r.invocations >= r.fires for r in rules.values())
+        assert sum(r.nanos for r in rules.values()) > 0
+
+        simplification = groups["predicate-simplification"].rules
+        assert set(simplification) == {"simplify_handler", "filter_removal_handler"}
+        assert all(r.invocations > 0 for r in simplification.values())
@@ -0,0 +1,80 @@
+import shutil
+
+import pytest
+from substrait.builders import plan as pb
+from substrait.builders.extended_expression import column, scalar_function
+
+from distill import Manager
+
+from .conftest import COMPONENTS_DIR, get_rel_type, make_read, materialize, optimize, read_fields
+
+COMPARISON_URN = "extension:io.substrait:functions_comparison"
+BOOLEAN_URN = "extension:io.substrait:functions_boolean"
+
+
+@pytest.fixture(scope="module")
+def memo_manager():
+    m = Manager(COMPONENTS_DIR / "alternatives")
+    m.load_components()
+    return m
+
+
+@pytest.fixture(scope="module")
+def rel_rules_manager(tmp_path_factory):
+    """A manager running rel-rules alone, for comparison."""
+    tmp = tmp_path_factory.mktemp("rel_rules")
+    shutil.copy(COMPONENTS_DIR / "rel_rules.wasm", tmp)
+    m = Manager(tmp)
+    m.load_components()
+    return m
+
+
+def _filter_over_cross():
+    """Filter(AND(left_pred, mixed_pred)) over Cross(left, right)."""
+    left = make_read("left_table", ["a", "b"])
+    right = make_read("right_table", ["c", "d"])
+    left_pred = scalar_function(COMPARISON_URN, "gt", [column(0), column(1)])
+    mixed_pred = scalar_function(COMPARISON_URN, "equal", [column(1), column(2)])
+    cond = scalar_function(BOOLEAN_URN, "and", [left_pred, mixed_pred])
+    return pb.filter(pb.cross(left, right), cond)
+
+
+class TestMemoRules:
+    def test_loads_as_memo_rules(self, memo_manager):
+        optimize(memo_manager, make_read("t", ["a"]))
+        report = memo_manager.last_report
+        assert [g.name for g in report.groups] == ["memo-rules"]
+
+    def test_filter_over_cross_becomes_join(self, memo_manager):
+        """The mixed conjunct becomes the join condition and the
+        single-side one is pushed into the left input."""
+        result = optimize(memo_manager, _filter_over_cross())
+
+        root_input = result.relations[0].root.input
+        assert get_rel_type(root_input) == "join"
+        assert get_rel_type(root_input.join.left) == "filter"
+        assert get_rel_type(root_input.join.right) == "read"
+
+    def test_projection_pruning_reaches_read(self, memo_manager):
+        """select(b) over filter(a) over read(a, b, c) prunes c from the read."""
+        read = make_read("t", ["a", "b", "c"])
+        filtered = pb.filter(read, column(0))
+        plan = materialize(pb.select(filtered, [column(1)]))
+        result = optimize(memo_manager, plan)
+
+        rel = result.relations[0].root.input
+        while get_rel_type(rel) != "read":
+            rel = getattr(rel, get_rel_type(rel)).input
+        assert read_fields(rel.read) == [0, 1]
+
+    def test_matches_rel_rules(self, memo_manager, rel_rules_manager):
+        """Where the greedy rewrites are also the cheapest, both engines agree."""
+        plan = materialize(_filter_over_cross())
+        memo_result = optimize(memo_manager, plan)
+        greedy_result = optimize(rel_rules_manager, plan)
+        assert memo_result.relations[0].root.input == greedy_result.relations[0].root.input
+
+    def test_reports_rule_stats(self, memo_manager):
+        optimize(memo_manager, _filter_over_cross())
+        (group,) = memo_manager.last_report.groups
+        assert group.rules["push_filter_through_cross"].fires > 0
@@ -3,7 +3,7 @@ from substrait.builders import type as tb
 from substrait.builders.extended_expression import column, literal, scalar_function
 from substrait.proto import Plan
 
-from .conftest import get_rel_type, make_read, optimize
+from .conftest import get_rel_type, make_read, materialize, optimize
 
 COMPARISON_URN = "extension:io.substrait:functions_comparison"
 BOOLEAN_URN = "extension:io.substrait:functions_boolean"
@@ -235,3 +235,27 @@ class TestNestedSimplification:
 
         root_input = result.relations[0].root.input
         assert get_rel_type(root_input) == "read"
+
+    def test_if_then_branches_simplified(self, manager):
+        """CASE WHEN AND(true, x) THEN true ELSE AND(true, x) END simplifies
+        the condition and the else branch to x."""
+        read = make_read("t", ["a", "b"])
+        pred = scalar_function(COMPARISON_URN, "is_not_null", [column(0)])
+        cond = scalar_function(BOOLEAN_URN, "and", [_true(), pred])
+        plan = materialize(pb.filter(read, cond))
+        filter_rel = plan.relations[0].root.input.filter
+        and_x = type(filter_rel.condition)()
+        and_x.CopyFrom(filter_rel.condition)
+        case = filter_rel.condition
+        case.Clear()
+        clause = case.if_then.ifs.add()
+        getattr(clause, "if").CopyFrom(and_x)
+        clause.then.literal.boolean = True
+        getattr(case.if_then, "else").CopyFrom(and_x)
+
+        result = optimize(manager, plan)
+
+        if_then = result.relations[0].root.input.filter.condition.if_then
+        for branch in (getattr(if_then.ifs[0], "if"), getattr(if_then, "else")):
+            assert branch.WhichOneof("rex_type") == "scalar_function"
+            assert len(branch.scalar_function.arguments) == 1